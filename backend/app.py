@@ -14,11 +14,15 @@ from routes.search import search_bp
 from routes.ebook import ebook_bp
 from routes.video import video_bp
 from routes.market import market_bp
+from routes.admin import admin_bp
 from services.scraper_factory import ScraperFactory
 from services.ebook_scraper_factory import EbookScraperFactory
+from services.deadline import install_deadline
 
 app = Flask(__name__)
 CORS(app)
+# 每个API请求的上游调用共享一个期限
+install_deadline(app)
 
 # 注册蓝图
 app.register_blueprint(comic_bp, url_prefix='/api')
@@ -26,6 +30,7 @@ app.register_blueprint(search_bp, url_prefix='/api')
 app.register_blueprint(ebook_bp, url_prefix='/api')
 app.register_blueprint(video_bp, url_prefix='/api')
 app.register_blueprint(market_bp, url_prefix='/api')
+app.register_blueprint(admin_bp, url_prefix='/api')
 
 @app.route('/')
 def index():
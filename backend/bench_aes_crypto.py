@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+AES解密对比: 单集播放地址解析耗时
+
+视频工厂每个请求新建爬虫实例, 原来 netflixgc 在构造时 execjs.compile, 解析一集再 call 一次;
+keke6 每次加解密都 compile + call。这里对比:
+
+- execjs: 原实现(需要 PyExecJS 与 Node), 每集 compile + call
+- 进程内: services.aes_crypto 的各个可用后端(cryptography / pycryptodome / python)
+
+分别测量 netflixgc 单集播放地址(一段短密文)与 keke6 接口响应(--size 字节的密文)的解密耗时。
+
+用法:
+    python bench_aes_crypto.py
+    python bench_aes_crypto.py --rounds 50 --size 65536
+"""
+
+import os
+import sys
+import time
+import base64
+import argparse
+import statistics
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import aes_crypto
+
+try:
+    import execjs
+except ImportError:
+    execjs = None
+
+NETFLIXGC_KEY, NETFLIXGC_IV = '2890123456tB959C', '2F131BE91247866E'
+KEKE6_KEY, KEKE6_IV = 'ayt5wy5afwmwrpb19k9s3psx3dymyd0n', 'b3t069ijy7pirw0j'
+
+# 原实现中的JS
+LEGACY_JS = """
+const crypto = require('crypto');
+function decryptAesBase64(cipherText, keyStr, ivStr, mode) {
+  const decipher = crypto.createDecipheriv(mode, Buffer.from(keyStr, 'utf8'), Buffer.from(ivStr, 'utf8'));
+  decipher.setAutoPadding(true);
+  let decrypted = decipher.update(String(cipherText), 'base64', 'utf8');
+  decrypted += decipher.final('utf8');
+  return decrypted;
+}
+"""
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def legacy_decrypt(cipher_b64, key, iv, mode):
+    """原实现: 新实例/每次调用 compile, 再 call"""
+    return execjs.compile(LEGACY_JS).call('decryptAesBase64', cipher_b64, key, iv, mode)
+
+
+def timed(func, rounds):
+    """返回 (中位耗时ms, 最后一次结果)"""
+    times, result = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AES解密对比')
+    parser.add_argument('--rounds', type=int, default=20, help='每种实现重复次数')
+    parser.add_argument('--size', type=int, default=16384, help='keke6 接口响应的明文字节数')
+    args = parser.parse_args()
+
+    episode_url = 'https://cjbfq.netflixgc.tv/m3u8/8f3a1c2d4e5b6a7980/index.m3u8'
+    api_body = ('{"code":0,"data":[' + ','.join(['{"id":1,"name":"剧集"}'] * (args.size // 24)) + ']}')
+    cases = {
+        'netflixgc 单集地址': (
+            base64.b64encode(aes_crypto.encrypt(episode_url, NETFLIXGC_KEY, NETFLIXGC_IV)).decode(),
+            NETFLIXGC_KEY, NETFLIXGC_IV, 'aes-128-cbc', episode_url,
+        ),
+        f'keke6 接口响应 {len(api_body.encode()) // 1024}KB': (
+            base64.b64encode(aes_crypto.encrypt(api_body, KEKE6_KEY, KEKE6_IV)).decode(),
+            KEKE6_KEY, KEKE6_IV, 'aes-256-cbc', api_body,
+        ),
+    }
+
+    runtime = None
+    if execjs is not None:
+        try:
+            runtime = execjs.get().name
+        except Exception:
+            runtime = None
+
+    original = aes_crypto.backend
+    try:
+        for name, (cipher_b64, key, iv, mode, expected) in cases.items():
+            print_separator(name)
+            print(f"{'实现':<24}{'单次(ms)':>12}  结果")
+            rows = {}
+            if runtime:
+                rows[f'execjs ({runtime})'] = timed(lambda: legacy_decrypt(cipher_b64, key, iv, mode), args.rounds)
+            for backend in aes_crypto.available_backends():
+                aes_crypto.backend = backend
+                rows[f'进程内 {backend}'] = timed(lambda: aes_crypto.decrypt_base64(cipher_b64, key, iv), args.rounds)
+            baseline = next(iter(rows.values()))[0]
+            for label, (ms, result) in rows.items():
+                same = '正确' if result == expected else '错误'
+                print(f"{label:<24}{ms:>12.3f}  {same} ({baseline / ms:.0f}x)")
+    finally:
+        aes_crypto.backend = original
+    if not runtime:
+        print("\n未安装 PyExecJS 或没有可用的JS运行时, 跳过原实现")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端对比
+
+对录制的页面分别用各个已安装的后端(lxml / html.parser / html5lib)解析并提取链接、图片、
+文本, 统计每个站点的解析与提取耗时, 并检查提取到的链接/图片与 html.parser 是否一致,
+据此在 config.HTML_PARSERS 中为站点选择后端。
+指定 --only 时再对比完整解析与只解析区域(爬虫中的 *_REGION)的耗时和峰值内存。
+
+用法:
+    python bench_html_parser.py --record https://www.baozimh.com/classify   # 录制页面
+    python bench_html_parser.py                                           # 对比
+    python bench_html_parser.py --rounds 20 --pages ./bench_pages
+    python bench_html_parser.py --only '#chapterlistload'
+
+页面保存在 bench_pages/<host>/ 下, 另外会带上仓库中已有的 xmanhua_page.html
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import http_client
+from services.rate_limiter import normalize_host
+from services.html_parser import available_parsers, parse_html, FALLBACK_PARSER
+from config import HTML_PARSER
+
+DEFAULT_PAGES_DIR = os.path.join(current_dir, 'bench_pages')
+# 仓库中已有的录制页面: 文件 -> host
+BUNDLED_PAGES = {
+    os.path.join(current_dir, 'xmanhua_page.html'): 'xmanhua.com',
+}
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def record(urls, pages_dir):
+    """下载页面保存到 pages_dir/<host>/<序号>.html"""
+    for url in urls:
+        response = http_client.fetch(http_client.create_session(), url)
+        if response is None:
+            print(f"✗ 下载失败: {url}")
+            continue
+        host_dir = os.path.join(pages_dir, normalize_host(url))
+        os.makedirs(host_dir, exist_ok=True)
+        path = os.path.join(host_dir, f'{len(os.listdir(host_dir)) + 1}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"✓ {url} -> {path} ({len(response.text)} 字符)")
+
+
+def load_pages(pages_dir):
+    """返回 {host: [页面内容, ...]}"""
+    pages = {}
+    if os.path.isdir(pages_dir):
+        for host in sorted(os.listdir(pages_dir)):
+            host_dir = os.path.join(pages_dir, host)
+            if not os.path.isdir(host_dir):
+                continue
+            for name in sorted(os.listdir(host_dir)):
+                if name.endswith('.html'):
+                    with open(os.path.join(host_dir, name), encoding='utf-8') as f:
+                        pages.setdefault(host, []).append(f.read())
+    for path, host in BUNDLED_PAGES.items():
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                pages.setdefault(host, []).append(f.read())
+    return pages
+
+
+def extract(soup):
+    """
+    各爬虫共有的提取操作: 链接、图片、标题、正文
+
+    返回 (链接与图片, 标题与正文长度); 前者用于判断后端能否替换,
+    后者在畸形标记上各后端本就不同(如 <title> 内的标签), 只作提示
+    """
+    links = [a['href'] for a in soup.find_all('a', href=True)]
+    images = [img.get('src') or img.get('data-src') for img in soup.select('img')]
+    title = soup.title.get_text(strip=True) if soup.title else ''
+    text = soup.get_text('\n', strip=True)
+    return (links, images), (title, len(text))
+
+
+def bench_host(pages, parser, rounds):
+    """返回 (解析中位耗时ms, 提取中位耗时ms, 提取结果)"""
+    parse_times, extract_times, results = [], [], None
+    for _ in range(rounds):
+        parse_total = extract_total = 0.0
+        round_results = []
+        for html in pages:
+            start = time.perf_counter()
+            soup = parse_html(html, parser)
+            parsed = time.perf_counter()
+            round_results.append(extract(soup))
+            parse_total += parsed - start
+            extract_total += time.perf_counter() - parsed
+        parse_times.append(parse_total * 1000)
+        extract_times.append(extract_total * 1000)
+        results = round_results
+    return statistics.median(parse_times), statistics.median(extract_times), results
+
+
+def bench_region(pages, parser, only, rounds):
+    """返回 (解析中位耗时ms, 峰值内存KB, 元素数), only 为None时完整解析"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for html in pages:
+            parse_html(html, parser, only)
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    soups = [parse_html(html, parser, only) for html in pages]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    elements = sum(len(soup.find_all(True)) for soup in soups)
+    return statistics.median(times), peak / 1024, elements
+
+
+def compare_region(pages_by_host, only, rounds):
+    """逐站点对比完整解析与只解析区域"""
+    for host, pages in pages_by_host.items():
+        print_separator(f"{host}: 完整解析 vs 区域 {only}")
+        print(f"{'后端':<14}{'方式':<8}{'解析(ms)':>10}{'峰值(KB)':>12}{'元素数':>8}")
+        for parser in available_parsers():
+            for label, region in (('完整', None), ('区域', only)):
+                parse_ms, peak_kb, elements = bench_region(pages, parser, region, rounds)
+                print(f"{parser:<14}{label:<8}{parse_ms:>10.2f}{peak_kb:>12.0f}{elements:>8}")
+
+
+def compare(pages_by_host, rounds):
+    """逐站点对比各后端, 返回推荐配置 {host: 后端}"""
+    parsers = available_parsers()
+    print(f"已安装的后端: {', '.join(parsers)}, 当前默认: {HTML_PARSER}")
+    suggestions = {}
+    for host, pages in pages_by_host.items():
+        print_separator(f"{host} ({len(pages)} 个页面, {sum(len(p) for p in pages)} 字符)")
+        print(f"{'后端':<14}{'解析(ms)':>10}{'提取(ms)':>10}{'合计(ms)':>10}  结果")
+        rows = {parser: bench_host(pages, parser, rounds) for parser in parsers}
+        reference = rows[FALLBACK_PARSER][2]
+
+        def same_items(results):
+            return [r[0] for r in results] == [r[0] for r in reference]
+
+        for parser, (parse_ms, extract_ms, results) in rows.items():
+            if not same_items(results):
+                same = '链接/图片与 html.parser 不同'
+            elif results != reference:
+                same = '一致(标题/正文有差异)'
+            else:
+                same = '一致'
+            print(f"{parser:<14}{parse_ms:>10.2f}{extract_ms:>10.2f}{parse_ms + extract_ms:>10.2f}  {same}")
+        # 只在提取到的链接/图片与 html.parser 一致的后端中选最快的, 避免改变爬虫行为
+        candidates = [p for p, row in rows.items() if same_items(row[2])] or [FALLBACK_PARSER]
+        best = min(candidates, key=lambda p: rows[p][0] + rows[p][1])
+        baseline = rows[FALLBACK_PARSER][0] + rows[FALLBACK_PARSER][1]
+        total = rows[best][0] + rows[best][1]
+        print(f"\n推荐: {best} (相对 html.parser {baseline / total:.1f}x)")
+        if best != HTML_PARSER:
+            suggestions[host] = best
+    return suggestions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML解析后端对比')
+    parser.add_argument('--pages', default=DEFAULT_PAGES_DIR, help='录制页面目录')
+    parser.add_argument('--rounds', type=int, default=10, help='每个后端重复次数')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='下载页面到录制目录后退出')
+    parser.add_argument('--only', help='区域选择器, 对比完整解析与只解析该区域')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.pages)
+        return
+
+    pages_by_host = load_pages(args.pages)
+    if not pages_by_host:
+        print(f"没有录制的页面, 先运行: python {os.path.basename(__file__)} --record <URL>")
+        return
+    if args.only:
+        compare_region(pages_by_host, args.only, args.rounds)
+        return
+    suggestions = compare(pages_by_host, args.rounds)
+
+    print_separator("config.HTML_PARSERS 建议")
+    if suggestions:
+        for host, best in suggestions.items():
+            print(f"    '{host}': '{best}',")
+    else:
+        print(f"所有站点使用默认后端 {HTML_PARSER} 即可")
+
+
+if __name__ == '__main__':
+    main()
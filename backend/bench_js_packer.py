@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Packer解包对比
+
+对录制的 chapterimage.ashx 响应分别用原来的逐关键词 re.sub 解包与 services.js_packer 的单遍解包,
+统计每个负载的耗时(单遍解包分别统计未命中与命中缓存), 并检查两者结果是否一致。
+原实现逐词替换时已还原的单词(如 "1")会被后面的关键词再次替换, 且把大于35的下标也按base36编码,
+这些负载上结果不同, 以单遍解包为准(与packer自身的解包一致)。
+
+用法:
+    python bench_js_packer.py --record 'https://xmanhua.com/1234xm/chapterimage.ashx?cid=1234&page=1&key=&_cid=1234&_mid=56&_dt=...&_sign=...'
+    python bench_js_packer.py
+    python bench_js_packer.py --rounds 500 --synthetic 300
+
+负载保存在 bench_pages/xmanhua.com-packed/ 下, 另外会带上 js_unpacker.py 中的样例;
+--synthetic N 额外生成 N 个关键词(base62)的模拟负载, 用于观察关键词数对耗时的影响
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import statistics
+from collections import Counter
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import http_client, js_packer
+
+DEFAULT_PAYLOADS_DIR = os.path.join(current_dir, 'bench_pages', 'xmanhua.com-packed')
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def legacy_unpack(packed_code):
+    """原来的实现: 每个关键词一次 re.sub, 下标按base36编码"""
+    args = js_packer.parse_args(packed_code)
+    if args is None:
+        return None
+    p, a, c, k = args
+    k = k.split('|')
+
+    def base36(n):
+        chars = "0123456789abcdefghijklmnopqrstuvwxyz"
+        if n < len(chars):
+            return chars[n]
+        return base36(n // len(chars)) + chars[n % len(chars)]
+
+    for i in range(c - 1, -1, -1):
+        if i < len(k) and k[i]:
+            p = re.sub(r'\b' + base36(i) + r'\b', k[i], p)
+    return p
+
+
+def pack(source, radix=62):
+    """生成packer格式的负载: 按出现次数给单词编号, 次数多的编码短"""
+    words = re.findall(r'\b\w+\b', source, re.ASCII)
+    counts = Counter(words)
+    ranked = sorted(counts, key=lambda w: -counts[w])
+    codes = {word: js_packer.encode_index(i, radix) for i, word in enumerate(ranked)}
+    payload = re.sub(r'\b\w+\b', lambda m: codes[m.group(0)], source, flags=re.ASCII)
+    payload = payload.replace('\\', '\\\\').replace("'", "\\'")
+    keywords = '|'.join(ranked)
+    return (
+        "eval(function(p,a,c,k,e,d){e=function(c){return(c<a?\"\":e(parseInt(c/a)))+((c=c%a)>35?"
+        "String.fromCharCode(c+29):c.toString(36))};...return p;}"
+        f"('{payload}',{radix},{len(ranked)},'{keywords}'.split('|'),0,{{}}))"
+    )
+
+
+def synthetic(keywords, radix=62):
+    """模拟的章节图片脚本, 约含 keywords 个不同单词"""
+    rng = random.Random(keywords)
+    pages = [f'"/{i}_{rng.randint(1000, 9999)}.jpg"' for i in range(1, keywords // 2)]
+    names = [f'v{i}x{rng.randint(0, 99)}' for i in range(keywords // 2)]
+    body = ';'.join(f"var {name}='{rng.getrandbits(64):x}'" for name in names)
+    return pack(
+        "function dm5imagefun(){var cid=119988;var key='72fa4e46f7f8af9dccff760f707ffe34';"
+        f"var pix=\"https://image.xmanhua.com/1/73/119988\";{body};var pvalue=[{','.join(pages)}];"
+        "for(var i=0;i<pvalue.length;i++){pvalue[i]=pix+pvalue[i]+'?cid=119988&key=72fa4e46f7f8af9dccff760f707ffe34'}"
+        "return pvalue}var d;d=dm5imagefun();",
+        radix,
+    )
+
+
+def record(urls, payloads_dir):
+    """下载 chapterimage.ashx 响应保存到 payloads_dir/<序号>.js"""
+    session = http_client.create_session({'Referer': 'https://xmanhua.com/'})
+    os.makedirs(payloads_dir, exist_ok=True)
+    for url in urls:
+        response = http_client.fetch(session, url)
+        if response is None or js_packer.parse_args(response.text) is None:
+            print(f"✗ 不是packer负载: {url}")
+            continue
+        path = os.path.join(payloads_dir, f'{len(os.listdir(payloads_dir)) + 1}.js')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"✓ {url} -> {path} ({len(response.text)} 字符)")
+
+
+def load_payloads(payloads_dir):
+    """返回 {名称: 负载}"""
+    payloads = {}
+    if os.path.isdir(payloads_dir):
+        for name in sorted(os.listdir(payloads_dir)):
+            if name.endswith('.js'):
+                with open(os.path.join(payloads_dir, name), encoding='utf-8') as f:
+                    payloads[name] = f.read()
+    with open(os.path.join(current_dir, 'js_unpacker.py'), encoding='utf-8') as f:
+        payloads['js_unpacker.py'] = re.search(r"packed = '''(.*?)'''", f.read(), re.S).group(1)
+    return payloads
+
+
+def timed(func, payload, rounds, before=None):
+    """func(payload) 的中位耗时(微秒)"""
+    times = []
+    for _ in range(rounds):
+        if before:
+            before()
+        start = time.perf_counter()
+        func(payload)
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Packer解包对比')
+    parser.add_argument('--payloads', default=DEFAULT_PAYLOADS_DIR, help='录制负载目录')
+    parser.add_argument('--rounds', type=int, default=200, help='每个负载重复次数')
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[], metavar='N', help='生成含N个关键词的模拟负载')
+    parser.add_argument('--radix', type=int, default=62, help='模拟负载的进制(36或62)')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='下载 chapterimage.ashx 响应后退出')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.payloads)
+        return
+
+    payloads = load_payloads(args.payloads)
+    for n in args.synthetic:
+        payloads[f'模拟 {n} 词 base{args.radix}'] = synthetic(n, args.radix)
+
+    print_separator(f"{len(payloads)} 个负载, 每个 {args.rounds} 次")
+    print(f"{'负载':<24}{'关键词':>8}{'逐词(us)':>12}{'单遍(us)':>12}{'缓存(us)':>12}{'加速':>8}  结果")
+    for name, payload in payloads.items():
+        _, radix, count, _ = js_packer.parse_args(payload)
+        legacy = timed(legacy_unpack, payload, args.rounds)
+        single = timed(js_packer.unpack, payload, args.rounds, before=js_packer._unpack.cache_clear)
+        cached = timed(js_packer.unpack, payload, args.rounds)
+        if legacy_unpack(payload) == js_packer.unpack(payload):
+            same = '一致'
+        else:
+            same = '不同(原实现逐词替换会再次替换已还原的单词' + (', 且无法还原大于35的下标)' if radix > 36 else ')')
+        print(f"{name:<24}{count:>8}{legacy:>12.1f}{single:>12.1f}{cached:>12.1f}{legacy / single:>7.1f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
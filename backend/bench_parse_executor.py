@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+解析执行器对比: 章节图片解析的总耗时
+
+在本地起一个带延迟的模拟站点, 用 AnimezillaScraper 并发获取整章(每页一个请求, 每页解析出
+主图片), 分别在事件循环内解析(inline, 改动前的行为)、线程池(thread)、进程池(process)中解析,
+统计整章耗时以及同一循环上另一个协程的最大调度间隔(事件循环被解析阻塞的程度)。
+
+用法:
+    python bench_parse_executor.py
+    python bench_parse_executor.py --pages 60 --latency 0.05 --filler 3000 --rounds 5
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.parse_executor import parse_executor
+from services.async_loop import async_loop
+from services.animezilla_scraper import AnimezillaScraper
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def make_handler(latency, filler):
+    """返回模拟页面的处理器: 每个请求延迟 latency 秒, 页面带 filler 个侧栏链接"""
+    links = ''.join(f'<li><a href="/manga/{i}">推荐 {i}</a><span class="tag">标签</span></li>' for i in range(filler))
+
+    class PageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            _, _, chapter_id, page_num = self.path.split('/')
+            time.sleep(latency)
+            body = (
+                f'<html><head><title>第{page_num}页</title></head><body>'
+                f'<div class="sidebar"><ul>{links}</ul></div>'
+                f'<article><img id="comic" src="https://img.example.com/{chapter_id}/{page_num}.jpg"></article>'
+                f'<div class="footer"><ul>{links}</ul></div></body></html>'
+            ).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return PageHandler
+
+
+async def resolve_chapter(scraper, chapter_id, pages):
+    """获取整章, 同时测量事件循环的最大调度间隔; 返回 (图片数, 耗时秒, 最大间隔秒)"""
+    gaps = [0.0]
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    images = await scraper._fetch_images_async(chapter_id, pages)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    return len(images), elapsed, max(gaps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='解析执行器对比')
+    parser.add_argument('--pages', type=int, default=40, help='每章页数')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟站点每个请求的延迟(秒)')
+    parser.add_argument('--filler', type=int, default=2000, help='每页侧栏链接数, 决定页面大小')
+    parser.add_argument('--rounds', type=int, default=3, help='每种执行器重复次数')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency, args.filler))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scraper = AnimezillaScraper()
+    scraper.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    print_separator(f"整章 {args.pages} 页, 延迟 {args.latency * 1000:.0f}ms, 执行器线程/进程数 {parse_executor.workers}, CPU {os.cpu_count()} 核")
+    print(f"{'执行器':<10}{'整章(ms)':>12}{'最大间隔(ms)':>16}{'图片数':>8}")
+    original = parse_executor.kind
+    baseline = None
+    try:
+        for kind in ('inline', 'thread', 'process'):
+            parse_executor.configure(kind)
+            # 预热: 建立连接, 启动线程/进程
+            async_loop.run(resolve_chapter(scraper, 'warmup', min(args.pages, 10)), timeout=300)
+            rows = [async_loop.run(resolve_chapter(scraper, f'c{i}', args.pages), timeout=300) for i in range(args.rounds)]
+            elapsed = statistics.median(row[1] for row in rows) * 1000
+            gap = statistics.median(row[2] for row in rows) * 1000
+            baseline = baseline or elapsed
+            print(f"{kind:<10}{elapsed:>12.1f}{gap:>16.1f}{rows[-1][0]:>8}  ({baseline / elapsed:.2f}x)")
+    finally:
+        parse_executor.configure(original)
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
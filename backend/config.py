@@ -102,3 +102,157 @@ CACHE_TIMEOUT = {
     'chapters': 600,
     'images': 1800,
 }
+
+# 内存缓存容量限制(条目数 / 字节数), 超出后按LRU淘汰
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 5000))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# 缓存后端: memory(进程内, 默认) / redis(多进程共享)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'netcom:')
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+REDIS_DB = int(os.getenv('REDIS_DB', 0))
+REDIS_PASSWORD = os.getenv('REDIS_PASSWORD') or None
+
+# 按缓存前缀配置软/硬过期时间(秒)
+# soft 之前视为新鲜数据; soft 到 hard 之间直接返回旧数据并在后台刷新; 超过 hard 才同步回源
+# 未配置的前缀 soft=hard=装饰器上的 timeout
+CACHE_TTL_POLICY = {
+    'hot': {'soft': 300, 'hard': 1800},
+    'latest': {'soft': 300, 'hard': 1800},
+    'chapters': {'soft': 600, 'hard': 3600},
+    'ebook_category': {'soft': 600, 'hard': 3600},
+    'ebook_chapters': {'soft': 1800, 'hard': 7200},
+}
+
+# 并发未命中时等待同键计算结果的最长时间(秒)
+CACHE_SINGLE_FLIGHT_WAIT = 60
+# 后台刷新缓存的最大线程数
+CACHE_REFRESH_WORKERS = int(os.getenv('CACHE_REFRESH_WORKERS', 4))
+
+# 磁盘二级缓存(SQLite), 默认写入 docker-compose 挂载的 ./cache 目录
+CACHE_DISK_ENABLED = os.getenv('CACHE_DISK_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+CACHE_DISK_PATH = os.getenv(
+    'CACHE_DISK_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'response_cache.sqlite3')
+)
+CACHE_DISK_MAX_BYTES = int(os.getenv('CACHE_DISK_MAX_BYTES', 1024 * 1024 * 1024))
+# 长期不变的数据才落盘
+CACHE_DISK_PREFIXES = ('ebook_content', 'images', 'ebook_chapters', 'detail')
+
+# 按结果类型覆盖缓存时间(秒), 0 表示不缓存
+# error: 接口报错 / empty: 爬虫返回空列表 / partial: total < expected_total
+CACHE_OUTCOME_TTL = {
+    'error': 10,
+    'empty': 30,
+    'partial': 120,
+}
+
+# 管理接口令牌(请求头 X-Admin-Token), 未配置时管理接口不可用
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# 缓存响应体超过该大小(字节)时压缩存储(brotli, 缺失时gzip)
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))
+
+# 章节预读: 阅读第N章时后台缓存第N+1章的图片列表/正文
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', 2))
+PREFETCH_QUEUE_SIZE = int(os.getenv('PREFETCH_QUEUE_SIZE', 50))
+# 每个数据源同时进行的预读任务数
+PREFETCH_SOURCE_CONCURRENCY = int(os.getenv('PREFETCH_SOURCE_CONCURRENCY', 1))
+# 同一章节列表重新解析后继关系的间隔(秒)
+PREFETCH_INDEX_TTL = 600
+
+# 上游HTTP连接池与重试
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 64))   # 缓存的host连接池数量
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 32))           # 每个host的最大连接数
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))                      # GET/HEAD 重试次数
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.3))    # 退避基数(秒), 同时作为随机抖动上限
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+# 每个爬虫实例的会话池大小, 并发请求各自取用一个会话(共用连接池与Cookie)
+SCRAPER_SESSION_POOL_SIZE = int(os.getenv('SCRAPER_SESSION_POOL_SIZE', 4))
+
+# 上游请求限速(按host的令牌桶): rate 为每秒请求数, burst 为允许的突发请求数, rate<=0 不限速
+# 桶由所有线程共享. 原来每个线程每次请求前随机等待0.5~1.5秒, 约每线程每秒1次, 总量随并发线程数增长;
+# 默认值按爬虫会话池大小(SCRAPER_SESSION_POOL_SIZE=4)个线程同时请求同一站点估算: 每秒5次略高于原来4个线程的总量,
+# 10次突发可让一批并发的列表/详情请求不排队. 排队超过 API_DEADLINE(25秒, 约130个请求)的请求才会放弃
+RATE_LIMIT_DEFAULT = {
+    'rate': float(os.getenv('RATE_LIMIT_RATE', 5.0)),
+    'burst': int(os.getenv('RATE_LIMIT_BURST', 10)),
+}
+# 按数据源ID(或host)覆盖; 也可以在 COMIC_SOURCES 或 data/source_market.json 的条目里写 rate_limit
+# 例: 'thanju': {'rate': 2.0, 'burst': 4} 对单个站点收紧
+RATE_LIMITS = {}
+# 后台请求(章节预读)不能使用的那部分突发配额(占 burst 的比例), 留给读者的前台请求
+RATE_LIMIT_BACKGROUND_RESERVE = 0.5
+
+# HTML解析后端: lxml(默认, C实现) / html.parser / html5lib, 未安装时退回 html.parser
+HTML_PARSER = os.getenv('HTML_PARSER', 'lxml')
+# 按站点host(含子域名)覆盖, 依据 bench_html_parser.py 的结果选择
+HTML_PARSERS = {}
+
+# 首页Cookie预热结果的最长有效期(秒), 持久Cookie更早过期时以Cookie为准
+COOKIE_WARMUP_TTL = int(os.getenv('COOKIE_WARMUP_TTL', 1800))
+
+# 异步爬虫共享事件循环上的连接池
+ASYNC_HTTP_LIMIT = int(os.getenv('ASYNC_HTTP_LIMIT', 100))              # 单个host会话的总连接数
+ASYNC_HTTP_LIMIT_PER_HOST = int(os.getenv('ASYNC_HTTP_LIMIT_PER_HOST', 10))
+# 异步爬虫中的页面解析方式: inline(默认, 在循环内解析) / thread / process
+# bs4 建树是纯Python代码, 持有GIL, 线程池只缩短事件循环最长的停顿, 整章耗时反而更长
+# (bench_parse_executor.py: inline 3.4s, thread 4.0s, process 4.8s); 在部署环境用该脚本确认整章耗时下降后再切换
+PARSE_EXECUTOR = os.getenv('PARSE_EXECUTOR', 'inline')
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', 4))
+
+# 视频源的AES-CBC在进程内完成: auto 依次尝试 cryptography / pycryptodome / python(纯Python实现)
+CRYPTO_BACKEND = os.getenv('CRYPTO_BACKEND', 'auto')
+# 进程内加解密出错时再用 execjs(Node) 重试一次, 仅用于排查与旧实现的差异
+CRYPTO_NODE_FALLBACK = os.getenv('CRYPTO_NODE_FALLBACK', 'false').lower() in ('1', 'true', 'yes')
+
+# 上游响应缓存: 保存上游原始内容与 ETag/Last-Modified, 再次请求时发条件请求, 304时复用
+UPSTREAM_CACHE_ENABLED = os.getenv('UPSTREAM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+UPSTREAM_CACHE_PATH = os.getenv(
+    'UPSTREAM_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'upstream_cache.sqlite3')
+)
+UPSTREAM_CACHE_MAX_BYTES = int(os.getenv('UPSTREAM_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+UPSTREAM_CACHE_TTL = int(os.getenv('UPSTREAM_CACHE_TTL', 7 * 24 * 3600))   # 条目保留时间
+# 默认开启条件请求的站点(含子域名), 都是分类/列表/书籍页很少变化的电子书站
+UPSTREAM_CACHE_HOSTS = ('kanunu8.com', 'cddaoyue.cn', 'youshu.me')
+
+# 按host的熔断器: 窗口内请求数达到下限且失败率超过阈值时打开, 冷却后放行一个探测请求
+BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', 60))              # 滚动窗口(秒)
+BREAKER_MIN_REQUESTS = int(os.getenv('BREAKER_MIN_REQUESTS', 5))
+BREAKER_ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', 0.5))
+BREAKER_OPEN_SECONDS = int(os.getenv('BREAKER_OPEN_SECONDS', 30))  # 打开后的冷却时间
+
+# 数据源镜像: 数据源 -> 页面类型 -> 镜像列表(按默认优先级), url 中的占位符由爬虫填充
+SOURCE_MIRRORS = {
+    'baozimh': {
+        'chapter': [
+            {
+                'name': 'twbzmg',
+                'url': 'https://www.twbzmg.com/comic/chapter/{comic_id}/0_{slot}.html',
+                'referer': 'https://www.twbzmg.com/',
+            },
+            {
+                'name': 'baozimh',
+                'url': 'https://www.baozimh.com/user/page_direct?comic_id={comic_id}&section_slot=0&chapter_slot={slot}',
+                'referer': 'https://www.baozimh.com',
+            },
+        ],
+    },
+}
+# 对冲请求: 领先镜像超过其p95延迟(限制在上下限之间)仍未返回时请求下一个镜像
+HEDGE_WORKERS = int(os.getenv('HEDGE_WORKERS', 8))
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', 1.5))   # 样本不足时的等待时间(秒)
+HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', 0.2))
+HEDGE_MAX_DELAY = float(os.getenv('HEDGE_MAX_DELAY', 5.0))
+
+# 接口请求期限(秒): 调用链上所有上游请求、重试与限速等待共享这段时间, 用完后返回部分结果
+# 客户端可通过请求头 X-Request-Timeout 缩短, 最长不超过 API_DEADLINE_MAX
+API_DEADLINE = float(os.getenv('API_DEADLINE', 25))
+API_DEADLINE_MAX = float(os.getenv('API_DEADLINE_MAX', 60))
+# 不受期限约束的接口前缀(视频代理/转码/下载是长时间的流式传输)
+API_DEADLINE_EXEMPT = ('/api/videos/proxy', '/api/videos/convert', '/api/videos/download')
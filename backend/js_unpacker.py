@@ -4,42 +4,20 @@
 JS Packer解密工具
 """
 
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services import js_packer
 
 def unpack_js_packer(packed_js):
     """解密JS Packer混淆代码"""
-    try:
-        # 提取参数
-        pattern = r"eval\(function\(p,a,c,k,e,d\).*?return p\}\('(.+?)',(\d+),(\d+),'(.+?)'\.split\('\|'\)"
-        match = re.search(pattern, packed_js, re.DOTALL)
-        if not match:
-            return None
-        
-        p, a, c, k = match.groups()
-        a, c = int(a), int(c)
-        k = k.split('|')
-        
-        print("Parameters:", len(p), a, c, len(k))
-        
-        # 解密函数e的实现
-        def e(c_val):
-            if c_val < a:
-                return ""
-            else:
-                return e(c_val // a) + (chr(c_val % a + 29) if c_val % a > 35 else str(c_val % a) if c_val % a < 36 else str(c_val % a))
-        
-        # 替换过程
-        result = p
-        for i in range(c - 1, -1, -1):
-            if i < len(k) and k[i]:
-                # 构建正则表达式
-                pattern = r'\b' + e(i) + r'\b'
-                result = re.sub(pattern, k[i], result)
-        
-        return result
-    except Exception as ex:
-        print("Decrypt failed:", ex)
-        return None
+    result = js_packer.unpack(packed_js)
+    if result is None:
+        print("Decrypt failed")
+    return result
 
 def extract_uk_from_js(js_code):
     """从解密后的JS代码中提取uk参数"""
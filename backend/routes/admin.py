@@ -0,0 +1,84 @@
+from flask import Blueprint, request, jsonify
+from functools import wraps
+from services.cache import invalidate_tags, clear_cache, get_cache_stats
+from services.upstream_cache import upstream_cache
+from services.mirrors import mirror_stats
+from config import ADMIN_TOKEN
+import hmac
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+
+def require_admin(f):
+    """校验请求头 X-Admin-Token, 未配置 ADMIN_TOKEN 时拒绝所有请求"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get('X-Admin-Token', '')
+        if not ADMIN_TOKEN:
+            return jsonify({'error': '管理接口未启用'}), 403
+        if not hmac.compare_digest(token, ADMIN_TOKEN):
+            return jsonify({'error': '无权访问'}), 401
+        return f(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/admin/cache/invalidate', methods=['POST'])
+@require_admin
+def invalidate_cache():
+    """
+    按标签失效缓存
+
+    请求体:
+        {"tags": ["source:baozimh"]}
+        或 {"source": "baozimh", "type": "images", "id": "m12345"}
+    标签之间为"或"关系, 任一匹配即删除
+    """
+    data = request.get_json(silent=True) or {}
+    tags = [str(tag) for tag in data.get('tags') or [] if tag]
+    for field in ('source', 'type', 'id'):
+        if data.get(field):
+            tags.append(f"{field}:{data[field]}")
+
+    if not tags:
+        return jsonify({'error': '缺少tags或source/type/id参数'}), 400
+
+    deleted = invalidate_tags(tags)
+    logger.info('按标签失效缓存 tags=%s deleted=%s', tags, deleted)
+    return jsonify({'success': True, 'tags': tags, 'deleted': deleted}), 200
+
+
+@admin_bp.route('/admin/cache/clear', methods=['POST'])
+@require_admin
+def clear_all_cache():
+    """清空全部缓存"""
+    clear_cache()
+    logger.info('已清空全部缓存')
+    return jsonify({'success': True}), 200
+
+
+@admin_bp.route('/_debug/cache', methods=['GET'])
+@require_admin
+def debug_cache():
+    """
+    缓存统计
+
+    参数 top: 返回最大条目/命中率最差键的数量, 默认20
+    """
+    top_n = max(1, min(request.args.get('top', 20, type=int), 200))
+    stats = get_cache_stats(top_n)
+    stats['upstream'] = {
+        'stored': upstream_cache.stored,
+        'revalidated': upstream_cache.revalidated,
+        'stale_served': upstream_cache.stale_served,
+    }
+    return jsonify(stats), 200
+
+
+@admin_bp.route('/_debug/mirrors', methods=['GET'])
+@require_admin
+def debug_mirrors():
+    """各镜像最近的延迟分位数与失败率"""
+    return jsonify({'mirrors': mirror_stats.snapshot()}), 200
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from services.scraper_factory import ScraperFactory
 from services.cache import cache_response
+from services.prefetch import track_chapter_list, prefetch_next_chapter
 from utils.decorators import (
     handle_errors, get_source_param, get_pagination_params,
     success_response, error_response
@@ -32,7 +33,7 @@ def get_source_config():
     }), 200
 
 @comic_bp.route('/comics/hot', methods=['GET'])
-@cache_response(timeout=300, key_prefix='hot')
+@cache_response(timeout=300, key_prefix='hot', resolve_source=ScraperFactory.resolve_source)
 @handle_errors("获取热门漫画失败")
 def get_hot_comics():
     """获取热门漫画"""
@@ -42,7 +43,7 @@ def get_hot_comics():
     return success_response(scraper.get_hot_comics(page, limit))
 
 @comic_bp.route('/comics/latest', methods=['GET'])
-@cache_response(timeout=300, key_prefix='latest')
+@cache_response(timeout=300, key_prefix='latest', resolve_source=ScraperFactory.resolve_source)
 @handle_errors("获取最新漫画失败")
 def get_latest_comics():
     """获取最新漫画"""
@@ -52,7 +53,7 @@ def get_latest_comics():
     return success_response(scraper.get_latest_comics(page, limit))
 
 @comic_bp.route('/comics/<comic_id>', methods=['GET'])
-@cache_response(timeout=600, key_prefix='detail')
+@cache_response(timeout=600, key_prefix='detail', resolve_source=ScraperFactory.resolve_source)
 @handle_errors("获取漫画详情失败")
 def get_comic_detail(comic_id):
     """获取漫画详情"""
@@ -61,7 +62,8 @@ def get_comic_detail(comic_id):
     return success_response(scraper.get_comic_detail(comic_id))
 
 @comic_bp.route('/comics/<comic_id>/chapters', methods=['GET'])
-@cache_response(timeout=600, key_prefix='chapters')
+@track_chapter_list('comic', 'comic_id')
+@cache_response(timeout=600, key_prefix='chapters', resolve_source=ScraperFactory.resolve_source)
 @handle_errors("获取章节列表失败")
 def get_chapters(comic_id):
     """获取章节列表"""
@@ -70,7 +72,7 @@ def get_chapters(comic_id):
     return success_response(scraper.get_chapters(comic_id))
 
 @comic_bp.route('/chapters/<chapter_id>/images/<int:page>', methods=['GET'])
-@cache_response(timeout=1800, key_prefix='image_page')
+@cache_response(timeout=1800, key_prefix='image_page', resolve_source=ScraperFactory.resolve_source)
 def get_chapter_image_by_page(chapter_id, page):
     """获取章节的单张图片"""
     source = request.args.get('source', None)
@@ -96,7 +98,8 @@ def get_chapter_image_by_page(chapter_id, page):
         return jsonify({'error': str(e)}), 500
 
 @comic_bp.route('/chapters/<chapter_id>/images', methods=['GET'])
-@cache_response(timeout=1800, key_prefix='images')
+@prefetch_next_chapter('comic')
+@cache_response(timeout=1800, key_prefix='images', resolve_source=ScraperFactory.resolve_source)
 @handle_errors("获取章节图片失败")
 def get_chapter_images(chapter_id):
     """获取章节图片"""
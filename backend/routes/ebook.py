@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from services.ebook_scraper_factory import EbookScraperFactory
 from services.cache import cache_response
+from services.prefetch import track_chapter_list, prefetch_next_chapter
 from utils.decorators import (
     handle_errors, get_source_param, get_pagination_params,
     success_response, not_found_response, bad_request_response
@@ -30,7 +31,7 @@ METADATA_CONFIG = {
 }
 
 @ebook_bp.route('/ebooks/categories', methods=['GET'])
-@cache_response(timeout=3600, key_prefix='ebook_categories')
+@cache_response(timeout=3600, key_prefix='ebook_categories', resolve_source=EbookScraperFactory.resolve_source)
 @handle_errors("获取分类失败")
 def get_categories():
     """获取所有分类"""
@@ -39,7 +40,7 @@ def get_categories():
     return success_response(scraper.get_categories())
 
 @ebook_bp.route('/ebooks/category/<category_id>', methods=['GET'])
-@cache_response(timeout=600, key_prefix='ebook_category')
+@cache_response(timeout=600, key_prefix='ebook_category', resolve_source=EbookScraperFactory.resolve_source)
 @handle_errors("获取分类书籍失败")
 def get_books_by_category(category_id):
     """根据分类获取书籍列表"""
@@ -49,7 +50,7 @@ def get_books_by_category(category_id):
     return success_response(scraper.get_books_by_category(category_id, page, limit))
 
 @ebook_bp.route('/ebooks/<book_id>', methods=['GET'])
-@cache_response(timeout=1800, key_prefix='ebook_detail')
+@cache_response(timeout=1800, key_prefix='ebook_detail', resolve_source=EbookScraperFactory.resolve_source)
 @handle_errors("获取书籍详情失败")
 def get_book_detail(book_id):
     """获取书籍详情"""
@@ -61,7 +62,8 @@ def get_book_detail(book_id):
     return success_response(data)
 
 @ebook_bp.route('/ebooks/<book_id>/chapters', methods=['GET'])
-@cache_response(timeout=1800, key_prefix='ebook_chapters')
+@track_chapter_list('ebook', 'book_id')
+@cache_response(timeout=1800, key_prefix='ebook_chapters', resolve_source=EbookScraperFactory.resolve_source)
 @handle_errors("获取章节列表失败")
 def get_chapters(book_id):
     """获取章节列表"""
@@ -70,7 +72,8 @@ def get_chapters(book_id):
     return success_response(scraper.get_chapters(book_id))
 
 @ebook_bp.route('/ebooks/chapters/<chapter_id>/content', methods=['GET'])
-@cache_response(timeout=3600, key_prefix='ebook_content')
+@prefetch_next_chapter('ebook')
+@cache_response(timeout=3600, key_prefix='ebook_content', resolve_source=EbookScraperFactory.resolve_source)
 @handle_errors("获取章节内容失败")
 def get_chapter_content(chapter_id):
     """获取章节内容"""
@@ -82,7 +85,7 @@ def get_chapter_content(chapter_id):
     return success_response(data)
 
 @ebook_bp.route('/ebooks/search', methods=['GET'])
-@cache_response(timeout=300, key_prefix='ebook_search')
+@cache_response(timeout=300, key_prefix='ebook_search', resolve_source=EbookScraperFactory.resolve_source)
 @handle_errors("搜索书籍失败")
 def search_books():
     """搜索书籍"""
@@ -6,6 +6,7 @@ from utils.decorators import (
 )
 import logging
 import requests
+from services import http_client
 import re
 from urllib.parse import urlparse, urlencode, urljoin, urlsplit, urlunsplit, unquote, quote
 import subprocess
@@ -400,7 +401,8 @@ def proxy_video():
             headers['Range'] = request.headers['Range']
         
         # 请求视频流
-        response = requests.get(
+        response = http_client.request(
+            'GET',
             video_url,
             headers=headers,
             stream=not is_m3u8,
@@ -437,8 +439,7 @@ def proxy_video():
             if _is_blank(play_referer_value) and series_id and source == 'netflixgc':
                 play_referer_value = f'https://www.netflixgc.com/detail/{series_id}.html'
 
-            if response.encoding is None or str(response.encoding).lower() == 'iso-8859-1':
-                response.encoding = response.apparent_encoding
+            http_client.fix_encoding(response)
 
             effective_m3u8_url = response.url or video_url
             logger.info(
@@ -455,9 +456,13 @@ def proxy_video():
         else:
             # 流式返回视频数据
             def generate():
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        yield chunk
+                # 客户端中途断开时也要归还连接
+                try:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        if chunk:
+                            yield chunk
+                finally:
+                    response.close()
         
         return Response(
             stream_with_context(generate()),
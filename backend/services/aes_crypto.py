@@ -0,0 +1,343 @@
+"""
+进程内AES-CBC加解密
+
+视频源(keke6、netflixgc)原来通过 execjs 调用 Node 的 crypto 模块: keke6 每次调用都 compile,
+netflixgc 每个实例 compile 一次(视频工厂每个请求新建实例), 而 execjs 的Node运行时每次 call 都会
+启动一个 node 进程, 单次几十到上百毫秒, 并发时占用大量内存。这里在进程内完成 AES-128/192/256-CBC
+与 PKCS7 填充, 供所有视频源共用:
+
+- 后端按 config.CRYPTO_BACKEND 选择, auto 时依次使用已安装的 cryptography(requirements.txt 中的依赖,
+  OpenSSL实现)、pycryptodome, 都没有时才使用内置的纯Python实现(T表, 轮密钥按密钥缓存);
+  纯Python实现每次解密都要占用CPU, 只作为最后的退路
+- 与Node一致: 密钥/IV长度不符、填充错误时抛出 ValueError
+- CRYPTO_NODE_FALLBACK 打开时, 进程内出错后再用 execjs 重试一次(共用一个编译好的上下文)
+"""
+import base64
+import logging
+import threading
+from functools import lru_cache
+from config import CRYPTO_BACKEND, CRYPTO_NODE_FALLBACK
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:  # 未按 requirements.txt 安装时退回其他后端
+    Cipher = None
+
+try:
+    from Crypto.Cipher import AES as _PyCryptodomeAES
+except ImportError:  # 可选依赖
+    _PyCryptodomeAES = None
+
+try:
+    import execjs
+except ImportError:  # 只有打开Node退回时才需要
+    execjs = None
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 16
+KEY_SIZES = (16, 24, 32)
+BACKENDS = ('cryptography', 'pycryptodome', 'python')
+
+
+# 纯Python实现
+
+def _xtime(b):
+    return ((b << 1) ^ 0x1b) & 0xff if b & 0x80 else b << 1
+
+
+def _mul(a, b):
+    """GF(2^8) 乘法"""
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a = _xtime(a)
+        b >>= 1
+    return result
+
+
+def _build_tables():
+    sbox = [0] * 256
+    p = q = 1
+    while True:
+        # p 乘3, q 除以3, 遍历乘法群; q 是 p 的逆元
+        p = p ^ _xtime(p)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xff
+        if q & 0x80:
+            q ^= 0x09
+        x = q
+        for shift in (1, 2, 3, 4):
+            x ^= ((q << shift) | (q >> (8 - shift))) & 0xff
+        sbox[p] = x ^ 0x63
+        if p == 1:
+            break
+    sbox[0] = 0x63
+    inv_sbox = [0] * 256
+    for i, s in enumerate(sbox):
+        inv_sbox[s] = i
+
+    def rotations(table):
+        tables = [table]
+        for _ in range(3):
+            tables.append([((t >> 8) | (t << 24)) & 0xffffffff for t in tables[-1]])
+        return tables
+
+    te = rotations([(_mul(s, 2) << 24) | (s << 16) | (s << 8) | _mul(s, 3) for s in sbox])
+    td = rotations([(_mul(s, 14) << 24) | (_mul(s, 9) << 16) | (_mul(s, 13) << 8) | _mul(s, 11) for s in inv_sbox])
+    return sbox, inv_sbox, te, td
+
+
+_SBOX, _INV_SBOX, (_TE0, _TE1, _TE2, _TE3), (_TD0, _TD1, _TD2, _TD3) = _build_tables()
+
+
+@lru_cache(maxsize=64)
+def _round_keys(key):
+    """返回 (加密轮密钥, 解密轮密钥), 每个元素是一轮的4个字"""
+    nk = len(key) // 4
+    rounds = nk + 6
+    words = [int.from_bytes(key[i:i + 4], 'big') for i in range(0, len(key), 4)]
+    rcon = 1
+    for i in range(nk, 4 * (rounds + 1)):
+        temp = words[-1]
+        if i % nk == 0:
+            temp = ((temp << 8) | (temp >> 24)) & 0xffffffff
+            temp = _sub_word(temp) ^ (rcon << 24)
+            rcon = _xtime(rcon)
+        elif nk > 6 and i % nk == 4:
+            temp = _sub_word(temp)
+        words.append(words[i - nk] ^ temp)
+    enc = [tuple(words[r * 4:r * 4 + 4]) for r in range(rounds + 1)]
+    # 等价逆密码: 中间各轮的轮密钥做 InvMixColumns
+    dec = [enc[rounds]]
+    for r in range(rounds - 1, 0, -1):
+        dec.append(tuple(
+            _TD0[_SBOX[w >> 24]] ^ _TD1[_SBOX[(w >> 16) & 0xff]] ^ _TD2[_SBOX[(w >> 8) & 0xff]] ^ _TD3[_SBOX[w & 0xff]]
+            for w in enc[r]
+        ))
+    dec.append(enc[0])
+    return enc, dec
+
+
+def _sub_word(w):
+    return (_SBOX[w >> 24] << 24) | (_SBOX[(w >> 16) & 0xff] << 16) | (_SBOX[(w >> 8) & 0xff] << 8) | _SBOX[w & 0xff]
+
+
+def _encrypt_block(rk, s0, s1, s2, s3):
+    k = rk[0]
+    s0 ^= k[0]
+    s1 ^= k[1]
+    s2 ^= k[2]
+    s3 ^= k[3]
+    for k in rk[1:-1]:
+        s0, s1, s2, s3 = (
+            _TE0[s0 >> 24] ^ _TE1[(s1 >> 16) & 0xff] ^ _TE2[(s2 >> 8) & 0xff] ^ _TE3[s3 & 0xff] ^ k[0],
+            _TE0[s1 >> 24] ^ _TE1[(s2 >> 16) & 0xff] ^ _TE2[(s3 >> 8) & 0xff] ^ _TE3[s0 & 0xff] ^ k[1],
+            _TE0[s2 >> 24] ^ _TE1[(s3 >> 16) & 0xff] ^ _TE2[(s0 >> 8) & 0xff] ^ _TE3[s1 & 0xff] ^ k[2],
+            _TE0[s3 >> 24] ^ _TE1[(s0 >> 16) & 0xff] ^ _TE2[(s1 >> 8) & 0xff] ^ _TE3[s2 & 0xff] ^ k[3],
+        )
+    k = rk[-1]
+    s = _SBOX
+    return (
+        ((s[s0 >> 24] << 24) | (s[(s1 >> 16) & 0xff] << 16) | (s[(s2 >> 8) & 0xff] << 8) | s[s3 & 0xff]) ^ k[0],
+        ((s[s1 >> 24] << 24) | (s[(s2 >> 16) & 0xff] << 16) | (s[(s3 >> 8) & 0xff] << 8) | s[s0 & 0xff]) ^ k[1],
+        ((s[s2 >> 24] << 24) | (s[(s3 >> 16) & 0xff] << 16) | (s[(s0 >> 8) & 0xff] << 8) | s[s1 & 0xff]) ^ k[2],
+        ((s[s3 >> 24] << 24) | (s[(s0 >> 16) & 0xff] << 16) | (s[(s1 >> 8) & 0xff] << 8) | s[s2 & 0xff]) ^ k[3],
+    )
+
+
+def _decrypt_block(rk, s0, s1, s2, s3):
+    k = rk[0]
+    s0 ^= k[0]
+    s1 ^= k[1]
+    s2 ^= k[2]
+    s3 ^= k[3]
+    for k in rk[1:-1]:
+        s0, s1, s2, s3 = (
+            _TD0[s0 >> 24] ^ _TD1[(s3 >> 16) & 0xff] ^ _TD2[(s2 >> 8) & 0xff] ^ _TD3[s1 & 0xff] ^ k[0],
+            _TD0[s1 >> 24] ^ _TD1[(s0 >> 16) & 0xff] ^ _TD2[(s3 >> 8) & 0xff] ^ _TD3[s2 & 0xff] ^ k[1],
+            _TD0[s2 >> 24] ^ _TD1[(s1 >> 16) & 0xff] ^ _TD2[(s0 >> 8) & 0xff] ^ _TD3[s3 & 0xff] ^ k[2],
+            _TD0[s3 >> 24] ^ _TD1[(s2 >> 16) & 0xff] ^ _TD2[(s1 >> 8) & 0xff] ^ _TD3[s0 & 0xff] ^ k[3],
+        )
+    k = rk[-1]
+    s = _INV_SBOX
+    return (
+        ((s[s0 >> 24] << 24) | (s[(s3 >> 16) & 0xff] << 16) | (s[(s2 >> 8) & 0xff] << 8) | s[s1 & 0xff]) ^ k[0],
+        ((s[s1 >> 24] << 24) | (s[(s0 >> 16) & 0xff] << 16) | (s[(s3 >> 8) & 0xff] << 8) | s[s2 & 0xff]) ^ k[1],
+        ((s[s2 >> 24] << 24) | (s[(s1 >> 16) & 0xff] << 16) | (s[(s0 >> 8) & 0xff] << 8) | s[s3 & 0xff]) ^ k[2],
+        ((s[s3 >> 24] << 24) | (s[(s2 >> 16) & 0xff] << 16) | (s[(s1 >> 8) & 0xff] << 8) | s[s0 & 0xff]) ^ k[3],
+    )
+
+
+def _words(block):
+    return (
+        int.from_bytes(block[0:4], 'big'), int.from_bytes(block[4:8], 'big'),
+        int.from_bytes(block[8:12], 'big'), int.from_bytes(block[12:16], 'big'),
+    )
+
+
+def _pack(words):
+    return b''.join(w.to_bytes(4, 'big') for w in words)
+
+
+def _python_cbc(key, iv, data, encrypt):
+    enc, dec = _round_keys(key)
+    prev = _words(iv)
+    out = []
+    for i in range(0, len(data), BLOCK_SIZE):
+        block = _words(data[i:i + BLOCK_SIZE])
+        if encrypt:
+            prev = _encrypt_block(enc, *(b ^ p for b, p in zip(block, prev)))
+            out.append(_pack(prev))
+        else:
+            plain = _decrypt_block(dec, *block)
+            out.append(_pack(p ^ c for p, c in zip(plain, prev)))
+            prev = block
+    return b''.join(out)
+
+
+# 后端
+
+def _cryptography_cbc(key, iv, data, encrypt):
+    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
+    ctx = cipher.encryptor() if encrypt else cipher.decryptor()
+    return ctx.update(data) + ctx.finalize()
+
+
+def _pycryptodome_cbc(key, iv, data, encrypt):
+    cipher = _PyCryptodomeAES.new(key, _PyCryptodomeAES.MODE_CBC, iv)
+    return cipher.encrypt(data) if encrypt else cipher.decrypt(data)
+
+
+_BACKENDS = {
+    'cryptography': _cryptography_cbc if Cipher is not None else None,
+    'pycryptodome': _pycryptodome_cbc if _PyCryptodomeAES is not None else None,
+    'python': _python_cbc,
+}
+
+
+def available_backends():
+    """当前环境可用的后端"""
+    return [name for name in BACKENDS if _BACKENDS[name] is not None]
+
+
+def resolve_backend(name=None):
+    """返回后端名: auto 时取第一个可用的, 指定的后端不可用时同样退回"""
+    name = name or CRYPTO_BACKEND
+    if _BACKENDS.get(name) is not None:
+        return name
+    if name != 'auto':
+        logger.warning('AES后端 %s 不可用, 自动选择', name)
+    name = available_backends()[0]
+    if name == 'python':
+        logger.warning('未安装 cryptography(见 requirements.txt), 使用纯Python AES实现')
+    return name
+
+
+backend = resolve_backend()
+
+
+# Node退回
+
+_NODE_SOURCE = """
+const crypto = require('crypto')
+function cbc(mode, encrypt, dataB64, keyB64, ivB64) {
+  const key = Buffer.from(keyB64, 'base64')
+  const iv = Buffer.from(ivB64, 'base64')
+  const c = encrypt ? crypto.createCipheriv(mode, key, iv) : crypto.createDecipheriv(mode, key, iv)
+  c.setAutoPadding(true)
+  return Buffer.concat([c.update(Buffer.from(dataB64, 'base64')), c.final()]).toString('base64')
+}
+"""
+_node_lock = threading.Lock()
+_node_ctx = None
+
+
+def _node_cbc(key, iv, data, encrypt):
+    """通过 execjs 调用Node(含PKCS7填充), 上下文只编译一次"""
+    global _node_ctx
+    if execjs is None:
+        raise RuntimeError('未安装 PyExecJS')
+    if _node_ctx is None:
+        with _node_lock:
+            if _node_ctx is None:
+                _node_ctx = execjs.compile(_NODE_SOURCE)
+    b64 = lambda b: base64.b64encode(b).decode('ascii')
+    result = _node_ctx.call('cbc', f'aes-{len(key) * 8}-cbc', encrypt, b64(data), b64(key), b64(iv))
+    return base64.b64decode(result)
+
+
+# 接口
+
+def _to_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else bytes(value)
+
+
+def _check(key, iv, bits):
+    if len(key) not in KEY_SIZES or (bits and len(key) * 8 != bits):
+        raise ValueError(f'AES密钥长度无效: {len(key)} 字节')
+    if len(iv) != BLOCK_SIZE:
+        raise ValueError(f'AES IV长度无效: {len(iv)} 字节')
+
+
+def pkcs7_pad(data):
+    size = BLOCK_SIZE - len(data) % BLOCK_SIZE
+    return data + bytes([size]) * size
+
+
+def pkcs7_unpad(data):
+    if not data or len(data) % BLOCK_SIZE:
+        raise ValueError('密文长度不是16的倍数')
+    size = data[-1]
+    if not 1 <= size <= BLOCK_SIZE or data[-size:] != bytes([size]) * size:
+        raise ValueError('PKCS7填充错误')
+    return data[:-size]
+
+
+def _run(key, iv, data, encrypt):
+    cbc = _BACKENDS[backend]
+    try:
+        if encrypt:
+            return cbc(key, iv, pkcs7_pad(data), True)
+        if not data or len(data) % BLOCK_SIZE:
+            raise ValueError('密文长度不是16的倍数')
+        return pkcs7_unpad(cbc(key, iv, data, False))
+    except Exception as e:
+        if not CRYPTO_NODE_FALLBACK:
+            raise
+        logger.warning('进程内AES(%s)失败, 使用Node重试: %s', backend, e)
+        return _node_cbc(key, iv, data, encrypt)
+
+
+def encrypt(plaintext, key, iv, bits=None):
+    """
+    AES-CBC + PKCS7 加密, 返回密文bytes
+
+    plaintext/key/iv 可以是 str(按UTF-8编码)或 bytes; bits 指定时(128/192/256)校验密钥长度,
+    对应Node的 'aes-<bits>-cbc'
+    """
+    key, iv = _to_bytes(key), _to_bytes(iv)
+    _check(key, iv, bits)
+    return _run(key, iv, _to_bytes(plaintext), True)
+
+
+def decrypt(ciphertext, key, iv, bits=None):
+    """AES-CBC 解密并去掉PKCS7填充, 返回明文bytes; 参数同 encrypt"""
+    key, iv = _to_bytes(key), _to_bytes(iv)
+    _check(key, iv, bits)
+    return _run(key, iv, bytes(ciphertext), False)
+
+
+def encrypt_hex(plaintext, key, iv, bits=None):
+    """加密并返回小写十六进制"""
+    return encrypt(plaintext, key, iv, bits).hex()
+
+
+def decrypt_base64(ciphertext_b64, key, iv, bits=None):
+    """解密base64密文, 返回UTF-8文本; 与Node一致, 缺少的 '=' 补齐, 无效的UTF-8字节替换为 U+FFFD"""
+    text = ''.join(str(ciphertext_b64).split())
+    data = base64.b64decode(text + '=' * (-len(text) % 4))
+    return decrypt(data, key, iv, bits).decode('utf-8', errors='replace')
@@ -6,14 +6,58 @@
 
 import re
 import logging
-import asyncio
 import aiohttp
 from urllib.parse import quote, unquote
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .async_loop import async_loop
+from .deadline import is_expired
+from .html_parser import parse_html
+from .parse_executor import parse_executor
 
 logger = logging.getLogger(__name__)
 
+# 单个页面请求的超时
+PAGE_TIMEOUT = aiohttp.ClientTimeout(total=30)
+# 单页只解析主图片所在的区域
+PAGE_REGION = 'article'
+
+
+def extract_page_image(html, chapter_id, page_num, parser=None):
+    """
+    从单页HTML中提取主图片, 返回 {'page', 'url'}, 找不到时返回None
+
+    模块级纯函数, 可交给解析执行器(线程池/进程池)执行; 只解析 article 区域
+    """
+    page_soup = parse_html(html, parser, only=PAGE_REGION)
+    
+    # 查找article内的主图片
+    article = page_soup.find('article')
+    if article:
+        # 查找id='comic'的img标签
+        img = article.find('img', id='comic')
+        if img:
+            img_url = img.get('src', '') or img.get('data-src', '')
+            if img_url and img_url.startswith('http'):
+                return {
+                    'page': page_num,
+                    'url': img_url
+                }
+    
+        # 如果没找到，尝试查找包含链接内的img
+        img_link = article.find('a', href=re.compile(rf'/manga/{chapter_id}/\d+'))
+        if img_link:
+            img = img_link.find('img')
+            if img:
+                img_url = img.get('src', '') or img.get('data-src', '')
+                if img_url and img_url.startswith('http'):
+                    return {
+                        'page': page_num,
+                        'url': img_url
+                    }
+    
+    logger.warning(f"第{page_num}页未找到图片")
+    return None
+
 
 class AnimezillaScraper(BaseScraper):
     """18H Animezilla漫画网爬虫"""
@@ -114,7 +158,7 @@ class AnimezillaScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             comics = self._parse_comic_list(soup, limit)
             
             # 解析分页
@@ -151,7 +195,7 @@ class AnimezillaScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             comics = self._parse_comic_list(soup, limit)
             
             # 检查是否有下一页
@@ -194,7 +238,7 @@ class AnimezillaScraper(BaseScraper):
             if not response:
                 return {'categories': []}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             categories = []
             seen_ids = set()
             
@@ -264,7 +308,7 @@ class AnimezillaScraper(BaseScraper):
                 # 如果标签搜索失败，尝试返回空结果
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             comics = self._parse_comic_list(soup, limit)
             
             has_more = len(comics) >= limit
@@ -290,7 +334,7 @@ class AnimezillaScraper(BaseScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 标题
             h1 = soup.find('h1')
@@ -412,7 +456,7 @@ class AnimezillaScraper(BaseScraper):
             if not response:
                 return {'images': [], 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             images = []
             
             # 从标题中提取总页数
@@ -453,13 +497,14 @@ class AnimezillaScraper(BaseScraper):
             
             # 使用异步并发获取所有页面的图片URL
             logger.info(f"开始并发获取{total_pages}张图片...")
-            images = asyncio.run(self._fetch_images_async(chapter_id, total_pages))
+            images = async_loop.run(self._fetch_images_async(chapter_id, total_pages))
             
             logger.info(f"获取到{len(images)}张图片")
             
             return {
                 'images': images,
-                'total': len(images)
+                'total': len(images),
+                'expected_total': total_pages
             }
         except Exception as e:
             logger.error(f"获取章节图片失败: {e}", exc_info=True)
@@ -469,31 +514,34 @@ class AnimezillaScraper(BaseScraper):
         """异步并发获取所有页面的图片URL"""
         images = []
         
-        # 创建异步HTTP会话，复用session的cookie
-        connector = aiohttp.TCPConnector(limit=10)  # 最多10个并发连接
-        timeout = aiohttp.ClientTimeout(total=30)
+        # 使用后台循环上的持久会话(复用连接), 每批最多10个并发请求
+        session = await async_loop.session(self.base_url)
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            # 创建所有页面的任务
-            tasks = []
-            for page_num in range(1, total_pages + 1):
-                task = self._fetch_single_page_image(session, chapter_id, page_num)
-                tasks.append(task)
-            
-            # 并发执行所有任务，每10个打印一次进度
-            for i in range(0, len(tasks), 10):
-                batch = tasks[i:i+10]
-                results = await asyncio.gather(*batch, return_exceptions=True)
-                
-                for result in results:
-                    if isinstance(result, dict) and result:
-                        images.append(result)
-                    elif isinstance(result, Exception):
-                        logger.warning(f"获取页面失败: {result}")
-                
-                # 打印进度
-                current = min(i + 10, total_pages)
-                logger.info(f"进度: {current}/{total_pages} ({int(current/total_pages*100)}%)")
+        # 创建所有页面的任务
+        tasks = []
+        for page_num in range(1, total_pages + 1):
+            task = self._fetch_single_page_image(session, chapter_id, page_num)
+            tasks.append(task)
+        
+        # 并发执行所有任务，每10个打印一次进度; 请求期限用完时返回已获取的部分
+        for i in range(0, len(tasks), 10):
+            if is_expired():
+                logger.warning(f"请求期限已用完, 返回已获取的 {len(images)}/{total_pages} 页")
+                for task in tasks[i:]:
+                    task.close()
+                break
+            batch = tasks[i:i+10]
+            results = await async_loop.gather_partial(batch)
+            
+            for result in results:
+                if isinstance(result, dict) and result:
+                    images.append(result)
+                elif isinstance(result, Exception):
+                    logger.warning(f"获取页面失败: {result}")
+            
+            # 打印进度
+            current = min(i + 10, total_pages)
+            logger.info(f"进度: {current}/{total_pages} ({int(current/total_pages*100)}%)")
         
         # 按页码排序
         images.sort(key=lambda x: x['page'])
@@ -508,42 +556,16 @@ class AnimezillaScraper(BaseScraper):
             headers = self.session.headers.copy()
             cookies = {cookie.name: cookie.value for cookie in self.session.cookies}
             
-            async with session.get(page_url, headers=headers, cookies=cookies, ssl=False) as response:
+            async with session.get(page_url, headers=headers, cookies=cookies, ssl=False, timeout=PAGE_TIMEOUT) as response:
                 if response.status != 200:
                     logger.warning(f"第{page_num}页请求失败: HTTP {response.status}")
                     return None
                 
                 html = await response.text()
-                page_soup = BeautifulSoup(html, 'html.parser')
-                
-                # 查找article内的主图片
-                article = page_soup.find('article')
-                if article:
-                    # 查找id='comic'的img标签
-                    img = article.find('img', id='comic')
-                    if img:
-                        img_url = img.get('src', '') or img.get('data-src', '')
-                        if img_url and img_url.startswith('http'):
-                            return {
-                                'page': page_num,
-                                'url': img_url
-                            }
-                    
-                    # 如果没找到，尝试查找包含链接内的img
-                    img_link = article.find('a', href=re.compile(rf'/manga/{chapter_id}/\d+'))
-                    if img_link:
-                        img = img_link.find('img')
-                        if img:
-                            img_url = img.get('src', '') or img.get('data-src', '')
-                            if img_url and img_url.startswith('http'):
-                                return {
-                                    'page': page_num,
-                                    'url': img_url
-                                }
-                
-                logger.warning(f"第{page_num}页未找到图片")
-                return None
-                
+            
+            # 连接释放后再解析; 建树与查找交给解析执行器, 不占用事件循环
+            return await parse_executor.run(extract_page_image, html, chapter_id, page_num, self.html_parser)
+            
         except Exception as e:
             logger.error(f"获取第{page_num}页图片失败: {e}")
             return None
@@ -555,7 +577,7 @@ class AnimezillaScraper(BaseScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 查找主图片
             article = soup.find('article')
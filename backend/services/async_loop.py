@@ -0,0 +1,146 @@
+"""
+共享后台事件循环
+
+异步爬虫原来在每个Flask请求里 asyncio.run(), 每次都新建事件循环、连接器和会话,
+请求结束即全部销毁, TLS会话与keep-alive连接无法复用。这里:
+
+- 进程内只有一个常驻事件循环线程, 首次使用时启动, 进程退出时关闭
+- 按host保存持久的 aiohttp.ClientSession, 并发的章节请求共用连接
+- 同步代码通过 run() 把协程提交到该循环并等待结果
+
+会话使用 DummyCookieJar, Cookie由调用方逐个请求传入, 避免不同站点/实例的Cookie互相串用。
+run() 把调用方的请求期限带进事件循环, gather_partial() 在期限用完时返回已完成的部分结果
+"""
+import atexit
+import asyncio
+import logging
+import threading
+import aiohttp
+from config import ASYNC_HTTP_LIMIT, ASYNC_HTTP_LIMIT_PER_HOST
+from services.rate_limiter import normalize_host
+from services.deadline import bind, current_deadline, remaining
+
+logger = logging.getLogger(__name__)
+
+# 期限用完后给协程收尾(返回部分结果)的时间(秒)
+DEADLINE_GRACE = 1.0
+
+
+class AsyncLoop:
+    """常驻事件循环线程及其上的持久HTTP会话"""
+
+    def __init__(self, limit=ASYNC_HTTP_LIMIT, limit_per_host=ASYNC_HTTP_LIMIT_PER_HOST):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        # host -> ClientSession, 只在事件循环线程内访问
+        self._sessions = {}
+
+    @property
+    def loop(self):
+        """返回运行中的事件循环, 未启动时启动"""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=self._run_forever, args=(loop,), name='async-loop', daemon=True
+                    )
+                    thread.start()
+                    self._thread = thread
+                    self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _run_forever(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def run(self, coro, timeout=None):
+        """
+        在后台循环中执行协程并阻塞等待结果, 供Flask视图等同步代码调用
+
+        超时后取消协程并抛出 concurrent.futures.TimeoutError;
+        未指定 timeout 时以当前请求期限的剩余时间为准
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError('不能在事件循环线程内同步等待协程')
+        deadline = current_deadline()
+        if deadline is not None:
+            if timeout is None:
+                timeout = deadline.remaining() + DEADLINE_GRACE
+            coro = bind(coro, deadline)
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    @staticmethod
+    async def gather_partial(coros, timeout=None):
+        """
+        并发执行协程, 最多等待 timeout 秒(默认为当前请求期限的剩余时间)
+
+        返回与 coros 顺序一致的列表: 正常结果、异常对象, 超时未完成的为None(已取消)
+        """
+        tasks = [asyncio.ensure_future(coro) for coro in coros]
+        if not tasks:
+            return []
+        if timeout is None:
+            timeout = remaining()
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.info('等待超时, %d/%d 个任务未完成', len(pending), len(tasks))
+            await asyncio.wait(pending)
+        results = []
+        for task in tasks:
+            if task in pending:
+                results.append(None)
+            elif task.exception() is not None:
+                results.append(task.exception())
+            else:
+                results.append(task.result())
+        return results
+
+    async def session(self, url):
+        """获取该host的持久会话, 需在事件循环内调用"""
+        host = normalize_host(url)
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+            self._sessions[host] = session
+        return session
+
+    async def _close_sessions(self):
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+    def close(self):
+        """关闭所有会话并停止事件循环"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), loop).result(5)
+        except Exception as e:
+            logger.debug('关闭异步会话失败: %s', e)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+async_loop = AsyncLoop()
+atexit.register(async_loop.close)
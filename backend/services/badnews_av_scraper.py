@@ -1,6 +1,5 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote, unquote
 from .base_video_scraper import BaseVideoScraper
 
@@ -54,7 +53,7 @@ class BadNewsAVScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -172,7 +171,7 @@ class BadNewsAVScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title = ''
@@ -293,7 +292,7 @@ class BadNewsAVScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title = ''
@@ -387,7 +386,7 @@ class BadNewsAVScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -407,7 +406,7 @@ class BadNewsAVScraper(BaseVideoScraper):
             if not response:
                 return tags
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 查找所有标签链接
             tag_links = soup.find_all('a', href=re.compile(r'/av/search/(type-tags/)?q-.+'))
@@ -457,7 +456,7 @@ class BadNewsAVScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -1,6 +1,5 @@
 import re
 import logging
-from bs4 import BeautifulSoup
 from urllib.parse import quote
 
 from .base_video_scraper import BaseVideoScraper
@@ -37,7 +36,7 @@ class BadNewsOriginalVideoScraper(BaseVideoScraper):
         if not response:
             return []
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         return self._parse_video_list_from_soup(soup, limit)
 
     def get_video_detail(self, video_id):
@@ -49,7 +48,7 @@ class BadNewsOriginalVideoScraper(BaseVideoScraper):
         if not response:
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         container = self._find_topic_container_by_id(soup, video_id)
         if not container:
             return None
@@ -102,7 +101,7 @@ class BadNewsOriginalVideoScraper(BaseVideoScraper):
         if not response:
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         container = self._find_topic_container_by_id(soup, episode_id)
         if not container:
             logger.error('未找到匹配的内容容器 episode_id=%s url=%s', episode_id, url)
@@ -137,7 +136,7 @@ class BadNewsOriginalVideoScraper(BaseVideoScraper):
         if not response:
             return []
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         return self._parse_video_list_from_soup(soup, limit)
 
     def _build_tag_url(self, category_id, page):
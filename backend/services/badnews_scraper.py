@@ -1,6 +1,5 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote, unquote
 from .base_video_scraper import BaseVideoScraper
 
@@ -53,7 +52,7 @@ class BadNewsScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -152,7 +151,7 @@ class BadNewsScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title = ''
@@ -256,7 +255,7 @@ class BadNewsScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title = ''
@@ -350,7 +349,7 @@ class BadNewsScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -370,7 +369,7 @@ class BadNewsScraper(BaseVideoScraper):
             if not response:
                 return tags
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 查找所有标签链接
             tag_links = soup.find_all('a', href=re.compile(r'/dm/search/q-.+/type-tag'))
@@ -420,7 +419,7 @@ class BadNewsScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
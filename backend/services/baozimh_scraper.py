@@ -7,14 +7,18 @@
 import re
 import logging
 from urllib.parse import quote, urljoin
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .mirrors import hedged_fetch, get_mirrors
 
 logger = logging.getLogger(__name__)
 
 
 class BaozimhScraper(BaseScraper):
     """包子漫画爬虫"""
+
+    # 只解析用到的区域: 列表页的漫画卡片链接, 目录页的章节链接
+    COMIC_LIST_REGION = 'a[href^="/comic/"]'
+    CHAPTER_LIST_REGION = 'a[href*="chapter_slot"]'
     
     def __init__(self, proxy_config=None):
         super().__init__('https://www.baozimh.com', proxy_config)
@@ -242,7 +246,7 @@ class BaozimhScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.COMIC_LIST_REGION)
             comics = self._parse_comic_list(soup, limit)
             
             has_more = len(comics) >= limit
@@ -268,7 +272,7 @@ class BaozimhScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.COMIC_LIST_REGION)
             comics = self._parse_comic_list(soup, limit)
             
             # 根据页码跳过部分漫画
@@ -299,7 +303,7 @@ class BaozimhScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.COMIC_LIST_REGION)
             comics = self._parse_comic_list(soup, limit * page)
             
             # 分页
@@ -333,7 +337,7 @@ class BaozimhScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.COMIC_LIST_REGION)
             comics = self._parse_comic_list(soup, limit)
             
             return {
@@ -357,7 +361,7 @@ class BaozimhScraper(BaseScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 从meta标签提取数据（包子漫画使用Vue.js动态渲染，需要从meta获取）
             # 书名: og:novel:book_name
@@ -443,7 +447,8 @@ class BaozimhScraper(BaseScraper):
             if not response:
                 return {'chapters': [], 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # 页面上没有 chapter_slot 链接时退回完整解析, 下面的备用选择器仍然可用
+            soup = self._parse_html(response.text, only=self.CHAPTER_LIST_REGION)
             chapters = []
             
             # 查找章节链接 - 包子漫画的章节链接格式
@@ -505,12 +510,6 @@ class BaozimhScraper(BaseScraper):
     def get_chapter_images(self, chapter_id):
         """获取章节图片列表"""
         try:
-            # 先访问首页获取Cookie
-            logger.info("访问首页获取Cookie...")
-            home_response = self._make_request(self.base_url)
-            if home_response:
-                logger.info("成功获取首页Cookie")
-            
             # 解析chapter_id: comic_id_slot
             parts = chapter_id.rsplit('_', 1)
             if len(parts) != 2:
@@ -519,34 +518,23 @@ class BaozimhScraper(BaseScraper):
             
             comic_id, slot = parts
             
-            # 优先使用twbzmg.com的章节页面（图片直接在HTML中）
-            # URL格式: https://www.twbzmg.com/comic/chapter/{comic_id}/0_{slot}.html
-            twbzmg_url = f'https://www.twbzmg.com/comic/chapter/{comic_id}/0_{slot}.html'
-            logger.info(f"请求章节图片(twbzmg): {twbzmg_url}")
+            # 章节页有twbzmg.com(图片直接在HTML中)和baozimh的page_direct两个镜像,
+            # 按最近表现排序, 领先的镜像响应慢时同时请求另一个, 先返回的胜出
+            def fetch_mirror(mirror):
+                url = mirror['url'].format(comic_id=comic_id, slot=slot)
+                logger.info(f"请求章节图片({mirror['name']}): {url}")
+                # Referer按请求传入, 不修改共享会话的请求头
+                # 首页Cookie按站点共享, 过期或被拒绝时才重新访问首页
+                return self._make_warm_request(url, headers={'Referer': mirror['referer']})
             
-            # 更新Referer为twbzmg.com
-            original_referer = self.session.headers.get('Referer', '')
-            self.session.headers.update({'Referer': 'https://www.twbzmg.com/'})
+            mirror, response = hedged_fetch(get_mirrors('baozimh', 'chapter'), fetch_mirror)
+            if not response:
+                return {'images': [], 'total': 0}
             
-            try:
-                response = self._make_request(twbzmg_url)
-            finally:
-                # 恢复原始Referer
-                if original_referer:
-                    self.session.headers.update({'Referer': original_referer})
-            
-            if not response or response.status_code != 200:
-                # 备用: baozimh的page_direct页面
-                url = f'{self.base_url}/user/page_direct?comic_id={comic_id}&section_slot=0&chapter_slot={slot}'
-                logger.info(f"尝试备用URL(baozimh): {url}")
-                response = self._make_request(url)
-                if not response:
-                    return {'images': [], 'total': 0}
-            
-            logger.info(f"响应状态码: {response.status_code}")
+            logger.info(f"使用镜像: {mirror['name']}, 响应状态码: {response.status_code}")
             logger.info(f"响应内容长度: {len(response.text)}")
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             images = []
             seen_urls = set()
             
@@ -1,34 +1,774 @@
 import json
+import sys
+import time
+import gzip
+import heapq
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from functools import wraps
 import os
-from flask import request
+from flask import request, Response, current_app, g, has_request_context
+from config import (
+    CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_BACKEND, CACHE_KEY_PREFIX,
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD,
+    CACHE_TTL_POLICY, CACHE_OUTCOME_TTL, CACHE_SINGLE_FLIGHT_WAIT, CACHE_REFRESH_WORKERS,
+    CACHE_DISK_ENABLED, CACHE_DISK_PATH, CACHE_DISK_MAX_BYTES, CACHE_DISK_PREFIXES,
+    CACHE_COMPRESS_MIN_BYTES
+)
+from services.disk_cache import DiskCache
+from services.cache_codec import dump_value, load_value
+from services.cache_stats import CacheStats
+from services.deadline import current_deadline
 
-# 简单的内存缓存实现
-_cache = {}
+try:
+    import brotli
+except ImportError:  # brotli 缺失时退回gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def _key_prefix(key):
+    return key.split(':', 1)[0]
+
+
+def _estimate_size(value):
+    """粗略估算缓存值占用的字节数, 用于容量控制"""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8', errors='ignore'))
+    # Flask Response 对象, 以响应体长度为准
+    if hasattr(value, 'get_data'):
+        try:
+            return len(value.get_data())
+        except Exception:
+            return sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class MemoryCache:
+    """
+    线程安全的进程内LRU缓存
+
+    - 每条缓存独立过期时间(timeout<=0 表示不过期), 过期条目在读取时删除
+    - 按条目数与字节数双重限制总容量, 超出时直接从LRU末端淘汰, 每次写入 O(1)
+    - 超出容量时最多每 SWEEP_INTERVAL 秒全量清理一次过期条目, 优先腾出过期条目占用的空间
+    """
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expire_at, size)
+        self._data = OrderedDict()
+        self._bytes = 0
+        # 标签索引: tag -> {key}, key -> (tag, ...)
+        self._tag_index = {}
+        self._key_tags = {}
+        # 按前缀统计的淘汰/过期次数
+        self._evictions = {}
+        self._expirations = {}
+        self._swept_at = 0.0
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expire_at, _ = entry
+            if expire_at and expire_at <= time.time():
+                self._remove(key)
+                self._count(self._expirations, key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=3600, tags=None):
+        size = _estimate_size(value)
+        # 单条超过总容量时直接放弃缓存, 避免把其他条目全部挤出去
+        if self.max_bytes and size > self.max_bytes:
+            self.delete(key)
+            return False
+
+        expire_at = time.time() + timeout if timeout and timeout > 0 else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expire_at, size)
+            self._bytes += size
+            if tags:
+                self._key_tags[key] = tuple(tags)
+                for tag in tags:
+                    self._tag_index.setdefault(tag, set()).add(key)
+            self._evict()
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def invalidate_tag(self, tag):
+        """删除带有该标签的全部条目, 返回删除数量"""
+        with self._lock:
+            keys = list(self._tag_index.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tag_index.clear()
+            self._key_tags.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _over_budget(self):
+        if self.max_entries and len(self._data) > self.max_entries:
+            return True
+        if self.max_bytes and self._bytes > self.max_bytes:
+            return True
+        return False
+
+    def _evict(self):
+        """超出容量时按最久未使用淘汰; 全量清理过期条目按间隔摊销, 不在每次写入时扫描"""
+        if not self._over_budget():
+            return
+        now = time.time()
+        if now - self._swept_at >= self.SWEEP_INTERVAL:
+            self._swept_at = now
+            expired = [k for k, (_, exp, _) in self._data.items() if exp and exp <= now]
+            for key in expired:
+                self._remove(key)
+                self._count(self._expirations, key)
+        while self._data and self._over_budget():
+            key, (_, expire_at, _) = next(iter(self._data.items()))
+            self._remove(key)
+            self._count(self._expirations if expire_at and expire_at <= now else self._evictions, key)
+
+    @staticmethod
+    def _count(counter, key):
+        prefix = _key_prefix(key)
+        counter[prefix] = counter.get(prefix, 0) + 1
+
+    def describe(self, top_n=20):
+        """当前容量、按前缀的条目数/字节数与最大的若干条目"""
+        with self._lock:
+            prefixes = {}
+            for key, (_, _, size) in self._data.items():
+                item = prefixes.setdefault(_key_prefix(key), {'entries': 0, 'bytes': 0})
+                item['entries'] += 1
+                item['bytes'] += size
+            largest = heapq.nlargest(top_n, ((size, key) for key, (_, _, size) in self._data.items()))
+            return {
+                'backend': 'memory',
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'prefixes': prefixes,
+                'evictions': dict(self._evictions),
+                'expirations': dict(self._expirations),
+                'largest': [{'key': key, 'size': size} for size, key in largest],
+            }
+
+
+class RedisCache:
+    """
+    Redis缓存后端, 多个worker进程共享同一份缓存
+
+    值在写入时序列化为JSON一次(见 dump_value), 键统一加命名空间前缀; Redis不可用或
+    值无法解析时按未命中处理, 不影响接口本身
+    """
+
+    def __init__(self, client=None, namespace=CACHE_KEY_PREFIX):
+        if client is None:
+            import redis
+            client = redis.Redis(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                password=REDIS_PASSWORD,
+                socket_timeout=2,
+                socket_connect_timeout=2,
+            )
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key):
+        return f'{self.namespace}{key}'
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception as e:
+            logger.warning('读取Redis缓存失败: %s', e)
+            return None
+        if raw is None:
+            return None
+        try:
+            return load_value(raw)
+        except (ValueError, TypeError):
+            return None
+
+    def _tag_key(self, tag):
+        return f'{self.namespace}tag:{tag}'
+
+    def set(self, key, value, timeout=3600, tags=None):
+        try:
+            data = dump_value(value)
+            if timeout and timeout > 0:
+                # Redis 拒绝 ex=0, 不足1秒的剩余有效期按1秒计
+                timeout = max(1, int(timeout))
+                self.client.set(self._key(key), data, ex=timeout)
+            else:
+                self.client.set(self._key(key), data)
+            for tag in tags or ():
+                tag_key = self._tag_key(tag)
+                self.client.sadd(tag_key, self._key(key))
+                # 标签集合至少与其中最长的条目一样久, 过期的成员在失效时顺带删除
+                if timeout and timeout > 0 and self.client.ttl(tag_key) < timeout:
+                    self.client.expire(tag_key, timeout)
+            return True
+        except Exception as e:
+            logger.warning('写入Redis缓存失败: %s', e)
+            return False
+
+    def invalidate_tag(self, tag):
+        """删除带有该标签的全部条目, 返回删除数量"""
+        try:
+            tag_key = self._tag_key(tag)
+            keys = list(self.client.smembers(tag_key))
+            deleted = self.client.delete(*keys) if keys else 0
+            self.client.delete(tag_key)
+            return deleted
+        except Exception as e:
+            logger.warning('按标签清理Redis缓存失败: %s', e)
+            return 0
+
+    def delete(self, key):
+        try:
+            return bool(self.client.delete(self._key(key)))
+        except Exception as e:
+            logger.warning('删除Redis缓存失败: %s', e)
+            return False
+
+    def describe(self, top_n=20):
+        """Redis只返回整体内存与淘汰信息, 不逐键扫描"""
+        info = {'backend': 'redis', 'namespace': self.namespace}
+        try:
+            memory = self.client.info('memory')
+            stats = self.client.info('stats')
+            info['used_memory'] = memory.get('used_memory')
+            info['evicted_keys'] = stats.get('evicted_keys')
+            info['expired_keys'] = stats.get('expired_keys')
+        except Exception as e:
+            info['error'] = str(e)
+        return info
+
+    def clear(self):
+        """只清理本命名空间下的键, 不影响同库其他数据"""
+        try:
+            keys = list(self.client.scan_iter(match=f'{self.namespace}*', count=500))
+            for i in range(0, len(keys), 500):
+                self.client.delete(*keys[i:i + 500])
+        except Exception as e:
+            logger.warning('清空Redis缓存失败: %s', e)
+
+
+class TieredCache:
+    """
+    两级缓存: 一级为内存/Redis, 二级为磁盘
+
+    只有键前缀在 disk_prefixes 中的条目才会写入磁盘; 一级未命中时从磁盘读取,
+    并按剩余有效期回填一级缓存
+    """
+
+    def __init__(self, primary, disk, disk_prefixes=()):
+        self.primary = primary
+        self.disk = disk
+        self.disk_prefixes = set(disk_prefixes)
+
+    def _on_disk(self, key):
+        return key.split(':', 1)[0] in self.disk_prefixes
+
+    def get(self, key):
+        value = self.primary.get(key)
+        if value is not None or not self._on_disk(key):
+            return value
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        value, expire_at, tags = entry
+        if expire_at:
+            remaining = expire_at - time.time()
+            if remaining < 1:
+                # 即将过期, 不再回填一级缓存
+                return value
+        else:
+            remaining = 0
+        self.primary.set(key, value, remaining, tags=tags)
+        return value
+
+    def set(self, key, value, timeout=3600, tags=None):
+        stored = self.primary.set(key, value, timeout, tags=tags)
+        if self._on_disk(key):
+            stored = self.disk.set(key, value, timeout, tags=tags) or stored
+        return stored
+
+    def invalidate_tag(self, tag):
+        return self.primary.invalidate_tag(tag) + self.disk.invalidate_tag(tag)
+
+    def describe(self, top_n=20):
+        return {
+            'backend': 'tiered',
+            'primary': self.primary.describe(top_n),
+            'disk': self.disk.describe(top_n),
+            'disk_prefixes': sorted(self.disk_prefixes),
+        }
+
+    def delete(self, key):
+        deleted = self.primary.delete(key)
+        if self._on_disk(key):
+            deleted = self.disk.delete(key) or deleted
+        return deleted
+
+    def clear(self):
+        self.primary.clear()
+        self.disk.clear()
+
+
+def _create_backend():
+    """
+    根据 CACHE_BACKEND 创建缓存后端, Redis连接失败时回退到内存缓存;
+    开启 CACHE_DISK_ENABLED 时在其下挂载磁盘二级缓存
+    """
+    backend = None
+    if CACHE_BACKEND == 'redis':
+        try:
+            backend = RedisCache()
+            backend.client.ping()
+            logger.info('使用Redis缓存: %s:%s/%s', REDIS_HOST, REDIS_PORT, REDIS_DB)
+        except Exception as e:
+            logger.warning('Redis不可用, 回退到内存缓存: %s', e)
+            backend = None
+    if backend is None:
+        backend = MemoryCache()
+
+    if CACHE_DISK_ENABLED:
+        try:
+            disk = DiskCache(CACHE_DISK_PATH, max_bytes=CACHE_DISK_MAX_BYTES)
+            logger.info('启用磁盘缓存: %s', CACHE_DISK_PATH)
+            return TieredCache(backend, disk, CACHE_DISK_PREFIXES)
+        except Exception as e:
+            logger.warning('磁盘缓存初始化失败, 仅使用一级缓存: %s', e)
+    return backend
+
+
+# 当前缓存后端实例
+_cache = _create_backend()
+# 缓存命中统计
+_stats = CacheStats()
+
+def set_cache_backend(backend):
+    """替换缓存后端(测试或自定义部署时使用)"""
+    global _cache
+    _cache = backend
+    return _cache
 
 def get_cache(key):
     """获取缓存"""
     return _cache.get(key)
 
-def set_cache(key, value, timeout=3600):
-    """设置缓存"""
-    _cache[key] = value
-    return True
+def set_cache(key, value, timeout=3600, tags=None):
+    """设置缓存, tags 用于之后按标签批量失效"""
+    return _cache.set(key, value, timeout, tags=tags)
 
 def delete_cache(key):
     """删除缓存"""
-    if key in _cache:
-        del _cache[key]
-        return True
-    return False
+    return _cache.delete(key)
 
 def clear_cache():
     """清空所有缓存"""
     _cache.clear()
     return True
 
-def cache_response(timeout=3600, key_prefix=''):
-    """缓存装饰器"""
+def get_cache_stats(top_n=20):
+    """缓存统计: 按前缀的命中计数、后端容量与最大条目、命中率最差的键"""
+    data = _stats.snapshot(top_n)
+    backend = _cache.describe(top_n)
+    for tier in (backend, backend.get('primary'), backend.get('disk')):
+        for item in (tier or {}).get('largest', []):
+            item['label'] = _stats.label(item['key'])
+    data['backend'] = backend
+    return data
+
+def invalidate_tags(tags):
+    """按标签批量失效缓存(任一标签匹配即删除), 返回删除数量"""
+    return sum(_cache.invalidate_tag(tag) for tag in tags)
+
+class _Call:
+    """一次正在进行中的计算"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    请求合并: 同一个键同时只允许一次计算, 其余调用方等待并复用其结果
+
+    只在当前进程内生效, 多进程部署时每个进程各自最多回源一次
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, wait_timeout=None):
+        """
+        执行或等待计算
+
+        返回 (result, is_leader); 等待超时时返回 (None, False)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait(wait_timeout)
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        self._run(key, call, fn)
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def do_async(self, key, fn, executor):
+        """在线程池中执行计算; 该键已有计算在进行时直接跳过, 返回是否提交"""
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = _Call()
+            self._calls[key] = call
+        try:
+            executor.submit(self._run, key, call, fn)
+        except Exception:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+            return False
+        return True
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def _run(self, key, call, fn):
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            logger.warning('缓存计算失败 key=%s err=%s', key, e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+_single_flight = SingleFlight()
+# 后台刷新过期缓存的线程池, 限制并发回源数量
+_refresh_executor = ThreadPoolExecutor(max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+
+
+def _resolve_ttl(timeout, key_prefix):
+    """
+    计算软/硬过期时间
+
+    soft 之前数据视为新鲜; soft 到 hard 之间直接返回旧数据并在后台刷新;
+    超过 hard 后缓存失效, 需要同步回源
+    """
+    policy = CACHE_TTL_POLICY.get(key_prefix, {})
+    soft = policy.get('soft', timeout)
+    hard = max(policy.get('hard', soft), soft)
+    return soft, hard
+
+
+def _snapshot_response(result, soft_ttl=None):
+    """
+    将视图返回值转换为可序列化的快照
+
+    视图通常返回 (Response, status), 缓存中只保留编码好的响应体字节、内容摘要(ETag)
+    与必要的元信息, 不再持有Flask Response对象
+    """
+    response, status = result, None
+    if isinstance(result, tuple) and result and isinstance(result[0], Response):
+        response = result[0]
+        status = result[1] if len(result) > 1 else None
+    if not isinstance(response, Response):
+        return None
+    body = response.get_data()
+    return {
+        'body': body,
+        'etag': hashlib.blake2b(body, digest_size=16).hexdigest(),
+        'status': int(status) if status is not None else response.status_code,
+        'mimetype': response.mimetype,
+        'fresh_until': time.time() + soft_ttl if soft_ttl else 0,
+    }
+
+
+def _compress_snapshot(snapshot):
+    """
+    写入缓存前压缩响应体, 只压缩一次
+
+    有brotli时用br, 否则用gzip; 过小的响应体不压缩
+    """
+    body = snapshot['body']
+    if snapshot.get('encoding') or len(body) < CACHE_COMPRESS_MIN_BYTES:
+        return snapshot
+    if brotli is not None:
+        encoded, encoding = brotli.compress(body, quality=5), 'br'
+    else:
+        encoded, encoding = gzip.compress(body, compresslevel=6), 'gzip'
+    if len(encoded) >= len(body):
+        return snapshot
+    return dict(snapshot, body=encoded, encoding=encoding)
+
+
+def _decompress_body(snapshot):
+    encoding = snapshot.get('encoding')
+    if encoding == 'br':
+        return brotli.decompress(snapshot['body'])
+    if encoding == 'gzip':
+        return gzip.decompress(snapshot['body'])
+    return snapshot['body']
+
+
+def response_json(result):
+    """
+    从视图返回值中读取JSON数据
+
+    兼容 (Response, status) 元组与缓存直接返回的(可能已压缩的) Response,
+    非200或非JSON时返回 None
+    """
+    response = result[0] if isinstance(result, tuple) and result else result
+    if not isinstance(response, Response) or response.status_code != 200:
+        return None
+    body = response.get_data()
+    encoding = response.headers.get('Content-Encoding')
+    if encoding in ('br', 'gzip'):
+        body = _decompress_body({'body': body, 'encoding': encoding})
+    try:
+        return json.loads(body)
+    except (ValueError, TypeError):
+        return None
+
+
+def _client_accepts(encoding):
+    try:
+        return encoding in request.accept_encodings
+    except RuntimeError:
+        return False
+
+
+def _is_fresh(snapshot):
+    fresh_until = snapshot.get('fresh_until', 0)
+    return not fresh_until or fresh_until > time.time()
+
+
+def _client_has_etag(etag):
+    """客户端 If-None-Match 是否已包含当前ETag"""
+    try:
+        return request.if_none_match.contains_weak(etag)
+    except RuntimeError:
+        return False
+
+
+def _serve_snapshot(snapshot):
+    """
+    直接用缓存快照构造响应
+
+    - 成功响应带上ETag, 客户端 If-None-Match 命中时返回无响应体的304
+    - 压缩过的响应体在客户端支持时原样返回并带 Content-Encoding, 否则解压后返回
+    """
+    etag = snapshot.get('etag')
+    encoding = snapshot.get('encoding')
+    if etag and snapshot['status'] == 200 and _client_has_etag(etag):
+        response = Response(status=304)
+    elif encoding and _client_accepts(encoding):
+        response = Response(snapshot['body'], status=snapshot['status'], mimetype=snapshot['mimetype'])
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = Response(_decompress_body(snapshot), status=snapshot['status'], mimetype=snapshot['mimetype'])
+    if encoding:
+        response.vary.add('Accept-Encoding')
+    if etag:
+        # 同一内容存在压缩/未压缩两种表示, 使用弱ETag
+        response.set_etag(etag, weak=bool(encoding))
+    return response
+
+
+# 判断"空结果"时检查的列表字段
+_RESULT_LIST_KEYS = ('images', 'chapters', 'comics', 'books', 'videos', 'episodes', 'results')
+
+
+def _classify_outcome(snapshot):
+    """
+    判断响应结果类型
+
+    - error: 非2xx状态码或响应体带 error 字段
+    - empty: 列表字段全部为空(爬虫失败时通常返回空列表)
+    - partial: total 小于 expected_total(部分页抓取失败), 或请求期限用完(结果被截断)
+    - ok: 正常结果
+    """
+    if snapshot['status'] >= 400:
+        return 'error'
+    try:
+        payload = json.loads(_decompress_body(snapshot))
+    except (ValueError, TypeError):
+        return 'ok'
+    if payload in (None, {}, []):
+        return 'empty'
+    if isinstance(payload, dict):
+        if payload.get('error'):
+            return 'error'
+        lists = [payload[key] for key in _RESULT_LIST_KEYS if isinstance(payload.get(key), list)]
+        if lists and not any(lists):
+            return 'empty'
+        total = payload.get('total')
+        expected_total = payload.get('expected_total')
+        if isinstance(total, int) and isinstance(expected_total, int) and total < expected_total:
+            return 'partial'
+    # 期限用完时爬虫返回已拿到的部分, 未必带 expected_total, 不能按完整结果缓存满硬过期时间
+    deadline = current_deadline()
+    if deadline is not None and (deadline.exceeded or deadline.expired):
+        return 'partial'
+    return 'ok'
+
+
+def _request_label(path, query_params):
+    """可读的缓存键描述, 用于统计展示"""
+    if not query_params:
+        return path
+    return path + '?' + '&'.join(f'{k}={v}' for k, v in sorted(query_params.items()))
+
+
+def _make_cache_key(key_prefix, func_name, path, args, kwargs, query_params):
+    """请求路径、视图参数与查询参数都纳入缓存键, 防止不同数据源/分页/查询条件串缓存"""
+    key_data = {
+        'prefix': key_prefix,
+        'func': func_name,
+        'path': path,
+        'args': args,
+        'kwargs': kwargs,
+        'query': query_params,
+    }
+    # 使用json确保键稳定, default=str 兜底不可序列化对象, 再取摘要缩短键长
+    raw_key = json.dumps(key_data, ensure_ascii=False, sort_keys=True, default=str)
+    return f"{key_prefix or func_name}:{hashlib.sha1(raw_key.encode('utf-8')).hexdigest()}"
+
+
+def _prefetching():
+    """当前是否在执行后台预读(见 services/prefetch.py)"""
+    return has_request_context() and bool(g.get('prefetching'))
+
+
+def _build_tags(key_prefix, kwargs, query_params, resolve_source=None):
+    """
+    生成缓存标签: 资源类型、数据源、路由中的资源ID
+
+    例如 type:images / source:baozimh / id:m12345; 数据源经 resolve_source 换成工厂实际使用的ID,
+    未传source的请求与显式指定默认数据源的请求带同一个标签; 无法确定时记为 source:default
+    """
+    tags = [f'type:{key_prefix}'] if key_prefix else []
+    source = query_params.get('source')
+    if resolve_source is not None:
+        try:
+            source = resolve_source(source)
+        except Exception as e:
+            logger.warning('解析缓存标签的数据源失败: %s', e)
+    tags.append(f"source:{source or 'default'}")
+    tags.extend(f'id:{value}' for value in kwargs.values())
+    return tags
+
+
+def _store_degraded(cache_key, snapshot, previous, hard_ttl, tags=None):
+    """
+    缓存异常/空/不完整结果
+
+    已有正常的旧数据时保留旧数据, 只把下次刷新推迟一个短周期, 避免上游故障期间反复回源;
+    旧数据仍按首次写入时的硬过期时间(expires_at)过期, 上游一直故障也不会无限期返回旧数据.
+    没有(或旧数据已到期)时按 CACHE_OUTCOME_TTL 短暂缓存, 配置为0则不缓存
+    """
+    ttl = CACHE_OUTCOME_TTL.get(snapshot['outcome'], 0)
+    if previous is not None and previous.get('outcome', 'ok') == 'ok':
+        now = time.time()
+        expires_at = previous.get('expires_at') or (now + hard_ttl if hard_ttl else 0)
+        if not expires_at or expires_at - now >= 1:
+            retry_after = ttl or CACHE_OUTCOME_TTL.get('error', 0)
+            kept = dict(previous, fresh_until=now + retry_after, expires_at=expires_at)
+            set_cache(cache_key, kept, expires_at - now if expires_at else hard_ttl, tags=tags)
+            return
+    if ttl > 0:
+        set_cache(cache_key, dict(snapshot, fresh_until=0), ttl, tags=tags)
+
+
+def cache_response(timeout=3600, key_prefix='', resolve_source=None):
+    """
+    缓存装饰器
+
+    resolve_source: 把请求的 source 参数(可能为None)换成爬虫工厂实际使用的数据源ID, 用于 source 标签
+
+    包装后的视图带有 is_cached(path, kwargs, query_params), 供预读判断目标是否已在缓存中且未软过期;
+    预读得到的异常/空/不完整结果不写缓存
+
+    - 缓存编码后的响应体与ETag, 支持 If-None-Match 返回304
+    - 响应体写入时压缩一次, 命中时按 Accept-Encoding 直接返回压缩数据
+    - 错误、空列表、不完整结果只短暂缓存(见 CACHE_OUTCOME_TTL)
+    - 同一缓存键并发未命中时只回源一次, 其余请求等待复用结果
+    - 配置了 CACHE_TTL_POLICY 的前缀在软过期后先返回旧数据, 后台刷新
+    """
+    soft_ttl, hard_ttl = _resolve_ttl(timeout, key_prefix)
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -41,26 +781,80 @@ def cache_response(timeout=3600, key_prefix=''):
                 query_params = {}
                 path = ''
 
-            key_data = {
-                'prefix': key_prefix,
-                'func': func.__name__,
-                'path': path,
-                'args': args,
-                'kwargs': kwargs,
-                'query': query_params,
-            }
-            # 使用json确保键稳定, default=str 兜底不可序列化对象
-            cache_key = json.dumps(key_data, ensure_ascii=False, sort_keys=True, default=str)
-            
+            cache_key = _make_cache_key(key_prefix, func.__name__, path, args, kwargs, query_params)
+            tags = _build_tags(key_prefix, kwargs, query_params, resolve_source)
+            stats_prefix = _key_prefix(cache_key)
+
+            def compute(previous=None):
+                # 执行函数并按结果类型缓存
+                result = func(*args, **kwargs)
+                snapshot = _snapshot_response(result, soft_ttl)
+                if snapshot is not None:
+                    snapshot['outcome'] = _classify_outcome(snapshot)
+                    snapshot = _compress_snapshot(snapshot)
+                    _stats.record_store(stats_prefix, len(snapshot['body']))
+                    if snapshot['outcome'] == 'ok':
+                        snapshot['expires_at'] = time.time() + hard_ttl if hard_ttl else 0
+                        set_cache(cache_key, snapshot, hard_ttl, tags=tags)
+                    elif _prefetching():
+                        # 预读让出配额而没拿全的结果留给读者的请求自己回源
+                        pass
+                    else:
+                        _store_degraded(cache_key, snapshot, previous, hard_ttl, tags)
+                return result, snapshot
+
             # 尝试从缓存获取
             cached_data = get_cache(cache_key)
             if cached_data is not None:
-                return cached_data
-            
-            # 执行函数并缓存结果
-            result = func(*args, **kwargs)
-            set_cache(cache_key, result, timeout)
-            
-            return result
+                fresh = _is_fresh(cached_data)
+                _stats.record_hit(stats_prefix, cache_key, stale=not fresh)
+                if not fresh:
+                    _schedule_refresh(cache_key, lambda: compute(cached_data))
+                return _serve_snapshot(cached_data)
+
+            # 跟随者最多等到本请求的期限
+            deadline = current_deadline()
+            wait_timeout = CACHE_SINGLE_FLIGHT_WAIT
+            if deadline is not None:
+                wait_timeout = min(wait_timeout, deadline.remaining())
+            outcome, leader = _single_flight.do(cache_key, compute, wait_timeout=wait_timeout)
+            if leader:
+                _stats.record_miss(stats_prefix, cache_key, _request_label(path, query_params))
+            else:
+                _stats.record_coalesced(stats_prefix, cache_key)
+            if outcome is None:
+                # 等待超时, 自行回源
+                outcome, leader = compute(), True
+            result, snapshot = outcome
+            if snapshot is not None:
+                return _serve_snapshot(snapshot)
+            if leader:
+                return result
+            # 结果不可缓存(无法共享), 跟随者自行执行
+            return func(*args, **kwargs)
+
+        def is_cached(path, kwargs, query_params):
+            cached = get_cache(_make_cache_key(key_prefix, func.__name__, path, (), kwargs, query_params))
+            return cached is not None and _is_fresh(cached)
+
+        wrapper.is_cached = is_cached
         return wrapper
     return decorator
+
+
+def _schedule_refresh(cache_key, compute):
+    """在后台线程中复制当前请求上下文刷新缓存, 同一键只刷新一次"""
+    if _single_flight.in_flight(cache_key):
+        return
+    try:
+        app = current_app._get_current_object()
+        environ = dict(request.environ)
+    except RuntimeError:
+        # 非请求上下文无法后台刷新, 等硬过期后同步回源
+        return
+
+    def refresh():
+        with app.request_context(environ):
+            return compute()
+
+    _single_flight.do_async(cache_key, refresh, _refresh_executor)
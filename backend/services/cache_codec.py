@@ -0,0 +1,33 @@
+"""
+缓存值的序列化
+
+Redis与磁盘缓存都可能被其他进程/主机写入, 值只按数据(JSON)解析, 不使用pickle,
+存储中的内容不会被当作代码执行:
+
+- 响应快照中的 bytes(响应体)以 {"__bytes__": base64} 保存
+- 元组读回为列表, 其他非JSON类型不能写入(TypeError)
+"""
+import json
+import base64
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f'不支持缓存的类型: {type(value).__name__}')
+
+
+def _json_object(obj):
+    if len(obj) == 1 and '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def dump_value(value):
+    """序列化为UTF-8编码的JSON"""
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def load_value(raw):
+    """dump_value 的逆操作; 内容无法解析时抛出 ValueError"""
+    return json.loads(raw, object_hook=_json_object)
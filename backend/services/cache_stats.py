@@ -0,0 +1,116 @@
+"""
+缓存统计
+
+按缓存前缀统计命中、未命中、过期命中、写入字节与值大小分布,
+并按键记录命中率, 供 /api/_debug/cache 查看
+"""
+import threading
+from collections import OrderedDict
+
+# 值大小分布的分桶上限(字节)
+SIZE_BUCKETS = (
+    ('<1KB', 1024),
+    ('<10KB', 10 * 1024),
+    ('<100KB', 100 * 1024),
+    ('<1MB', 1024 * 1024),
+    ('>=1MB', None),
+)
+
+EVENTS = ('hits', 'misses', 'stale_hits', 'coalesced', 'stores', 'bytes_written')
+
+
+def _size_bucket(size):
+    for name, limit in SIZE_BUCKETS:
+        if limit is None or size < limit:
+            return name
+    return SIZE_BUCKETS[-1][0]
+
+
+class CacheStats:
+    """线程安全的缓存计数器, 按键统计的数量有上限, 超出后丢弃最久未更新的键"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._prefixes = {}
+        # key -> {'label', 'hits', 'misses'}
+        self._keys = OrderedDict()
+
+    def _prefix(self, prefix):
+        stats = self._prefixes.get(prefix)
+        if stats is None:
+            stats = dict.fromkeys(EVENTS, 0)
+            stats['size_histogram'] = dict.fromkeys((name for name, _ in SIZE_BUCKETS), 0)
+            self._prefixes[prefix] = stats
+        return stats
+
+    def _key(self, key, label=None):
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = {'label': label or key, 'hits': 0, 'misses': 0}
+            self._keys[key] = entry
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+            if label:
+                entry['label'] = label
+        return entry
+
+    def record_hit(self, prefix, key, stale=False):
+        with self._lock:
+            self._prefix(prefix)['stale_hits' if stale else 'hits'] += 1
+            self._key(key)['hits'] += 1
+
+    def record_miss(self, prefix, key, label=None):
+        with self._lock:
+            self._prefix(prefix)['misses'] += 1
+            self._key(key, label)['misses'] += 1
+
+    def record_coalesced(self, prefix, key):
+        """并发未命中时等待他人结果的请求"""
+        with self._lock:
+            self._prefix(prefix)['coalesced'] += 1
+            self._key(key)['hits'] += 1
+
+    def record_store(self, prefix, size):
+        with self._lock:
+            stats = self._prefix(prefix)
+            stats['stores'] += 1
+            stats['bytes_written'] += size
+            stats['size_histogram'][_size_bucket(size)] += 1
+
+    def label(self, key):
+        with self._lock:
+            entry = self._keys.get(key)
+            return entry['label'] if entry else None
+
+    def reset(self):
+        with self._lock:
+            self._prefixes.clear()
+            self._keys.clear()
+
+    def snapshot(self, top_n=20):
+        """返回按前缀的计数与命中率最差的键"""
+        with self._lock:
+            prefixes = {}
+            for prefix, stats in self._prefixes.items():
+                item = dict(stats, size_histogram=dict(stats['size_histogram']))
+                lookups = stats['hits'] + stats['stale_hits'] + stats['coalesced'] + stats['misses']
+                item['hit_ratio'] = round((lookups - stats['misses']) / lookups, 4) if lookups else None
+                prefixes[prefix] = item
+
+            worst = []
+            for key, entry in self._keys.items():
+                total = entry['hits'] + entry['misses']
+                if entry['misses'] < 2:
+                    continue
+                worst.append({
+                    'key': key,
+                    'label': entry['label'],
+                    'hits': entry['hits'],
+                    'misses': entry['misses'],
+                    'hit_ratio': round(entry['hits'] / total, 4),
+                })
+        worst.sort(key=lambda item: (item['hit_ratio'], -item['misses']))
+        return {'prefixes': prefixes, 'worst_keys': worst[:top_n]}
@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 from services.base_ebook_scraper import BaseEbookScraper
 import logging
 import re
@@ -23,7 +22,7 @@ class CddaoyueScraper(BaseEbookScraper):
             if not response:
                 return {'categories': []}
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             categories = self._parse_categories(soup)
             return {'categories': categories}
         except Exception as e:
@@ -43,7 +42,7 @@ class CddaoyueScraper(BaseEbookScraper):
             if not response:
                 return {'books': [], 'total': 0, 'page': page, 'hasMore': False}
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             books = self._parse_books_from_list_page(soup, str(category_id))
             total_pages = self._parse_total_pages(soup)
             has_more = total_pages is not None and page < total_pages
@@ -74,7 +73,7 @@ class CddaoyueScraper(BaseEbookScraper):
             if not response:
                 return None
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             title = self._parse_book_title(soup)
             if not title:
                 return None
@@ -124,7 +123,7 @@ class CddaoyueScraper(BaseEbookScraper):
             if not response:
                 return None
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             title = self._parse_chapter_title(soup)
             content = self._parse_chapter_content(soup)
             if not content:
@@ -157,7 +156,7 @@ class CddaoyueScraper(BaseEbookScraper):
             if not response:
                 return {'books': [], 'total': 0, 'page': page, 'keyword': keyword, 'hasMore': False}
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             books = self._parse_books_from_search_page(soup)
 
             return {
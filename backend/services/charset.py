@@ -0,0 +1,123 @@
+"""
+响应编码解析
+
+服务端没有声明编码时(requests 默认为 ISO-8859-1), 原来直接使用 apparent_encoding,
+它会对整个响应体做字符集检测, 大的GBK页面每次要几毫秒到几十毫秒。这里依次尝试:
+
+1. JSON / m3u8 按规范固定为 UTF-8
+2. BOM
+3. 页面开头的 <meta charset> / <meta http-equiv="Content-Type">
+4. 该host上次检测出的编码(先用开头4KB验证能否解码)
+5. 以上都不行才做完整检测, 结果按host记住
+"""
+import re
+import codecs
+import logging
+import threading
+from services.rate_limiter import normalize_host
+
+logger = logging.getLogger(__name__)
+
+# 在响应开头多少字节内查找 <meta charset>
+META_SNIFF_BYTES = 2048
+# 验证记住的编码时解码的字节数
+VERIFY_BYTES = 4096
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# GB2312/GBK 页面常混有超出范围的字符, 统一按超集解码
+_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'big5': 'big5hkscs',
+}
+
+_UTF8_TYPES = ('json', 'mpegurl')
+
+
+def _normalize(name):
+    """校验编码名称, 无效时返回None"""
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = _ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def sniff_bom(content):
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    return None
+
+
+def sniff_meta(content):
+    """从页面开头的 meta 标签中取编码"""
+    match = _META_CHARSET.search(content[:META_SNIFF_BYTES])
+    if not match:
+        return None
+    return _normalize(match.group(1).decode('ascii', 'ignore'))
+
+
+def _decodes(content, encoding):
+    """用增量解码器验证开头的内容能否按该编码解码(末尾截断的多字节字符不算错)"""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(content[:VERIFY_BYTES], final=False)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+class CharsetResolver:
+    """按host记住完整检测的结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self.detections = 0
+
+    def remembered(self, host):
+        with self._lock:
+            return self._hosts.get(host)
+
+    def resolve(self, response):
+        """返回响应应使用的编码; 服务端已声明非默认编码时保持不变"""
+        declared = response.encoding
+        if declared and declared.lower() != 'iso-8859-1':
+            return declared
+
+        content_type = (response.headers.get('Content-Type') or '').lower()
+        if any(t in content_type for t in _UTF8_TYPES):
+            return 'utf-8'
+
+        content = response.content or b''
+        encoding = sniff_bom(content) or sniff_meta(content)
+        if encoding:
+            return encoding
+
+        host = normalize_host(response.url or '')
+        encoding = self.remembered(host)
+        if encoding and _decodes(content, encoding):
+            return encoding
+
+        encoding = _normalize(response.apparent_encoding) or 'utf-8'
+        self.detections += 1
+        with self._lock:
+            self._hosts[host] = encoding
+        logger.debug('检测到 %s 的编码: %s', host, encoding)
+        return encoding
+
+
+charset_resolver = CharsetResolver()
@@ -0,0 +1,159 @@
+"""
+按host的熔断器
+
+某个站点挂掉时, 每个请求仍然要等满超时, 工作线程堆积, 其他数据源也跟着变慢。
+这里按host统计滚动时间窗口内的失败率:
+
+- closed: 正常放行, 窗口内请求数足够且失败率超过阈值时打开
+- open: 直接抛出 CircuitOpenError, 不再访问上游; 冷却时间过后进入 half_open
+- half_open: 同一时间只放行一个探测请求, 成功则关闭, 失败则重新打开
+
+连接错误、超时与5xx计为失败; 4xx说明站点在线, 计为成功。
+URL中带有非默认端口时按 host:port 区分, 同一主机上的不同服务各自熔断。
+CircuitOpenError 继承 requests.RequestException, 爬虫原有的异常处理会直接走失败分支
+"""
+import time
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+import requests
+from config import BREAKER_WINDOW, BREAKER_MIN_REQUESTS, BREAKER_ERROR_RATE, BREAKER_OPEN_SECONDS
+from services.rate_limiter import normalize_host
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断打开时快速失败"""
+
+
+class CircuitBreaker:
+    """单个host的熔断状态"""
+
+    def __init__(self, host, window=BREAKER_WINDOW, min_requests=BREAKER_MIN_REQUESTS,
+                 error_rate=BREAKER_ERROR_RATE, open_seconds=BREAKER_OPEN_SECONDS):
+        self.host = host
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        # (时间, 是否成功)
+        self._events = deque()
+
+    def _trim(self, now):
+        while self._events and self._events[0][0] < now - self.window:
+            self._events.popleft()
+
+    def _current_state(self, now):
+        """open 冷却结束后视为 half_open, 调用方需持有锁"""
+        if self._state == OPEN and now >= self._opened_at + self.open_seconds:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def before_request(self):
+        """请求前调用, 不允许访问时抛出 CircuitOpenError"""
+        with self._lock:
+            state = self._current_state(time.time())
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpenError(f'{self.host} 熔断中, 暂停访问')
+
+    def release(self):
+        """请求没有得出结论(如调用方期限用完)时释放半开探测名额, 不记录结果"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, success):
+        """记录一次请求结果"""
+        now = time.time()
+        with self._lock:
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._state = CLOSED
+                    self._events.clear()
+                else:
+                    self._open(now)
+                return
+            self._events.append((now, success))
+            self._trim(now)
+            if state == CLOSED and len(self._events) >= self.min_requests:
+                failures = sum(1 for _, ok in self._events if not ok)
+                if failures / len(self._events) >= self.error_rate:
+                    self._open(now)
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._events.clear()
+
+    def snapshot(self):
+        """当前状态, 供数据源列表展示"""
+        now = time.time()
+        with self._lock:
+            state = self._current_state(now)
+            self._trim(now)
+            total = len(self._events)
+            failures = sum(1 for _, ok in self._events if not ok)
+            retry_after = max(0, int(self._opened_at + self.open_seconds - now)) if state == OPEN else 0
+        return {
+            'state': state,
+            'available': state != OPEN,
+            'requests': total,
+            'error_rate': round(failures / total, 4) if total else 0.0,
+            'retry_after': retry_after,
+        }
+
+
+def breaker_key(url):
+    """熔断器的键: normalize_host, URL带有显式端口时加上端口"""
+    host = normalize_host(url)
+    try:
+        port = urlsplit(url).port if url and '//' in url else None
+    except ValueError:
+        port = None
+    return f'{host}:{port}' if port else host
+
+
+class CircuitBreakers:
+    """按host(含非默认端口)管理熔断器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, url):
+        key = breaker_key(url)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(key)
+                self._breakers[key] = breaker
+            return breaker
+
+    def reset(self, url):
+        """丢弃该URL所在host的熔断状态"""
+        with self._lock:
+            self._breakers.pop(breaker_key(url), None)
+
+    def health(self, url):
+        """该URL所在host的状态; 还没有请求过的host视为正常"""
+        with self._lock:
+            breaker = self._breakers.get(breaker_key(url))
+        if breaker is None:
+            return {'state': CLOSED, 'available': True, 'requests': 0, 'error_rate': 0.0, 'retry_after': 0}
+        return breaker.snapshot()
+
+
+circuit_breakers = CircuitBreakers()
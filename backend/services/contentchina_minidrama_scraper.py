@@ -249,7 +249,7 @@ class ContentChinaMiniDramaScraper(BaseVideoScraper):
 
         url = self.api_base_url.rstrip("/") + safe_path
         try:
-            self._delay()
+            self._delay(url)
             resp = self.session.get(url, params=params, timeout=15, verify=True)
             resp.raise_for_status()
             return resp.json()
@@ -368,7 +368,7 @@ class ContentChinaMiniDramaScraper(BaseVideoScraper):
         params["Signature"] = signature
 
         try:
-            self._delay()
+            self._delay(endpoint)
             resp = self.session.get(endpoint, params=params, timeout=20, verify=True)
             resp.raise_for_status()
             payload = resp.json()
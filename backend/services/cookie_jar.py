@@ -0,0 +1,132 @@
+"""
+按数据源共享的Cookie罐
+
+部分站点需要先访问首页拿到Cookie才能请求内容页。原来每次请求前都访问一次首页,
+上游流量和延迟都翻倍, 而工厂新建的爬虫实例又会把拿到的Cookie丢掉。这里:
+
+- 同一host的所有爬虫实例与线程共用一个Cookie罐
+- 只在首次使用、Cookie过期时预热一次, 并发请求只会有一个去访问首页
+- 上游返回403或验证页时作废当前Cookie, 重新预热后重试一次
+"""
+import time
+import logging
+import threading
+from requests.cookies import RequestsCookieJar
+from config import COOKIE_WARMUP_TTL
+from services.rate_limiter import normalize_host
+from services.deadline import is_expired
+
+logger = logging.getLogger(__name__)
+
+# 预热失败后再次尝试的间隔(秒)
+WARMUP_RETRY_INTERVAL = 60
+
+# 出现在验证/拦截页前4KB内的特征
+CHALLENGE_MARKERS = (
+    b'challenge-platform',
+    b'cf-chl',
+    b'cf_chl',
+    b'just a moment',
+    b'attention required',
+    b'g-recaptcha',
+    b'h-captcha',
+    '安全验证'.encode('utf-8'),
+    '人机验证'.encode('utf-8'),
+)
+
+
+def is_rejected(response):
+    """上游拒绝了当前Cookie: 403, 或者返回了验证页"""
+    if response is None:
+        return False
+    if response.status_code == 403:
+        return True
+    head = (response.content or b'')[:4096].lower()
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+class _JarState:
+    def __init__(self):
+        self.jar = RequestsCookieJar()
+        self.lock = threading.Lock()
+        self.expires_at = 0.0
+        self.warmups = 0
+
+
+class CookieJarManager:
+    """按host管理共享Cookie罐及其有效期"""
+
+    def __init__(self, ttl=COOKIE_WARMUP_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def _state(self, url):
+        host = normalize_host(url)
+        with self._lock:
+            state = self._states.get(host)
+            if state is None:
+                state = _JarState()
+                self._states[host] = state
+            return state
+
+    def attach(self, url, session):
+        """让会话使用该host的共享Cookie罐(RequestsCookieJar 自带锁, 可多线程共用)"""
+        session.cookies = self._state(url).jar
+
+    def _expiry(self, jar, now):
+        """预热结果的有效期: 最早过期的持久Cookie与默认TTL取较小者"""
+        expires = [c.expires for c in jar if c.expires and c.expires > now]
+        return min([now + self.ttl] + expires)
+
+    def ensure_warm(self, url, warm):
+        """Cookie未预热或已过期时调用 warm() 访问首页; 返回是否执行了预热"""
+        state = self._state(url)
+        if time.time() < state.expires_at:
+            return False
+        with state.lock:
+            now = time.time()
+            if now < state.expires_at:
+                return False
+            response = warm()
+            if response is None and is_expired():
+                # 调用方期限用完导致的失败, 不影响下次预热
+                return False
+            state.warmups += 1
+            if response is None:
+                logger.warning('Cookie预热失败: %s', url)
+                state.expires_at = now + min(WARMUP_RETRY_INTERVAL, self.ttl)
+            else:
+                state.expires_at = self._expiry(state.jar, now)
+                logger.info('Cookie预热完成: %s, 有效期 %.0f 秒', url, state.expires_at - now)
+            return True
+
+    def invalidate(self, url):
+        """作废该host的Cookie, 下次请求重新预热"""
+        state = self._state(url)
+        with state.lock:
+            state.jar.clear()
+            state.expires_at = 0.0
+
+    def request(self, url, send, warm):
+        """
+        携带共享Cookie发送请求
+
+        send() 返回未检查状态码的响应或None, warm() 访问首页;
+        被拒绝时重新预热并重试一次, 最终非2xx返回None
+        """
+        self.ensure_warm(url, warm)
+        response = send()
+        if is_rejected(response):
+            logger.info('Cookie被拒绝(%s), 重新预热: %s', response.status_code, url)
+            self.invalidate(url)
+            self.ensure_warm(url, warm)
+            response = send()
+            if is_rejected(response):
+                return None
+        if response is None or not response.ok:
+            return None
+        return response
+
+
+cookie_jars = CookieJarManager()
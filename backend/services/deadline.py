@@ -0,0 +1,126 @@
+"""
+请求期限
+
+一次接口调用可能串行访问上游很多次(首页、播放页、多个备用播放源...), 每次都有自己的
+超时与等待, 总耗时可能超过客户端的超时, 客户端断开后后台还在继续请求。这里:
+
+- 每个API请求开始时创建一个 Deadline, 保存在 contextvar 中, 同一线程内的调用链共享
+- HTTP请求的超时被压缩到剩余时间内, 期限用完后不再发出请求、不再重试、不再限速等待
+- 期限用完时抛出 DeadlineExceeded(继承 requests.RequestException), 爬虫原有的异常
+  处理会按请求失败处理, 接口返回部分结果或缓存中的旧数据
+
+客户端可以通过请求头 X-Request-Timeout 要求更短的期限
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+import requests
+from config import API_DEADLINE, API_DEADLINE_MAX, API_DEADLINE_EXEMPT
+
+_current = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(requests.RequestException):
+    """请求期限已用完"""
+
+
+class Deadline:
+    """从创建时起的时间预算"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.exceeded = False
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what=''):
+        """期限已用完时抛出 DeadlineExceeded"""
+        if self.expired:
+            self.exceeded = True
+            raise DeadlineExceeded(f'请求期限({self.seconds}秒)已用完: {what}'.rstrip(': '))
+
+    def clamp(self, timeout):
+        """把 requests 的 timeout(数字或(连接, 读取)元组, None 表示不限)压缩到剩余时间内"""
+        remaining = max(self.remaining(), 0.001)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+
+def current_deadline():
+    """当前调用链的期限, 不在API请求内(后台刷新、预读等)时为None"""
+    return _current.get()
+
+
+def remaining(default=None):
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else default
+
+
+def is_expired():
+    deadline = _current.get()
+    return deadline is not None and deadline.expired
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """在代码块内使用新的期限(不会比外层期限更长)"""
+    deadline = Deadline(seconds)
+    outer = _current.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline.seconds = outer.seconds
+        deadline.expires_at = outer.expires_at
+    token = _current.set(deadline)
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+async def bind(coro, deadline):
+    """在事件循环线程中执行协程时带上调用方的期限(contextvar 不会跨线程传递)"""
+    token = _current.set(deadline)
+    try:
+        return await coro
+    finally:
+        _current.reset(token)
+
+
+def install_deadline(app):
+    """为每个API请求创建期限, 期限用完的响应带上 X-Deadline-Exceeded 头"""
+    from flask import request, g
+
+    @app.before_request
+    def _start_deadline():
+        if not request.path.startswith('/api/') or request.path.startswith(API_DEADLINE_EXEMPT):
+            return
+        seconds = API_DEADLINE
+        requested = request.headers.get('X-Request-Timeout', type=float)
+        if requested and requested > 0:
+            seconds = min(requested, API_DEADLINE_MAX)
+        g.deadline = Deadline(seconds)
+        g.deadline_token = _current.set(g.deadline)
+
+    @app.after_request
+    def _mark_deadline(response):
+        deadline = g.get('deadline')
+        if deadline is not None and deadline.exceeded:
+            response.headers['X-Deadline-Exceeded'] = 'true'
+        return response
+
+    @app.teardown_request
+    def _end_deadline(exc=None):
+        token = g.pop('deadline_token', None)
+        if token is not None:
+            try:
+                _current.reset(token)
+            except ValueError:
+                _current.set(None)
@@ -3,7 +3,6 @@ import logging
 import re
 from urllib.parse import quote, unquote
 
-from bs4 import BeautifulSoup
 
 from .base_video_scraper import BaseVideoScraper
 
@@ -41,7 +40,7 @@ class DidahdScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         return self._parse_video_list(soup, limit)
 
     def get_video_detail(self, video_id):
@@ -53,7 +52,7 @@ class DidahdScraper(BaseVideoScraper):
         if not resp:
             return None
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         title = self._first_text([soup.find("h1"), soup.find("title")])
         cover = self._find_cover(soup)
         description = self._find_description(soup)
@@ -77,7 +76,7 @@ class DidahdScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         links = soup.find_all("a", href=re.compile(r"/play/\d+-\d+-\d+\.html"))
         episodes = []
         seen = set()
@@ -161,7 +160,7 @@ class DidahdScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         return self._parse_video_list(soup, limit)
 
     def _encode_search_keyword(self, keyword):
@@ -0,0 +1,223 @@
+"""
+基于SQLite的磁盘缓存
+
+作为内存缓存之下的二级缓存, 保存章节图片列表、电子书正文等长期不变的数据,
+服务重启后依然可用。
+
+- 每条缓存独立过期时间
+- 总容量超出配额时先清理过期条目, 再按最近访问时间淘汰
+- 总字节数保存在 meta 表中随写入/删除增减, 写入时不再统计全表
+- WAL模式 + 事务写入, 进程崩溃不会留下半条数据
+- 值以JSON保存(见 services/cache_codec.py), 无法解析的条目按未命中处理
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from services.cache_codec import dump_value, load_value
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """SQLite磁盘缓存, 多线程共享一个连接, 多进程依赖SQLite文件锁"""
+
+    def __init__(self, path, max_bytes=1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' expire_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_expire ON entries(expire_at)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tags ('
+            ' tag TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' PRIMARY KEY (tag, key))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tags_key ON tags(key)')
+        # 多个进程共用一个文件, 总字节数放在库里而不是进程内, 只在建表后统计一次
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (name, value) "
+            "SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries"
+        )
+
+    def get_entry(self, key):
+        """返回 (value, expire_at, tags), 不存在或已过期时返回 None; expire_at 为0表示不过期"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expire_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            raw, expire_at = row
+            if expire_at and expire_at <= now:
+                self._delete_keys([key])
+                return None
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+            tags = [row[0] for row in self._conn.execute('SELECT tag FROM tags WHERE key = ?', (key,))]
+        try:
+            return load_value(raw), expire_at, tags
+        except (ValueError, TypeError):
+            # 旧格式(pickle)或损坏的条目
+            self.delete(key)
+            return None
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, timeout=3600, tags=None):
+        try:
+            data = dump_value(value)
+        except (TypeError, ValueError) as e:
+            logger.warning('无法写入磁盘缓存: %s', e)
+            return False
+        size = len(data)
+        if self.max_bytes and size > self.max_bytes:
+            return False
+        now = time.time()
+        expire_at = now + timeout if timeout and timeout > 0 else 0
+        try:
+            with self._lock:
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    row = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+                    self._add_bytes(size - (row[0] if row else 0))
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO entries (key, value, size, expire_at, accessed_at) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (key, sqlite3.Binary(data), size, expire_at, now)
+                    )
+                    self._conn.execute('DELETE FROM tags WHERE key = ?', (key,))
+                    if tags:
+                        self._conn.executemany(
+                            'INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)',
+                            [(tag, key) for tag in tags]
+                        )
+                    self._evict(now)
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+            return True
+        except sqlite3.Error as e:
+            logger.warning('写入磁盘缓存失败: %s', e)
+            return False
+
+    def delete(self, key):
+        with self._lock:
+            return self._delete_keys([key]) > 0
+
+    def invalidate_tag(self, tag):
+        """删除带有该标签的全部条目, 返回删除数量"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                keys = [row[0] for row in self._conn.execute('SELECT key FROM tags WHERE tag = ?', (tag,))]
+                deleted = self._delete_keys(keys)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            return deleted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._conn.execute('DELETE FROM entries')
+            self._conn.execute('DELETE FROM tags')
+            self._conn.execute("UPDATE meta SET value = 0 WHERE name = 'bytes'")
+            self._conn.execute('COMMIT')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    @property
+    def size_bytes(self):
+        with self._lock:
+            return self._total_bytes()
+
+    def describe(self, top_n=20):
+        """条目数、字节数、按前缀统计与最大的若干条目"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT substr(key, 1, instr(key || ':', ':') - 1) AS prefix, COUNT(*), SUM(size) "
+                "FROM entries GROUP BY prefix"
+            ).fetchall()
+            largest = self._conn.execute(
+                'SELECT key, size FROM entries ORDER BY size DESC LIMIT ?', (top_n,)
+            ).fetchall()
+        return {
+            'backend': 'disk',
+            'path': self.path,
+            'entries': sum(row[1] for row in rows),
+            'bytes': sum(row[2] or 0 for row in rows),
+            'max_bytes': self.max_bytes,
+            'prefixes': {row[0]: {'entries': row[1], 'bytes': row[2] or 0} for row in rows},
+            'largest': [{'key': key, 'size': size} for key, size in largest],
+        }
+
+    def _evict(self, now):
+        """在写事务内执行: 超出配额时先删过期条目, 再按最近访问时间淘汰"""
+        if not self.max_bytes or self._total_bytes() <= self.max_bytes:
+            return
+        expired = self._conn.execute(
+            'SELECT key FROM entries WHERE expire_at > 0 AND expire_at <= ?', (now,)
+        ).fetchall()
+        self._delete_keys([row[0] for row in expired])
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        # 按访问时间索引顺序读取, 够数即停, 不取出整张表
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY accessed_at ASC'):
+            if total <= self.max_bytes:
+                break
+            victims.append(key)
+            total -= size
+        self._delete_keys(victims)
+
+    def _total_bytes(self):
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def _add_bytes(self, delta):
+        if delta:
+            self._conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'", (delta,))
+
+    def _delete_keys(self, keys):
+        """删除条目及其标签并扣减总字节数, 调用方需持有锁; 返回删除的条目数"""
+        deleted = 0
+        # 事务外调用(读取到过期条目/单条删除)时也保证条目与总字节数一起提交
+        self._conn.execute('SAVEPOINT delete_keys')
+        try:
+            for key in keys:
+                row = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                    self._add_bytes(-row[0])
+                    deleted += 1
+                self._conn.execute('DELETE FROM tags WHERE key = ?', (key,))
+            self._conn.execute('RELEASE delete_keys')
+        except Exception:
+            self._conn.execute('ROLLBACK TO delete_keys')
+            self._conn.execute('RELEASE delete_keys')
+            raise
+        return deleted
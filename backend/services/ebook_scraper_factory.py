@@ -84,8 +84,8 @@ class EbookScraperFactory:
         return proxy_cfg if isinstance(proxy_cfg, dict) else None
     
     @classmethod
-    def get_scraper(cls, source=None, proxy_config=None):
-        """获取爬虫实例"""
+    def resolve_source(cls, source=None, warn=False):
+        """返回 get_scraper 实际使用的数据源ID: 未指定时取默认(已禁用则取第一个启用的), 未知或已禁用时退回默认数据源"""
         if source is None:
             source = cls._default_source
             default_info = cls._scrapers.get(source) or {}
@@ -93,17 +93,26 @@ class EbookScraperFactory:
                 source = cls._pick_first_enabled_source()
         
         if source not in cls._scrapers:
-            logger.warning('未知的数据源: %s 使用默认数据源: %s', source, cls._default_source)
+            if warn:
+                logger.warning('未知的数据源: %s 使用默认数据源: %s', source, cls._default_source)
             source = cls._default_source
         
         scraper_info = cls._scrapers[source]
-        runtime_enabled = cls._is_enabled(source, scraper_info.get('enabled', True))
-        
-        if not runtime_enabled:
-            logger.warning('数据源已禁用: %s 使用默认数据源: %s', source, cls._default_source)
+        if not cls._is_enabled(source, scraper_info.get('enabled', True)):
+            if warn:
+                logger.warning('数据源已禁用: %s 使用默认数据源: %s', source, cls._default_source)
             source = cls._default_source
-            scraper_info = cls._scrapers[source]
+        return source
+    
+    @classmethod
+    def get_scraper(cls, source=None, proxy_config=None):
+        """获取爬虫实例"""
+        resolved = cls.resolve_source(source, warn=True)
+        if source is not None and resolved != source:
+            # 指定的代理只适用于原数据源
             proxy_config = None
+        source = resolved
+        scraper_info = cls._scrapers[source]
 
         effective_proxy = proxy_config
         if effective_proxy is None:
@@ -54,7 +54,7 @@ class GenericBbsEbookScraper(BaseEbookScraper):
             logger.error('get_categories request failed source_id=%s url=%s', self.source_id, category_entry_url)
             return {'categories': []}
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         link_selector = (self.source_config.get('category_link_selector') or '').strip()
         if not link_selector:
             logger.error('category_link_selector missing source_id=%s', self.source_id)
@@ -109,7 +109,7 @@ class GenericBbsEbookScraper(BaseEbookScraper):
             logger.error('get_books_by_category request failed source_id=%s url=%s', self.source_id, list_url)
             return {'books': [], 'total': 0, 'page': page, 'hasMore': False}
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         thread_selector = (self.source_config.get('thread_link_selector') or '').strip()
         if not thread_selector:
             logger.error('thread_link_selector missing source_id=%s', self.source_id)
@@ -163,7 +163,7 @@ class GenericBbsEbookScraper(BaseEbookScraper):
             logger.error('get_book_detail request failed source_id=%s url=%s', self.source_id, thread_url)
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         title = self._extract_text_by_selector(soup, self.source_config.get('thread_title_selector'))
         if not title:
             title = (soup.title.get_text(strip=True) if soup.title else '').strip()
@@ -213,7 +213,7 @@ class GenericBbsEbookScraper(BaseEbookScraper):
             logger.error('get_chapter_content request failed source_id=%s url=%s', self.source_id, url)
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         title = self._extract_text_by_selector(soup, self.source_config.get('thread_title_selector'))
         if not title:
             title = (soup.title.get_text(strip=True) if soup.title else '').strip()
@@ -1,6 +1,5 @@
 import re
 import json
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
 
 class Guoman8Scraper(BaseScraper):
@@ -19,7 +18,7 @@ class Guoman8Scraper(BaseScraper):
             if not response:
                 return {'categories': [], 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             # 选择器: body > div.w998.nav-bar.shadow > 
             # div.nav-sub.fl > div > div > div.filter.genre > ul > li
@@ -67,7 +66,7 @@ class Guoman8Scraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             # 获取漫画列表: #contList > li
             comics = []
@@ -153,7 +152,7 @@ class Guoman8Scraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             # 解析搜索结果
             comics = []
@@ -206,7 +205,7 @@ class Guoman8Scraper(BaseScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             # 封面: body > div.w998.bc.cf > div.fl.w728 > 
             # div.book-cont.cf > div.book-cover.fl > p > img
@@ -275,7 +274,7 @@ class Guoman8Scraper(BaseScraper):
             if not response:
                 return {'chapters': [], 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             # 章节列表: #chpater-list-1 > ul > li
             chapters = []
@@ -2,7 +2,6 @@ import logging
 import re
 from urllib.parse import quote, urljoin, urlparse, parse_qs
 
-from bs4 import BeautifulSoup
 
 from .base_video_scraper import BaseVideoScraper
 
@@ -42,7 +41,7 @@ class Heli999Scraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = self._parse_html(resp.text)
         return self._parse_list_page(soup, limit)
 
     def get_video_detail(self, video_id):
@@ -54,7 +53,7 @@ class Heli999Scraper(BaseVideoScraper):
         if not resp:
             return None
 
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = self._parse_html(resp.text)
         title = self._extract_title(soup) or str(video_id)
         cover = self._extract_cover(soup, title)
         description = self._extract_description(soup)
@@ -84,7 +83,7 @@ class Heli999Scraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = self._parse_html(resp.text)
         return self._extract_play_links_as_episodes(str(video_id), soup)
 
     def get_episode_detail(self, episode_id):
@@ -127,7 +126,7 @@ class Heli999Scraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = self._parse_html(resp.text)
         return self._parse_list_page(soup, limit)
 
     def _build_category_url(self, category_id, page):
@@ -7,7 +7,6 @@ HMZXA漫画采集源
 import re
 import logging
 from urllib.parse import quote
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
 
 logger = logging.getLogger(__name__)
@@ -38,7 +37,7 @@ class HmzxaScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             comics = []
             
             # 查找漫画列表
@@ -146,7 +145,7 @@ class HmzxaScraper(BaseScraper):
             if not response:
                 return {'categories': []}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             categories = []
             
             # 查找分类列表 <dd class="acgn-bd">
@@ -207,7 +206,7 @@ class HmzxaScraper(BaseScraper):
             if not response:
                 return {'comics': [], 'hasMore': False, 'total': 0, 'page': page, 'limit': limit}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             comics = []
             
             # 查找漫画列表，结构与分类页面相同
@@ -303,7 +302,7 @@ class HmzxaScraper(BaseScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 查找详情区域
             detail_div = soup.find('div', class_='acgn-model-detail-frontcover')
@@ -423,21 +422,15 @@ class HmzxaScraper(BaseScraper):
     def get_chapter_images(self, chapter_id):
         """获取章节图片列表"""
         try:
-            # 先访问首页获取Cookie
-            logger.info("访问首页获取Cookie...")
-            home_response = self._make_request(self.base_url)
-            if home_response:
-                logger.info("成功获取首页Cookie")
-            
-            # 然后访问章节页面
+            # 首页Cookie按站点共享, 过期或被拒绝时才重新访问首页
             url = f'{self.base_url}/{chapter_id}.html'
             logger.info(f"请求章节图片: {url}")
             
-            response = self._make_request(url)
+            response = self._make_warm_request(url)
             if not response:
                 return {'images': [], 'total': 0}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             images = []
             
             # 查找所有图片标签
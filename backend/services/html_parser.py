@@ -0,0 +1,153 @@
+"""
+HTML解析后端
+
+爬虫原来各自 BeautifulSoup(text, 'html.parser'), 纯Python实现的 html.parser 是最慢的
+树构建器, 大列表页上占了单次请求的大部分CPU时间。这里统一选择 BeautifulSoup 的后端:
+
+- 默认使用C实现的 lxml, 爬虫代码仍然使用 bs4 的API
+- 可以按站点在 config.HTML_PARSERS 中指定后端, 依据 bench_html_parser.py 的对比结果
+- 配置的后端未安装时退回 html.parser
+- 爬虫可以声明只解析页面中用到的区域(only='#chapterlistload'), 其余标签、脚本、广告
+  在解析时直接丢弃, 不构建DOM; 区域内一个元素都没有时退回完整解析
+"""
+import re
+import logging
+from functools import lru_cache
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+try:
+    from bs4.filter import ElementFilter
+except ImportError:  # bs4 < 4.13
+    ElementFilter = None
+from config import HTML_PARSER, HTML_PARSERS
+from services.rate_limiter import normalize_host
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_PARSER = 'html.parser'
+# bench_html_parser.py 对比的后端
+KNOWN_PARSERS = ('lxml', 'html.parser', 'html5lib')
+
+# html5lib 不支持 parse_only
+NO_STRAINER_PARSERS = ('html5lib',)
+
+_warned = set()
+
+# 区域选择器: 标签名, 后面跟任意个 #id / .class / [attr] / [attr=v] / [attr^=v] / [attr*=v] / [attr$=v]
+_SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*)?((?:[#.][\w-]+|\[[^\]]+\])*)$')
+_PART_RE = re.compile(r'[#.][\w-]+|\[[^\]]+\]')
+_ATTR_RE = re.compile(r'^\[\s*([\w-]+)\s*(?:([\^*$]?=)\s*["\']?(.*?)["\']?\s*)?\]$')
+
+
+def available_parsers():
+    """当前环境已安装的后端"""
+    return [name for name in KNOWN_PARSERS if builder_registry.lookup(name) is not None]
+
+
+def resolve_parser(name=None):
+    """返回可用的后端名, 未安装时退回 html.parser(每个后端只警告一次)"""
+    name = name or HTML_PARSER
+    if builder_registry.lookup(name) is not None:
+        return name
+    if name not in _warned:
+        _warned.add(name)
+        logger.warning('HTML解析后端 %s 不可用, 使用 %s', name, FALLBACK_PARSER)
+    return FALLBACK_PARSER
+
+
+def parser_for(url):
+    """站点使用的后端: 按host匹配 HTML_PARSERS(含上级域名), 否则为默认后端"""
+    labels = normalize_host(url).split('.')
+    for i in range(max(1, len(labels) - 1)):
+        name = HTML_PARSERS.get('.'.join(labels[i:]))
+        if name:
+            return resolve_parser(name)
+    return resolve_parser()
+
+
+def _compile_selector(selector):
+    """把一个简单选择器转换为 SoupStrainer"""
+    match = _SELECTOR_RE.match(selector)
+    if not match or not selector:
+        raise ValueError(f'不支持的区域选择器: {selector}')
+    name, rest = match.groups()
+    attrs, classes = {}, []
+    for part in _PART_RE.findall(rest):
+        if part[0] == '#':
+            attrs['id'] = part[1:]
+        elif part[0] == '.':
+            classes.append(part[1:])
+        else:
+            attr = _ATTR_RE.match(part)
+            if not attr:
+                raise ValueError(f'不支持的区域选择器: {selector}')
+            key, op, value = attr.groups()
+            if op is None:
+                attrs[key] = True
+            elif op == '=':
+                attrs[key] = value
+            else:
+                pattern = {'^=': '^{}', '*=': '{}', '$=': '{}$'}[op].format(re.escape(value))
+                attrs[key] = re.compile(pattern)
+    if classes:
+        # 解析时 class 还是原始字符串, 按空白分隔的单词匹配
+        attrs['class'] = re.compile('^' + ''.join(rf'(?=(?:.*\s)?{re.escape(c)}(?:\s|$))' for c in classes))
+    return SoupStrainer(name, attrs)
+
+
+if ElementFilter is not None:
+    class _AnyOf(ElementFilter):
+        """多个区域之一匹配即保留"""
+
+        def __init__(self, strainers):
+            super().__init__()
+            self.strainers = strainers
+
+        @property
+        def includes_everything(self):
+            return False
+
+        @property
+        def excludes_everything(self):
+            return False
+
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return any(s.allow_tag_creation(nsprefix, name, attrs) for s in self.strainers)
+
+        def allow_string_creation(self, string):
+            return False
+
+        def match(self, element, _known_rules=False):
+            return any(s.match(element, _known_rules) for s in self.strainers)
+else:
+    _AnyOf = None
+
+
+@lru_cache(maxsize=128)
+def region(selectors):
+    """
+    把逗号分隔的区域选择器编译成 parse_only 过滤器, 匹配元素的整个子树都会保留
+
+    多个区域需要 bs4>=4.13, 更早的版本返回None(完整解析)
+    """
+    strainers = [_compile_selector(part.strip()) for part in selectors.split(',')]
+    if len(strainers) == 1:
+        return strainers[0]
+    return _AnyOf(strainers) if _AnyOf is not None else None
+
+
+def parse_html(markup, parser=None, only=None):
+    """
+    用指定(或默认)后端解析HTML, 返回 BeautifulSoup
+
+    only: 区域选择器(如 '.cat-list' 或 'title, .catalog, .mulu-list'), 只构建这些元素的子树;
+    返回的 soup 中只有这些区域, 查找区域外的元素(含 find_parent)会找不到
+    """
+    parser = resolve_parser(parser)
+    strainer = region(only) if only and parser not in NO_STRAINER_PARSERS else None
+    if strainer is not None:
+        soup = BeautifulSoup(markup, parser, parse_only=strainer)
+        if soup.find() is not None:
+            return soup
+        logger.debug('页面中没有区域 %s, 完整解析', only)
+    return BeautifulSoup(markup, parser)
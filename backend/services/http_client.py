@@ -0,0 +1,306 @@
+"""
+统一HTTP客户端
+
+三个爬虫基类与路由共用的HTTP层:
+
+- 所有会话挂载同一个连接池适配器, 按host复用keep-alive连接
+- GET/HEAD 对连接错误与 429/5xx 自动重试, 退避时间带随机抖动
+- 统一的连接/读取超时与代理配置
+- 每个请求经过所在host的熔断器, 站点不可用时快速失败
+- 超时与重试受当前API请求的期限约束(见 services/deadline.py)
+- 爬虫通过会话池并发请求, 请求头/Cookie按请求传入, 不修改共享会话
+- ScraperHttpMixin 为三个爬虫基类提供共用的初始化与请求方法
+"""
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+import requests
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from services.upstream_cache import upstream_cache
+from services.charset import charset_resolver
+from services.circuit_breaker import circuit_breakers
+from services.deadline import current_deadline, DeadlineExceeded
+from services.rate_limiter import rate_limiter
+from services.cookie_jar import cookie_jars
+from services.html_parser import parser_for, parse_html
+from config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_RETRIES, HTTP_BACKOFF_FACTOR,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, SCRAPER_SESSION_POOL_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# 默认超时: (连接超时, 读取超时)
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+
+class DeadlineRetry(Retry):
+    """请求期限用完后不再重试, 退避等待不超过剩余时间"""
+
+    def is_exhausted(self):
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return True
+        return super().is_exhausted()
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        deadline = current_deadline()
+        return min(backoff, deadline.remaining()) if deadline is not None else backoff
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        deadline = current_deadline()
+        if retry_after is None or deadline is None:
+            return retry_after
+        return min(retry_after, deadline.remaining())
+
+
+def _build_retry():
+    """只对幂等请求重试; 旧版urllib3不支持 backoff_jitter 时退化为普通指数退避"""
+    options = dict(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return DeadlineRetry(backoff_jitter=HTTP_BACKOFF_FACTOR, **options)
+    except TypeError:
+        return DeadlineRetry(**options)
+
+
+# 所有会话共用一个适配器, 即共用同一组按host划分的连接池
+_adapter = HTTPAdapter(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    max_retries=_build_retry(),
+)
+
+
+def build_proxies(proxy_config):
+    """根据数据源的代理配置生成requests的proxies参数, 未启用时返回None"""
+    if not proxy_config or not proxy_config.get('enabled'):
+        return None
+    proxy_type = proxy_config.get('type', 'http')
+    proxy_host = proxy_config.get('host', '127.0.0.1')
+    proxy_port = proxy_config.get('port', 7897)
+    proxy_url = f'{proxy_type}://{proxy_host}:{proxy_port}'
+    return {
+        'http': proxy_url,
+        'https': proxy_url
+    }
+
+
+class Session(requests.Session):
+    """
+    请求前检查期限与熔断器, 请求后记录结果; 爬虫直接调用 session.get/post 也同样生效
+
+    因期限用完而超时的请求不计入熔断失败
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check(url)
+            kwargs['timeout'] = deadline.clamp(kwargs.get('timeout'))
+        breaker = circuit_breakers.get(url)
+        breaker.before_request()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            if deadline is not None and deadline.expired:
+                deadline.exceeded = True
+                breaker.release()
+            else:
+                breaker.record(False)
+            raise
+        breaker.record(response.status_code < 500)
+        return response
+
+
+def create_session(headers=None, proxy_config=None):
+    """创建挂载共享连接池的会话, 会话自身只保存请求头/Cookie/代理"""
+    session = Session()
+    session.mount('http://', _adapter)
+    session.mount('https://', _adapter)
+    session.headers.update(headers or DEFAULT_HEADERS)
+
+    proxies = build_proxies(proxy_config)
+    if proxies:
+        session.proxies = proxies
+        logger.info('使用代理: %s', proxies['https'])
+    return session
+
+
+class SessionPool:
+    """
+    同一爬虫实例的一组会话, 每个并发请求取用一个, 用完归还
+
+    池中会话按首次取用时的模板会话复制请求头/代理/证书设置, 并共用模板的Cookie罐;
+    模板只应在爬虫 __init__ 中配置, 运行期的差异通过请求参数传入
+    """
+
+    def __init__(self, template, size=SCRAPER_SESSION_POOL_SIZE):
+        self.template = template
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _clone(self):
+        session = create_session(dict(self.template.headers))
+        session.proxies = dict(self.template.proxies)
+        session.verify = self.template.verify
+        session.cookies = self.template.cookies
+        return session
+
+    @contextmanager
+    def session(self):
+        """取用一个空闲会话; 都在使用且已达上限时等待其他请求归还"""
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            session = self._clone() if create else self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+
+def _create_stateless_session():
+    """不保存Cookie的共享会话, 用于代理转发等不应在用户之间共享状态的请求"""
+    session = create_session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+_shared_session = _create_stateless_session()
+
+
+def _send(session, method, url, revalidate=None, **kwargs):
+    """
+    发送请求; GET 按站点配置(或 revalidate=True)走上游响应缓存的条件请求
+
+    流式请求不缓存
+    """
+    if revalidate is None:
+        revalidate = upstream_cache.enabled_for(url)
+    if revalidate and method == 'GET' and not kwargs.get('stream'):
+        return upstream_cache.send(session, method, url, **kwargs)
+    return session.request(method, url, **kwargs)
+
+
+def request(method, url, session=None, revalidate=None, **kwargs):
+    """
+    发送请求, 未指定超时时使用默认超时
+
+    未传 session 时使用不保存Cookie的共享会话
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return _send(session or _shared_session, method.upper(), url, revalidate=revalidate, **kwargs)
+
+
+def fix_encoding(response):
+    """服务端未声明编码(requests默认ISO-8859-1)时按 BOM/meta/host记忆 解析, 最后才做完整检测"""
+    response.encoding = charset_resolver.resolve(response)
+    return response
+
+
+def fetch(session, url, params=None, verify=True, timeout=None, headers=None, check_status=True,
+          revalidate=None, cookies=None):
+    """
+    爬虫基类使用的GET请求
+
+    headers/cookies 只作用于本次请求, 与会话上的值合并, 不修改会话;
+    成功返回已修正编码的响应, 网络错误或非2xx状态返回None;
+    check_status=False 时非2xx响应也原样返回, 由调用方判断
+    """
+    try:
+        response = _send(
+            session, 'GET', url, revalidate=revalidate, params=params, headers=headers,
+            cookies=cookies, timeout=timeout or DEFAULT_TIMEOUT, verify=verify
+        )
+        if check_status:
+            response.raise_for_status()
+        return fix_encoding(response)
+    except requests.RequestException as e:
+        logger.warning('请求失败: %s, 错误: %s', url, e)
+        return None
+
+
+class ScraperHttpMixin:
+    """
+    三个爬虫基类共用的HTTP部分: 会话/会话池/Cookie罐/解析后端的初始化, 限速, 请求与HTML解析
+
+    子类需要额外的请求参数时覆盖 _make_request/_make_warm_request, 通过 _fetch/_fetch_warm 发送
+    """
+
+    def __init__(self, base_url, proxy_config=None):
+        self.base_url = base_url
+        self.proxy_config = proxy_config
+        self.headers = dict(DEFAULT_HEADERS)
+        # 会话共用全局连接池, 自带重试与代理配置
+        self.session = create_session(self.headers, proxy_config)
+        # 同一站点的实例与线程共用Cookie
+        cookie_jars.attach(self.base_url, self.session)
+        # 单例爬虫被多个线程同时使用: 请求从池中取用会话, 不修改 self.session
+        self.session_pool = SessionPool(self.session)
+        # HTML解析后端, 默认lxml, 可在 config.HTML_PARSERS 中按站点指定
+        self.html_parser = parser_for(self.base_url)
+
+    def _delay(self, url=None):
+        """按host令牌桶限速, 只有该host的配额用完时才等待; 等待会超出请求期限时抛出 DeadlineExceeded"""
+        rate_limiter.acquire(url or self.base_url)
+
+    def _fetch(self, url, **kwargs):
+        """限速后从会话池取用会话发送GET请求, 参数同 fetch; 限速等待超出请求期限时返回None"""
+        try:
+            self._delay(url)
+        except DeadlineExceeded:
+            return None
+        with self.session_pool.session() as session:
+            return fetch(session, url, **kwargs)
+
+    def _fetch_warm(self, url, **kwargs):
+        """需要首页Cookie的请求: Cookie未预热或过期时先访问首页, 被拒绝(403/验证页)时重新预热并重试"""
+        verify = kwargs.get('verify', True)
+        return cookie_jars.request(
+            self.base_url,
+            lambda: self._fetch(url, check_status=False, **kwargs),
+            lambda: self._make_request(self.base_url, verify_ssl=verify),
+        )
+
+    def _make_request(self, url, verify_ssl=True, headers=None, cookies=None):
+        """发送HTTP请求, headers/cookies 只作用于本次请求"""
+        return self._fetch(url, verify=verify_ssl, headers=headers, cookies=cookies)
+
+    def _make_warm_request(self, url, verify_ssl=True, headers=None, cookies=None):
+        """先保证本站点Cookie已预热再请求, 见 _fetch_warm"""
+        return self._fetch_warm(url, verify=verify_ssl, headers=headers, cookies=cookies)
+
+    def _parse_html(self, markup, only=None):
+        """用本站点的解析后端解析HTML, only 为只需解析的区域选择器(见 services/html_parser.py)"""
+        return parse_html(markup, self.html_parser, only)
@@ -0,0 +1,80 @@
+"""
+Dean Edwards Packer 解包
+
+X漫画的 chapterimage.ashx 每页返回一段 eval(function(p,a,c,k,e,d){...}('payload',a,c,'k1|k2|...'.split('|'),0,{}))。
+原来的解包对每个关键词倒序执行一次 re.sub(r'\\b'+token+r'\\b'), 复杂度 O(c × len(p)), 且把大于35的
+下标也按base36编码, a>36(base62)的负载中 A、B... 这类token无法还原。这里:
+
+- 与packer自带的快速路径一致: 先建立 编码后的下标 -> 关键词 的字典, 再用一个 \\w+ 正则单遍替换
+- 下标编码与packer的 e() 相同: 每位 <36 用 0-9a-z, 否则 chr(位值+29)(即 A-Z), 覆盖 base36 与 base62
+- 按负载缓存解包结果, 同一章节页面重复解析时直接返回
+"""
+import re
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# }('payload', a, c, 'k1|k2'.split('|') — payload 与关键词可用单/双引号, 允许转义字符
+PACKER_RE = re.compile(
+    r"\}\s*\(\s*(['\"])((?:(?!\1|\\).|\\.)*)\1\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(['\"])((?:(?!\5|\\).|\\.)*)\5\.split\('\|'\)",
+    re.DOTALL,
+)
+# 退回: payload中的引号未转义时(如手工粘贴的样例), 取到最后一个 ',a,c,' 为止
+LOOSE_PACKER_RE = re.compile(r"\}\s*\(\s*'(.*)'\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*'([^']*)'\.split\('\|'\)", re.DOTALL)
+# JS 的 \w 只含ASCII
+WORD_RE = re.compile(r'\b\w+\b', re.ASCII)
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# 缓存的负载个数
+CACHE_SIZE = 256
+
+
+def encode_index(n, radix):
+    """关键词下标按packer的 e() 编码: 低于36的位用 0-9a-z, 其余用 chr(位值+29)"""
+    digit = n % radix
+    char = _DIGITS[digit] if digit < 36 else chr(digit + 29)
+    return (encode_index(n // radix, radix) if n >= radix else '') + char
+
+
+def parse_args(packed_code):
+    """提取 (payload, radix, count, keywords), 不是packer格式时返回None"""
+    match = PACKER_RE.search(packed_code)
+    if match:
+        quote = match.group(1)
+        # 还原payload中的转义字符
+        payload = match.group(2).replace(f'\\{quote}', quote).replace('\\\\', '\\')
+        return payload, int(match.group(3)), int(match.group(4)), match.group(6)
+    match = LOOSE_PACKER_RE.search(packed_code)
+    if match:
+        return match.group(1), int(match.group(2)), int(match.group(3)), match.group(4)
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _unpack(payload, radix, count, keywords):
+    words = keywords.split('|')
+    table = {}
+    for i in range(min(count, len(words))):
+        if words[i]:
+            table[encode_index(i, radix)] = words[i]
+    return WORD_RE.sub(lambda m: table.get(m.group(0), m.group(0)), payload)
+
+
+def unpack(packed_code):
+    """解包packer混淆的JS, 返回还原后的代码; 不是packer格式或解包失败时返回None"""
+    try:
+        args = parse_args(packed_code)
+        if args is None:
+            logger.debug("无法匹配Packer格式")
+            return None
+        return _unpack(*args)
+    except Exception as e:
+        logger.debug(f"解包JS失败: {e}", exc_info=True)
+        return None
+
+
+def cache_info():
+    """解包缓存的命中统计"""
+    return _unpack.cache_info()
@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 from services.base_ebook_scraper import BaseEbookScraper
 import re
 import logging
@@ -7,6 +6,10 @@ logger = logging.getLogger(__name__)
 
 class KanuNu8Scraper(BaseEbookScraper):
     """努努书坊(kanunu8.com)爬虫实现"""
+
+    # 只解析用到的区域: 分类/作家页的 .cat-list, 详情页的书名、简介与目录
+    CATEGORY_REGION = '.cat-list'
+    DETAIL_REGION = 'title, .catalog, .mulu-list'
     
     def __init__(self, proxy_config=None):
         super().__init__('https://www.kanunu8.com', proxy_config)
@@ -20,7 +23,7 @@ class KanuNu8Scraper(BaseEbookScraper):
             if not response:
                 return {'categories': []}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.CATEGORY_REGION)
             categories = []
             
             # 查找所有 .cat-list 区块
@@ -133,7 +136,7 @@ class KanuNu8Scraper(BaseEbookScraper):
             if not response:
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.CATEGORY_REGION)
             subcategories = []
             
             # 查找作家列表中的 .cat-list
@@ -237,7 +240,7 @@ class KanuNu8Scraper(BaseEbookScraper):
             if not response:
                 return {'books': [], 'total': 0, 'page': page, 'hasMore': False}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             books = []
             
             # 查找书籍列表容器
@@ -420,7 +423,7 @@ class KanuNu8Scraper(BaseEbookScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.DETAIL_REGION)
             
             # 提取书名、作者和简介
             title = ''
@@ -448,15 +451,10 @@ class KanuNu8Scraper(BaseEbookScraper):
                 if summary_div:
                     description = summary_div.get_text(strip=True)
                 else:
-                    # 尝试其他可能的选择器
-                    summary_div = soup.select_one('body > div.page > div.content > div.catalog > div.summary > div')
+                    # 只解析了 DETAIL_REGION, 完整路径 body > div.page > ... 不存在, 退回任意 .summary
+                    summary_div = soup.select_one('.summary')
                     if summary_div:
                         description = summary_div.get_text(strip=True)
-                    else:
-                        # 再尝试其他选择器
-                        summary_div = soup.select_one('.summary')
-                        if summary_div:
-                            description = summary_div.get_text(strip=True)
             
             # 如果没找到,尝试从页面标题提取
             if not title:
@@ -587,17 +585,12 @@ class KanuNu8Scraper(BaseEbookScraper):
     def get_chapter_content(self, chapter_id):
         """获取章节内容"""
         try:
-            # 先访问首页获取Cookie
-            logger.info("访问首页获取Cookie...")
-            home_response = self._make_request(self.base_url)
-            if home_response:
-                logger.info("成功获取首页Cookie")
-            
             # 构建章节URL
             chapter_url = self._build_chapter_url(chapter_id)
             logger.info(f"获取章节内容: {chapter_url}")
             
-            response = self._make_request(chapter_url)
+            # 首页Cookie按站点共享, 过期或被拒绝时才重新访问首页
+            response = self._make_warm_request(chapter_url)
             if not response:
                 logger.error(f"无法获取章节页面: {chapter_url}")
                 return None
@@ -605,7 +598,7 @@ class KanuNu8Scraper(BaseEbookScraper):
             logger.info(f"成功获取章节页面,状态码: {response.status_code}")
             logger.info(f"页面内容长度: {len(response.text)}")
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 提取章节标题
             title = ''
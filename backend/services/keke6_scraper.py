@@ -1,16 +1,15 @@
 import re
 import time
 import uuid
-import base64
 import hmac
 import hashlib
 import logging
-import execjs
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote
 
 from .base_video_scraper import BaseVideoScraper
+from . import http_client, aes_crypto
+from .http_client import fix_encoding
 
 
 logger = logging.getLogger(__name__)
@@ -247,12 +246,11 @@ class Keke6Scraper(BaseVideoScraper):
             return None
 
         try:
-            self._delay()
+            self._delay(url)
             resp = self.session.get(url, timeout=15)
             resp.raise_for_status()
-            if resp.encoding is None or resp.encoding.lower() == 'iso-8859-1':
-                resp.encoding = resp.apparent_encoding
-            return BeautifulSoup(resp.text, 'html.parser')
+            fix_encoding(resp)
+            return self._parse_html(resp.text)
         except requests.RequestException as e:
             logger.error('keke6 request failed url=%s err=%s', url, e)
             return None
@@ -509,9 +507,9 @@ class Keke6Scraper(BaseVideoScraper):
         params['sign'] = sign
 
         try:
-            self._delay()
             url = self._api_base + safe_path
-            return requests.request(method.upper(), url, params=params, timeout=15, verify=False)
+            self._delay(url)
+            return http_client.request(method, url, params=params, timeout=15, verify=False)
         except requests.RequestException as e:
             logger.error('keke6 api request failed url=%s path=%s err=%s', self._api_base, safe_path, e)
             return None
@@ -566,19 +564,7 @@ class Keke6Scraper(BaseVideoScraper):
     def _aes_encrypt_hex(self, plaintext):
         safe = str(plaintext or '')
         try:
-            ctx = execjs.compile(
-                """
-                const crypto = require('crypto')
-                function encryptHex(text, key, iv) {
-                  const cipher = crypto.createCipheriv('aes-128-cbc', Buffer.from(key, 'utf8'), Buffer.from(iv, 'utf8'))
-                  cipher.setAutoPadding(true)
-                  let out = cipher.update(String(text), 'utf8', 'hex')
-                  out += cipher.final('hex')
-                  return out
-                }
-                """
-            )
-            return ctx.call('encryptHex', safe, 'mwrpb19k9s0n', 'b3t069ijy789000')
+            return aes_crypto.encrypt_hex(safe, 'mwrpb19k9s0n', 'b3t069ijy789000', bits=128)
         except Exception as e:
             logger.error('keke6 aes encrypt failed err=%s', e)
             return None
@@ -588,10 +574,10 @@ class Keke6Scraper(BaseVideoScraper):
             return None
 
         try:
-            b64 = base64.b64encode(data_bytes).decode('utf-8')
-            return self._aes_decrypt_base64(b64)
+            plain = aes_crypto.decrypt(data_bytes, self._aes_key, self._aes_iv, bits=256)
+            return plain.decode('utf-8', errors='replace')
         except Exception as e:
-            logger.error('keke6 base64 encode failed err=%s', e)
+            logger.error('keke6 aes decrypt failed err=%s', e)
             return None
 
     def _aes_decrypt_base64(self, cipher_b64):
@@ -600,20 +586,7 @@ class Keke6Scraper(BaseVideoScraper):
             return None
 
         try:
-            ctx = execjs.compile(
-                """
-                const crypto = require('crypto')
-                function decryptBase64(b64, key, iv) {
-                  const buf = Buffer.from(String(b64), 'base64')
-                  const decipher = crypto.createDecipheriv('aes-256-cbc', Buffer.from(key, 'utf8'), Buffer.from(iv, 'utf8'))
-                  decipher.setAutoPadding(true)
-                  let out = decipher.update(buf)
-                  out = Buffer.concat([out, decipher.final()])
-                  return out.toString('utf8')
-                }
-                """
-            )
-            return ctx.call('decryptBase64', safe, self._aes_key, self._aes_iv)
+            return aes_crypto.decrypt_base64(safe, self._aes_key, self._aes_iv, bits=256)
         except Exception as e:
             logger.error('keke6 aes decrypt failed err=%s', e)
             return None
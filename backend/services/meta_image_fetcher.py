@@ -3,9 +3,10 @@
 支持获取 og:image, twitter:image, favicon 等
 """
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import logging
+from services import http_client
+from services.html_parser import parse_html
 
 logger = logging.getLogger(__name__)
 
@@ -39,10 +40,11 @@ def get_meta_image(url, timeout=10):
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
         }
         
-        response = requests.get(url, headers=headers, timeout=timeout, verify=True)
+        # 站点首页很少变化, 走条件请求复用上次下载的内容
+        response = http_client.request('GET', url, headers=headers, timeout=timeout, verify=True, revalidate=True)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = parse_html(response.text)
         
         # 优先级顺序：og:image > twitter:image > apple-touch-icon > favicon > link[rel="icon"]
         image_url = None
@@ -0,0 +1,258 @@
+"""
+多镜像对冲请求
+
+同一内容有多个镜像站时, 原来是先完整请求第一个镜像, 失败后再请求下一个。这里:
+
+- 镜像列表在 config.SOURCE_MIRRORS 中按数据源声明
+- 按各镜像最近的延迟与失败率排序, 表现好的先请求
+- 首个请求在调用线程中发出, 超过该镜像的p95延迟仍未返回时, 向下一个镜像发出备份请求(线程池)
+- 先拿到有效响应的胜出, 其余请求不再等待(requests 无法中断进行中的请求,
+  完成后直接关闭响应, 连接归还连接池)
+- 备份请求沿用调用方的 contextvar(请求期限), 期限用完后不再发备份请求
+"""
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import (
+    SOURCE_MIRRORS, HEDGE_WORKERS, HEDGE_DEFAULT_DELAY, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY
+)
+from services.deadline import current_deadline
+
+logger = logging.getLogger(__name__)
+
+# 计算分位数至少需要的样本数
+MIN_SAMPLES = 5
+# 排序时每1的失败率折算的延迟惩罚(秒)
+FAILURE_PENALTY = 10.0
+
+
+def get_mirrors(source, kind):
+    """数据源某类页面声明的镜像列表"""
+    return list(SOURCE_MIRRORS.get(source, {}).get(kind, []))
+
+
+class MirrorStats:
+    """每个镜像最近若干次请求的延迟与成败"""
+
+    def __init__(self, samples=50):
+        self.samples = samples
+        self._lock = threading.Lock()
+        # name -> deque[(耗时, 是否成功)]
+        self._history = {}
+
+    def record(self, name, elapsed, success):
+        with self._lock:
+            history = self._history.get(name)
+            if history is None:
+                history = deque(maxlen=self.samples)
+                self._history[name] = history
+            history.append((elapsed, success))
+
+    def _latencies(self, name):
+        history = self._history.get(name) or ()
+        return sorted(elapsed for elapsed, ok in history if ok)
+
+    def percentile(self, name, pct):
+        """成功请求延迟的分位数, 样本不足时返回None"""
+        with self._lock:
+            latencies = self._latencies(name)
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(pct * (len(latencies) - 1) + 0.5))]
+
+    def failure_rate(self, name):
+        with self._lock:
+            history = self._history.get(name) or ()
+            if not history:
+                return 0.0
+            return sum(1 for _, ok in history if not ok) / len(history)
+
+    def score(self, name):
+        """排序依据: 中位延迟 + 失败率惩罚, 没有样本时按默认延迟"""
+        median = self.percentile(name, 0.5)
+        if median is None:
+            median = HEDGE_DEFAULT_DELAY
+        return median + self.failure_rate(name) * FAILURE_PENALTY
+
+    def hedge_delay(self, name):
+        """发出备份请求前等待的时间: 该镜像的p95, 限制在上下限之间"""
+        p95 = self.percentile(name, 0.95)
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p95))
+
+    def snapshot(self):
+        with self._lock:
+            names = list(self._history)
+        return {
+            name: {
+                'p50': self.percentile(name, 0.5),
+                'p95': self.percentile(name, 0.95),
+                'failure_rate': round(self.failure_rate(name), 4),
+                'samples': len(self._history.get(name) or ()),
+            }
+            for name in names
+        }
+
+
+mirror_stats = MirrorStats()
+_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='hedge')
+
+
+def _discard(future):
+    """落选请求完成后关闭响应"""
+    def close(done):
+        try:
+            response = done.result()
+            if response is not None and hasattr(response, 'close'):
+                response.close()
+        except Exception:
+            pass
+    future.add_done_callback(close)
+
+
+def hedged_fetch(mirrors, fetch, is_good=None, stats=mirror_stats):
+    """
+    对多个镜像做对冲请求
+
+    mirrors: 镜像描述列表, 每项至少包含 name
+    fetch(mirror): 请求该镜像, 返回响应或None
+    is_good(response): 判断响应是否可用, 默认非None即可
+    返回 (mirror, response), 全部失败时返回 (None, None)
+
+    领先的镜像在调用线程中请求, 不会排在其他请求的备份请求后面; 超过其p95仍未返回时由定时器
+    把备份请求放入共享线程池。调用线程只能在领先请求结束后返回, 此时已先完成的有效备份胜出;
+    领先请求失败时等待已发出的备份, 没有备份时在调用线程中请求下一个镜像
+    """
+    is_good = is_good or (lambda response: response is not None)
+    ordered = sorted(mirrors, key=lambda m: stats.score(m['name']))
+    deadline = current_deadline()
+    # 定时器与工作线程中的任务各用一份调用方上下文的副本(请求期限)
+    context = contextvars.copy_context()
+    lock = threading.Lock()
+    pending = {}
+    state = {'next': 0, 'closed': False, 'timer': None}
+
+    def expired():
+        return deadline is not None and deadline.expired
+
+    def take_next():
+        if state['next'] >= len(ordered):
+            return None
+        mirror = ordered[state['next']]
+        state['next'] += 1
+        return mirror
+
+    def attempt(mirror):
+        started = time.monotonic()
+        response = None
+        try:
+            response = fetch(mirror)
+            return response
+        finally:
+            ok = False
+            try:
+                ok = is_good(response)
+            except Exception:
+                pass
+            stats.record(mirror['name'], time.monotonic() - started, ok)
+
+    def schedule_hedge(slow):
+        """slow 超过p95仍未返回时发出下一个备份请求, 调用方需持有锁"""
+        cancel_timer()
+        timer = threading.Timer(stats.hedge_delay(slow['name']), hedge, args=(slow,))
+        timer.daemon = True
+        state['timer'] = timer
+        timer.start()
+
+    def hedge(slow):
+        with lock:
+            if state['closed'] or expired():
+                return
+            backup = take_next()
+            if backup is None:
+                return
+            pending[_executor.submit(context.copy().run, attempt, backup)] = backup
+            schedule_hedge(backup)
+        logger.info('镜像 %s 响应慢, 同时请求 %s', slow['name'], backup['name'])
+
+    def cancel_timer():
+        timer, state['timer'] = state['timer'], None
+        if timer is not None:
+            timer.cancel()
+
+    def finish(winner, response):
+        """已有胜出者: 不再发备份, 已发出的备份完成后关闭响应"""
+        with lock:
+            state['closed'] = True
+            cancel_timer()
+            losers = list(pending)
+            pending.clear()
+        for loser in losers:
+            loser.cancel()
+            _discard(loser)
+        return winner, response
+
+    def first_good_backup(block):
+        """返回已完成的有效备份; block 时等到有备份完成"""
+        with lock:
+            futures = list(pending)
+        if not futures:
+            return None
+        done, _ = wait(futures, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            with lock:
+                mirror = pending.pop(future, None)
+            if mirror is None:
+                continue
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.warning('镜像 %s 请求异常: %s', mirror['name'], e)
+                response = None
+            if is_good(response):
+                return mirror, response
+            logger.info('镜像 %s 未返回有效内容', mirror['name'])
+        return None
+
+    try:
+        while True:
+            with lock:
+                leader = None if pending or expired() else take_next()
+                if leader is not None:
+                    schedule_hedge(leader)
+            if leader is not None:
+                try:
+                    response = attempt(leader)
+                except Exception as e:
+                    logger.warning('镜像 %s 请求异常: %s', leader['name'], e)
+                    response = None
+                # 备份先拿到了有效响应时以备份为准
+                backup = first_good_backup(block=False)
+                if backup is not None:
+                    if response is not None and hasattr(response, 'close'):
+                        response.close()
+                    return finish(*backup)
+                if is_good(response):
+                    return finish(leader, response)
+                logger.info('镜像 %s 未返回有效内容', leader['name'])
+                with lock:
+                    if not pending:
+                        # 没有备份在途, 立即在调用线程中请求下一个镜像
+                        cancel_timer()
+                continue
+            with lock:
+                if not pending:
+                    return None, None
+            backup = first_good_backup(block=True)
+            if backup is not None:
+                return finish(*backup)
+    finally:
+        with lock:
+            state['closed'] = True
+            cancel_timer()
+            for future in pending:
+                future.cancel()
@@ -1,6 +1,5 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote, urljoin
 from .base_video_scraper import BaseVideoScraper
 
@@ -31,7 +30,7 @@ class MjwuScraper(BaseVideoScraper):
             if not response:
                 return self._get_default_categories()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 1. 添加排序入口（最新、最热、评分）
             categories.append({'id': 'by_time', 'name': '🔥 最新', 'type': 'sort', 'url': '/show/meiju/by/time/'})
@@ -118,7 +117,7 @@ class MjwuScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -332,7 +331,7 @@ class MjwuScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title = self._extract_detail_title(soup)
@@ -456,7 +455,7 @@ class MjwuScraper(BaseVideoScraper):
             if not response:
                 return episodes
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 查找播放列表 - 美剧屋使用 hl-plays-list
             play_list = soup.find('ul', class_='hl-plays-list')
@@ -541,7 +540,7 @@ class MjwuScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title = ''
@@ -633,7 +632,7 @@ class MjwuScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             videos = self._parse_video_list(soup, limit)
             
         except Exception as e:
@@ -4,10 +4,9 @@ import logging
 import re
 from urllib.parse import quote, urljoin, unquote
 
-import execjs
-from bs4 import BeautifulSoup
-
 from .base_video_scraper import BaseVideoScraper
+from .http_client import fix_encoding
+from . import aes_crypto
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +25,6 @@ class NetflixgcScraper(BaseVideoScraper):
             }
         )
         self.session.headers.update(self.headers)
-        self._decrypt_ctx = execjs.compile(
-            """
-            const crypto = require('crypto');
-            function decryptAesBase64(cipherText, keyStr, ivStr) {
-              if (!cipherText || !keyStr || !ivStr) {
-                return null;
-              }
-              const key = Buffer.from(keyStr, 'utf8');
-              const iv = Buffer.from(ivStr, 'utf8');
-              const decipher = crypto.createDecipheriv('aes-128-cbc', key, iv);
-              decipher.setAutoPadding(true);
-              let decrypted = decipher.update(String(cipherText), 'base64', 'utf8');
-              decrypted += decipher.final('utf8');
-              return decrypted;
-            }
-            """
-        )
 
     def get_categories(self):
         return [
@@ -67,7 +49,7 @@ class NetflixgcScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         return _parse_video_list(soup, limit, self.source_id, self.base_url)
 
     def _get_videos_by_category_via_api(self, category_id, page, limit):
@@ -103,12 +85,11 @@ class NetflixgcScraper(BaseVideoScraper):
             "Referer": referer,
         }
 
-        self._delay()
         try:
+            self._delay(self._list_api_url)
             resp = self.session.post(self._list_api_url, data=payload, headers=headers, timeout=10, verify=True)
             resp.raise_for_status()
-            if resp.encoding is None or resp.encoding.lower() == "iso-8859-1":
-                resp.encoding = resp.apparent_encoding
+            fix_encoding(resp)
         except Exception as e:
             logger.error("netflixgc 分类列表接口请求失败 category_id=%s page=%s url=%s err=%s", category_id, page, self._list_api_url, e)
             return None
@@ -166,7 +147,7 @@ class NetflixgcScraper(BaseVideoScraper):
         if not resp:
             return None
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         title = _first_text([soup.find("h1"), soup.find("title")]) or str(video_id)
         cover = _find_cover(soup, title, self.base_url)
         description = _find_description(soup)
@@ -192,7 +173,7 @@ class NetflixgcScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         links = soup.find_all("a", href=re.compile(r"/play/\d+-\d+-\d+\.html"))
         if not links:
             return []
@@ -266,7 +247,7 @@ class NetflixgcScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         return _parse_video_list(soup, limit, self.source_id, self.base_url)
 
     def _get_episode_detail_from_source(self, series_id, sid, episode_num):
@@ -283,17 +264,16 @@ class NetflixgcScraper(BaseVideoScraper):
             "Accept-Language": self.headers.get("Accept-Language"),
         }
 
-        self._delay()
         try:
+            self._delay(url)
             resp = self.session.get(url, headers=headers, timeout=10, verify=True)
             resp.raise_for_status()
-            if resp.encoding is None or resp.encoding.lower() == "iso-8859-1":
-                resp.encoding = resp.apparent_encoding
+            fix_encoding(resp)
         except Exception as e:
             logger.error("netflixgc 播放页请求失败 series_id=%s sid=%s episode_num=%s url=%s err=%s", series_id, sid, episode_num, url, e)
             return None
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         player = _extract_player_config(resp.text)
         encrypted_url = player.get("url") if isinstance(player, dict) else None
         if _is_blank(encrypted_url):
@@ -342,8 +322,7 @@ class NetflixgcScraper(BaseVideoScraper):
         try:
             resp = self.session.get(text_url, headers=headers, timeout=10, verify=True)
             resp.raise_for_status()
-            if resp.encoding is None or resp.encoding.lower() == 'iso-8859-1':
-                resp.encoding = resp.apparent_encoding
+            fix_encoding(resp)
         except Exception as e:
             logger.warning('netflixgc 获取 m3u8 失败 url=%s err=%s', text_url, e)
             return text_url
@@ -389,12 +368,11 @@ class NetflixgcScraper(BaseVideoScraper):
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         }
 
-        self._delay()
         try:
+            self._delay(parse_url)
             resp = self.session.get(parse_url, headers=headers, timeout=10, verify=True)
             resp.raise_for_status()
-            if resp.encoding is None or resp.encoding.lower() == "iso-8859-1":
-                resp.encoding = resp.apparent_encoding
+            fix_encoding(resp)
         except Exception as e:
             logger.error("netflixgc 解析页请求失败 url=%s err=%s", parse_url, e)
             return None
@@ -420,7 +398,7 @@ class NetflixgcScraper(BaseVideoScraper):
         key_str = f"2890{uid}tB959C"
         iv_str = "2F131BE91247866E"
         try:
-            plain = self._decrypt_ctx.call("decryptAesBase64", str(cipher_text), key_str, iv_str)
+            plain = aes_crypto.decrypt_base64(str(cipher_text), key_str, iv_str, bits=128)
         except Exception as e:
             logger.error("netflixgc 解密失败 uid=%s err=%s", uid, e)
             return None
@@ -0,0 +1,84 @@
+"""
+页面解析执行器
+
+异步爬虫在共享事件循环(async_loop)上并发请求章节的每一页, 原来每页响应到达后直接在协程里
+构建DOM/解包JS, 这段CPU工作期间事件循环无法处理其它响应, 几十页的章节里请求实际上被串行化。
+这里可以把解析交给执行器, 协程只负责I/O:
+
+- inline(默认): 仍在事件循环内解析. bs4 建树是纯Python代码且持有GIL, 线程池并不能并行解析,
+  只缩短事件循环最长的停顿, 整章耗时反而更长(见 bench_parse_executor.py)
+- thread: 线程池, 适合更在意单次停顿(例如同一循环上还有其它短请求)的部署
+- process: 进程池(spawn), 真正并行, 但要付出pickle与进程间传输的开销; 解析函数与参数需可pickle
+
+只有在部署环境上用 bench_parse_executor.py 确认整章耗时下降时才改用 thread/process。
+
+解析函数应是模块级的纯函数, 接收文本返回结果, 不访问爬虫实例。
+"""
+import atexit
+import asyncio
+import logging
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from config import PARSE_EXECUTOR, PARSE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('thread', 'process', 'inline')
+
+
+class ParseExecutor:
+    """按配置把解析函数交给线程池/进程池执行, 首次使用时创建"""
+
+    def __init__(self, kind=PARSE_EXECUTOR, workers=PARSE_WORKERS):
+        if kind not in KINDS:
+            logger.warning('未知的解析执行器 %s, 使用 inline', kind)
+            kind = 'inline'
+        self.kind = kind
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        """返回执行器, inline 时为None"""
+        if self.kind == 'inline':
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == 'process':
+                        # Flask进程中有多个线程, fork 可能复制持有中的锁
+                        self._executor = ProcessPoolExecutor(
+                            self.workers, mp_context=multiprocessing.get_context('spawn')
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='parse')
+        return self._executor
+
+    async def run(self, func, *args):
+        """在执行器中执行 func(*args) 并等待结果, 需在事件循环内调用"""
+        executor = self.executor
+        if executor is None:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args))
+
+    def configure(self, kind):
+        """切换执行器类型(测试与基准用), 关闭原执行器"""
+        if kind not in KINDS:
+            raise ValueError(f'未知的解析执行器: {kind}')
+        self.shutdown()
+        self.kind = kind
+
+    def shutdown(self):
+        """关闭执行器, 下次使用时重新创建"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+parse_executor = ParseExecutor()
+atexit.register(parse_executor.shutdown)
@@ -0,0 +1,244 @@
+"""
+章节预读
+
+读者打开第N章后, 下一次请求几乎总是第N+1章。这里在后台把下一章的图片列表/正文
+提前写入缓存:
+
+- 章节列表接口经过时记录"当前章 -> 下一章"的对应关系
+- 章节图片/正文接口返回后, 下一章不在缓存中(或已软过期)时把同一接口放入后台队列执行
+- 队列有长度上限, 满了直接丢弃; 每个数据源的并发数单独限制
+- 预读的上游请求为低优先级(见 rate_limiter.low_priority), 不占用留给读者请求的限速配额,
+  受 API_DEADLINE 约束; 没拿全的结果不写缓存
+"""
+import re
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import request, current_app, g, url_for
+from config import (
+    PREFETCH_ENABLED, PREFETCH_WORKERS, PREFETCH_QUEUE_SIZE,
+    PREFETCH_SOURCE_CONCURRENCY, PREFETCH_INDEX_TTL, API_DEADLINE
+)
+from services.cache import response_json
+from services.deadline import deadline_scope
+from services.rate_limiter import low_priority
+
+logger = logging.getLogger(__name__)
+
+
+def _chapter_number(title):
+    """提取章节标题中的编号, 与前端阅读器的规则一致"""
+    match = re.search(r'(\d+)', title or '')
+    return int(match.group(1)) if match else None
+
+
+class ChapterIndex:
+    """章节后继索引, 条目数有上限"""
+
+    def __init__(self, max_chapters=50000):
+        self.max_chapters = max_chapters
+        self._lock = threading.Lock()
+        # (kind, source, list_id) -> 记录时间
+        self._lists = OrderedDict()
+        # (kind, source, chapter_id) -> next_chapter_id
+        self._next = OrderedDict()
+
+    def needs_refresh(self, kind, source, list_id):
+        with self._lock:
+            recorded = self._lists.get((kind, source, list_id))
+            return recorded is None or time.time() - recorded > PREFETCH_INDEX_TTL
+
+    def remember(self, kind, source, list_id, chapters):
+        """
+        记录章节列表的后继关系
+
+        漫画按标题中的章节号+1查找下一章(与阅读器一致), 取不到编号时按列表顺序;
+        电子书按列表顺序
+        """
+        pairs = []
+        if kind == 'comic':
+            by_number = {}
+            for chapter in chapters:
+                number = _chapter_number(chapter.get('title'))
+                if number is not None:
+                    by_number.setdefault(number, chapter.get('id'))
+            for chapter in chapters:
+                number = _chapter_number(chapter.get('title'))
+                next_id = by_number.get(number + 1) if number is not None else None
+                if next_id:
+                    pairs.append((chapter.get('id'), next_id))
+        if not pairs:
+            pairs = [(a.get('id'), b.get('id')) for a, b in zip(chapters, chapters[1:])]
+
+        with self._lock:
+            self._lists[(kind, source, list_id)] = time.time()
+            self._lists.move_to_end((kind, source, list_id))
+            for chapter_id, next_id in pairs:
+                if chapter_id and next_id:
+                    self._next[(kind, source, str(chapter_id))] = str(next_id)
+                    self._next.move_to_end((kind, source, str(chapter_id)))
+            while len(self._next) > self.max_chapters:
+                self._next.popitem(last=False)
+            while len(self._lists) > self.max_chapters:
+                self._lists.popitem(last=False)
+
+    def next_chapter(self, kind, source, chapter_id):
+        with self._lock:
+            return self._next.get((kind, source, str(chapter_id)))
+
+
+class Prefetcher:
+    """后台预读队列"""
+
+    def __init__(self, workers=PREFETCH_WORKERS, queue_size=PREFETCH_QUEUE_SIZE,
+                 source_concurrency=PREFETCH_SOURCE_CONCURRENCY):
+        self.workers = workers
+        self.source_concurrency = source_concurrency
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._source_slots = {}
+        self._threads = []
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'prefetch-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _slot(self, source):
+        with self._lock:
+            slot = self._source_slots.get(source)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.source_concurrency)
+                self._source_slots[source] = slot
+            return slot
+
+    def submit(self, app, endpoint, view_args, query, source):
+        """放入预读任务, 重复或队列已满时返回False"""
+        job_key = (endpoint, tuple(sorted(view_args.items())), tuple(sorted(query.items())))
+        with self._lock:
+            if job_key in self._pending:
+                return False
+            self._pending.add(job_key)
+        try:
+            self._queue.put_nowait((job_key, app, endpoint, view_args, query, source))
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(job_key)
+            logger.debug('预读队列已满, 丢弃 %s %s', endpoint, view_args)
+            return False
+        self._ensure_workers()
+        return True
+
+    def _worker(self):
+        while True:
+            job_key, app, endpoint, view_args, query, source = self._queue.get()
+            try:
+                with self._slot(source):
+                    self._run(app, endpoint, view_args, query)
+            except Exception as e:
+                logger.warning('预读失败 endpoint=%s args=%s err=%s', endpoint, view_args, e)
+            finally:
+                with self._lock:
+                    self._pending.discard(job_key)
+                self._queue.task_done()
+
+    @staticmethod
+    def _run(app, endpoint, view_args, query):
+        """在模拟的请求上下文中执行同一个视图, 由 cache_response 写入缓存"""
+        with app.test_request_context():
+            path = url_for(endpoint, **view_args)
+        with app.test_request_context(path, query_string=query):
+            g.prefetching = True
+            with deadline_scope(API_DEADLINE), low_priority():
+                app.view_functions[endpoint](**view_args)
+
+    def join(self):
+        """等待队列中的任务全部完成(测试用)"""
+        self._queue.join()
+
+
+chapter_index = ChapterIndex()
+prefetcher = Prefetcher()
+
+
+def _source_param():
+    return request.args.get('source') or 'default'
+
+
+def track_chapter_list(kind, list_arg):
+    """
+    记录章节列表的后继关系, 需放在 cache_response 外层
+
+    缓存命中时也会经过这里; 同一列表在 PREFETCH_INDEX_TTL 内只解析一次
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if not PREFETCH_ENABLED:
+                return result
+            try:
+                source = _source_param()
+                list_id = kwargs.get(list_arg)
+                if chapter_index.needs_refresh(kind, source, list_id):
+                    data = response_json(result)
+                    chapters = data.get('chapters') if isinstance(data, dict) else None
+                    if chapters:
+                        chapter_index.remember(kind, source, list_id, chapters)
+            except Exception as e:
+                logger.debug('记录章节列表失败: %s', e)
+            return result
+        return wrapper
+    return decorator
+
+
+def _already_cached(func, view_args):
+    """下一章的同一接口是否已在缓存中且未软过期, func 为 cache_response 包装后的视图"""
+    is_cached = getattr(func, 'is_cached', None)
+    if is_cached is None:
+        return False
+    path = url_for(request.endpoint, **view_args)
+    if request.script_root and path.startswith(request.script_root):
+        path = path[len(request.script_root):]
+    return is_cached(path, view_args, request.args.to_dict(flat=True))
+
+
+def prefetch_next_chapter(kind, chapter_arg='chapter_id'):
+    """
+    返回当前章节后, 把下一章的同一接口放入后台预读, 需放在 cache_response 外层
+
+    预读请求本身不会继续触发预读
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if not PREFETCH_ENABLED or g.get('prefetching'):
+                return result
+            try:
+                source = _source_param()
+                next_id = chapter_index.next_chapter(kind, source, kwargs.get(chapter_arg))
+                view_args = dict(kwargs, **{chapter_arg: next_id}) if next_id else None
+                if view_args and not _already_cached(func, view_args):
+                    prefetcher.submit(
+                        current_app._get_current_object(),
+                        request.endpoint,
+                        view_args,
+                        request.args.to_dict(flat=True),
+                        source,
+                    )
+            except Exception as e:
+                logger.debug('提交预读任务失败: %s', e)
+            return result
+        return wrapper
+    return decorator
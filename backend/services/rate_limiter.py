@@ -0,0 +1,190 @@
+"""
+上游请求限速
+
+按host使用令牌桶限速, 所有线程共享同一个桶:
+
+- 桶内有令牌时立即放行, 允许 burst 个请求的突发
+- 令牌用完后按 rate(每秒请求数) 排队等待, 不再每次固定随机睡眠
+- 限速参数按数据源配置: config.RATE_LIMITS > COMIC_SOURCES / data/source_market.json
+  条目中的 rate_limit > config.RATE_LIMIT_DEFAULT
+- 后台请求(预读, 见 low_priority())只使用桶中超出保留部分的令牌, 不足时等待而不排在前台请求前面
+"""
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from config import COMIC_SOURCES, RATE_LIMIT_DEFAULT, RATE_LIMITS, RATE_LIMIT_BACKGROUND_RESERVE
+from services.deadline import current_deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+_low_priority = contextvars.ContextVar('rate_limit_low_priority', default=False)
+
+
+@contextmanager
+def low_priority():
+    """代码块内的请求为后台请求, 给前台请求保留 burst 的 RATE_LIMIT_BACKGROUND_RESERVE 比例"""
+    token = _low_priority.set(True)
+    try:
+        yield
+    finally:
+        _low_priority.reset(token)
+
+
+def normalize_host(url):
+    """取出URL中的host, 小写并去掉端口与 www. 前缀; 传入的本身是host时原样处理"""
+    if not url:
+        return ''
+    netloc = urlsplit(url).netloc if '//' in url else url.split('/')[0]
+    host = netloc.rsplit('@', 1)[-1].split(':')[0].lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class TokenBucket:
+    """线程安全的令牌桶, rate<=0 表示不限速"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        取一个令牌, 返回需要等待的秒数
+
+        令牌不足时预支为负数, 并发请求因此按到达顺序依次排队
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def take_above(self, floor):
+        """
+        取走一个令牌后桶内仍不少于 floor 时取走并返回0, 否则不取, 返回预计还需等待的秒数
+
+        后台请求用它给前台请求保留令牌: 前台请求排队(令牌为负)时后台请求一直等待
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens - 1 >= floor:
+                self._tokens -= 1
+                return 0.0
+            return (floor + 1 - self._tokens) / self.rate
+
+    def refund(self):
+        """归还 reserve() 取走但最终没有使用的令牌"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def acquire(self):
+        """取一个令牌, 必要时在锁外等待; 返回实际等待秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """按host管理令牌桶, 首次访问某个host时解析它的限速参数"""
+
+    def __init__(self, default=None, overrides=None):
+        self.default = dict(default or RATE_LIMIT_DEFAULT)
+        self.overrides = dict(RATE_LIMITS if overrides is None else overrides)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._host_limits = None
+
+    def _load_host_limits(self):
+        """数据源ID -> host, 汇总每个host的限速参数"""
+        limits = {}
+        entries = [(source_id, conf.get('base_url'), conf.get('rate_limit'))
+                   for source_id, conf in COMIC_SOURCES.items()]
+        try:
+            from services.source_market import SourceMarket
+            for source in SourceMarket().get_all_sources():
+                entries.append((source.get('id'), source.get('url'), source.get('rate_limit')))
+        except Exception as e:
+            logger.warning('读取数据源市场限速配置失败: %s', e)
+
+        for source_id, url, rate_limit in entries:
+            limit = self.overrides.get(source_id) or rate_limit
+            host = normalize_host(url)
+            if host and limit:
+                limits.setdefault(host, {}).update(limit)
+        # 直接以host为键的覆盖配置
+        for key, limit in self.overrides.items():
+            if '.' in key:
+                limits[normalize_host(key)] = dict(limit)
+        return limits
+
+    def limits_for(self, host):
+        """精确匹配host, 再依次去掉最左侧一级子域名匹配"""
+        if self._host_limits is None:
+            self._host_limits = self._load_host_limits()
+        labels = host.split('.')
+        for i in range(max(1, len(labels) - 1)):
+            limit = self._host_limits.get('.'.join(labels[i:]))
+            if limit:
+                return dict(self.default, **limit)
+        return dict(self.default)
+
+    def bucket(self, url):
+        host = normalize_host(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                limit = self.limits_for(host)
+                bucket = TokenBucket(limit.get('rate', 0), limit.get('burst', 1))
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        """请求 url 前调用, 该host配额用完时才会等待; 等待会超出请求期限时直接放弃"""
+        bucket = self.bucket(url)
+        if _low_priority.get():
+            return self._acquire_low_priority(bucket, url)
+        wait = bucket.reserve()
+        if wait > 0:
+            deadline = current_deadline()
+            if deadline is not None and wait > deadline.remaining():
+                bucket.refund()
+                deadline.exceeded = True
+                raise DeadlineExceeded(f'限速等待 {wait:.1f} 秒将超出请求期限: {url}')
+            time.sleep(wait)
+        return wait
+
+    def _acquire_low_priority(self, bucket, url):
+        """后台请求: 等到桶内令牌超过保留部分再取, 等待超出期限时放弃"""
+        # burst 很小时至少允许在桶满时取一个
+        floor = min(bucket.burst * RATE_LIMIT_BACKGROUND_RESERVE, bucket.burst - 1)
+        waited = 0.0
+        while True:
+            wait = bucket.take_above(floor)
+            if wait <= 0:
+                return waited
+            deadline = current_deadline()
+            if deadline is not None and wait > deadline.remaining():
+                deadline.exceeded = True
+                raise DeadlineExceeded(f'后台请求等待配额将超出期限: {url}')
+            time.sleep(wait)
+            waited += wait
+
+
+rate_limiter = HostRateLimiter()
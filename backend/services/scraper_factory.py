@@ -1,7 +1,9 @@
+import threading
 from .xmanhua_scraper import XmanhuaScraper
 from .hmzxa_scraper import HmzxaScraper
 from .animezilla_scraper import AnimezillaScraper
 from .baozimh_scraper import BaozimhScraper
+from .circuit_breaker import circuit_breakers
 from config import COMIC_SOURCES, DEFAULT_SOURCE
 
 class ScraperFactory:
@@ -15,12 +17,17 @@ class ScraperFactory:
     }
     
     _instances = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def resolve_source(cls, source=None):
+        """返回 get_scraper 使用的数据源ID, 未指定时为默认数据源"""
+        return DEFAULT_SOURCE if source is None else source
     
     @classmethod
     def get_scraper(cls, source=None):
         """获取爬虫实例"""
-        if source is None:
-            source = DEFAULT_SOURCE
+        source = cls.resolve_source(source)
         
         # 检查数据源是否存在且启用
         if source not in COMIC_SOURCES:
@@ -29,31 +36,36 @@ class ScraperFactory:
         if not COMIC_SOURCES[source]['enabled']:
             raise ValueError(f'数据源已禁用: {source}')
         
-        # 单例模式,避免重复创建
-        if source not in cls._instances:
-            scraper_class = cls._scrapers.get(source)
-            if not scraper_class:
-                raise ValueError(f'数据源未实现: {source}')
+        # 单例模式,避免重复创建; 实例可被多个线程同时使用, 创建时加锁避免并发首次请求各建一个
+        instance = cls._instances.get(source)
+        if instance is not None:
+            return instance
+        with cls._lock:
+            if source not in cls._instances:
+                scraper_class = cls._scrapers.get(source)
+                if not scraper_class:
+                    raise ValueError(f'数据源未实现: {source}')
+                
+                # 获取代理配置
+                proxy_config = COMIC_SOURCES[source].get('proxy', None)
+                
+                # 创建实例，传入代理配置
+                if source in ['xmanhua', 'hmzxa', 'animezilla', 'baozimh']:
+                    cls._instances[source] = scraper_class(proxy_config)
+                else:
+                    cls._instances[source] = scraper_class()
             
-            # 获取代理配置
-            proxy_config = COMIC_SOURCES[source].get('proxy', None)
-            
-            # 创建实例，传入代理配置
-            if source in ['xmanhua', 'hmzxa', 'animezilla', 'baozimh']:
-                cls._instances[source] = scraper_class(proxy_config)
-            else:
-                cls._instances[source] = scraper_class()
-        
-        return cls._instances[source]
+            return cls._instances[source]
     
     @classmethod
     def get_available_sources(cls):
-        """获取所有可用的数据源"""
+        """获取所有可用的数据源, health 为上游熔断状态"""
         return {
             key: {
                 'name': value['name'],
                 'description': value['description'],
                 'enabled': value['enabled'],
+                'health': circuit_breakers.health(value['base_url']),
             }
             for key, value in COMIC_SOURCES.items()
             if value['enabled']
@@ -2,6 +2,7 @@ import json
 import os
 from typing import List, Dict, Optional
 from .meta_image_fetcher import get_meta_image
+from .circuit_breaker import circuit_breakers
 
 class SourceMarket:
     """数据源市场服务类"""
@@ -43,10 +44,12 @@ class SourceMarket:
         return current_icon or ''
     
     def _enrich_source(self, source: Dict) -> Dict:
-        """丰富数据源信息，包括自动获取图标"""
+        """丰富数据源信息，包括自动获取图标与上游熔断状态"""
         enriched = source.copy()
         # 自动获取图标
         enriched['icon'] = self._get_source_icon(source)
+        # 上游不可用时前端可以置灰
+        enriched['health'] = circuit_breakers.health(source.get('url', ''))
         return enriched
     
     def get_all_sources(self) -> List[Dict]:
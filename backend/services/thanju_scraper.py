@@ -1,11 +1,14 @@
 import re
 import json
 import requests
-from bs4 import BeautifulSoup
 from .base_video_scraper import BaseVideoScraper
+from .http_client import fix_encoding
 
 class ThanjuScraper(BaseVideoScraper):
     """热播韩剧网(thanju.com)视频爬虫"""
+
+    # 分类列表页只解析视频卡片; 改版后没有卡片时退回完整解析, 走按detail链接查找的备用方案
+    VIDEO_LIST_REGION = 'div.myui-vodlist__box'
     
     def __init__(self, proxy_config=None):
         super().__init__('https://www.thanju.com', proxy_config)
@@ -21,7 +24,7 @@ class ThanjuScraper(BaseVideoScraper):
             url = f'{self.base_url}/list-select-id-1-order-addtime.html'
             response = self._make_request(url)
             if response:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = self._parse_html(response.text)
                 
                 # 添加默认分类
                 categories.append({'id': 'hot', 'name': '热门'})
@@ -76,7 +79,7 @@ class ThanjuScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text, only=self.VIDEO_LIST_REGION)
             
             # 查找视频列表容器 - 根据实际HTML结构
             # 视频项通常在ul或div容器中
@@ -375,7 +378,7 @@ class ThanjuScraper(BaseVideoScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 标题
             title_elem = soup.find('h1')
@@ -511,7 +514,7 @@ class ThanjuScraper(BaseVideoScraper):
             if not response:
                 return episodes
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 直接查找所有包含/play/的链接（格式：/play/2429/1-1.html）
             episode_links = soup.find_all('a', href=re.compile(r'/play/\d+/\d+-\d+\.html'))
@@ -605,12 +608,6 @@ class ThanjuScraper(BaseVideoScraper):
     def _get_episode_detail_from_source(self, series_id, playlist_id, episode_num):
         """从指定播放源获取剧集详情"""
         try:
-            # 先访问首页获取Cookie
-            print('访问首页获取Cookie...')
-            home_response = self._make_request(self.base_url)
-            if home_response:
-                print('成功获取首页Cookie')
-            
             url = f'{self.base_url}/play/{series_id}/{playlist_id}-{episode_num}.html'
             
             # 播放页面需要携带Referer和更完整的请求头
@@ -624,23 +621,13 @@ class ThanjuScraper(BaseVideoScraper):
                 'Upgrade-Insecure-Requests': '1',
             }
             
-            # 使用自定义请求头
-            self._delay()
-            try:
-                response = self.session.get(url, headers=headers, timeout=10, verify=True)
-                response.raise_for_status()
-                
-                # 如果响应编码不正确,尝试自动检测
-                if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
-                    response.encoding = response.apparent_encoding
-            except requests.RequestException as e:
-                print(f'请求播放页面失败: {url}, 错误: {e}')
-                return None
-            
+            # 使用自定义请求头; 首页Cookie按站点共享, 过期或被拒绝时才重新访问首页
+            response = self._make_warm_request(url, headers=headers)
             if not response:
+                print(f'请求播放页面失败: {url}')
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 检查页面是否包含错误信息（但不立即返回，先尝试解析）
             title = soup.find('title')
@@ -821,12 +808,11 @@ class ThanjuScraper(BaseVideoScraper):
                 'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
             }
             
-            self._delay()
             try:
+                self._delay(url)
                 response = self.session.get(url, headers=headers, timeout=10, verify=True)
                 response.raise_for_status()
-                if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
-                    response.encoding = response.apparent_encoding
+                fix_encoding(response)
             except requests.RequestException as e:
                 print(f'搜索请求失败: {url}, 错误: {e}')
                 return videos
@@ -834,7 +820,7 @@ class ThanjuScraper(BaseVideoScraper):
             if not response:
                 return videos
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 根据提供的HTML结构查找搜索结果
             # 路径: body > div.wrap > div > div > div.col-md-wide-7.col-xs-1 > div > div > div.myui-panel_bd.col-pd.clearfix > ul > li
@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 from services.base_ebook_scraper import BaseEbookScraper
 import re
 import logging
@@ -121,7 +120,7 @@ class TtkanScraper(BaseEbookScraper):
             if not response:
                 return {'books': [], 'total': 0, 'page': page, 'hasMore': False}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 查找所有小说条目 - 先找到 div.pure-g 容器,然后找其中包含 novel_cell 的子div
             pure_g_container = soup.find('div', class_='pure-g')
@@ -279,7 +278,7 @@ class TtkanScraper(BaseEbookScraper):
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 提取书名 - 从标题中提取
             title = ''
@@ -426,22 +425,17 @@ class TtkanScraper(BaseEbookScraper):
     def get_chapter_content(self, chapter_id):
         """获取章节内容"""
         try:
-            # 先访问首页获取Cookie
-            logger.info("访问首页获取Cookie...")
-            home_response = self._make_request(self.base_url)
-            if home_response:
-                logger.info("成功获取首页Cookie")
-            
             # 构建章节URL
             chapter_url = f"{self.base_url}/novel/pagea/{chapter_id}.html"
             logger.info(f"获取章节内容: {chapter_url}")
             
-            response = self._make_request(chapter_url)
+            # 首页Cookie按站点共享, 过期或被拒绝时才重新访问首页
+            response = self._make_warm_request(chapter_url)
             if not response:
                 logger.error(f"无法获取章节页面: {chapter_url}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response.text)
             
             # 提取章节标题
             title = ''
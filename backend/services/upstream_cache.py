@@ -0,0 +1,158 @@
+"""
+上游响应缓存(条件请求)
+
+位于接口缓存之下, 按URL保存上游返回的原始内容及其 ETag / Last-Modified。
+再次请求同一URL时带上 If-None-Match / If-Modified-Since, 上游返回304时直接复用
+保存的内容, 分类树、作者页这类很少变化的页面不必每次完整下载。
+
+只对 UPSTREAM_CACHE_HOSTS 中的站点默认开启, 其他请求可按次显式开启
+"""
+import time
+import logging
+import threading
+from urllib.parse import urlencode
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from config import (
+    UPSTREAM_CACHE_ENABLED, UPSTREAM_CACHE_PATH, UPSTREAM_CACHE_MAX_BYTES,
+    UPSTREAM_CACHE_TTL, UPSTREAM_CACHE_HOSTS
+)
+from services.disk_cache import DiskCache
+from services.rate_limiter import normalize_host
+from services.circuit_breaker import CircuitOpenError
+from services.deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# 随内容一起保存的响应头
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Expires')
+
+
+class UpstreamCache:
+    """保存上游原始响应, 支持条件请求复用"""
+
+    def __init__(self, store=None, hosts=UPSTREAM_CACHE_HOSTS, ttl=UPSTREAM_CACHE_TTL):
+        self._store = store
+        self._lock = threading.Lock()
+        self.hosts = {normalize_host(host) for host in hosts}
+        self.ttl = ttl
+        self.revalidated = 0
+        self.stale_served = 0
+        self.stored = 0
+
+    @property
+    def store(self):
+        """首次使用时打开磁盘存储, 打开失败时返回None(不缓存)"""
+        if self._store is None and UPSTREAM_CACHE_ENABLED:
+            with self._lock:
+                if self._store is None:
+                    try:
+                        self._store = DiskCache(UPSTREAM_CACHE_PATH, max_bytes=UPSTREAM_CACHE_MAX_BYTES)
+                    except Exception as e:
+                        logger.warning('上游响应缓存初始化失败, 不再使用: %s', e)
+                        self._store = False
+        return self._store if self._store is not False else None
+
+    def enabled_for(self, url):
+        """该URL的host(含子域名)是否默认开启"""
+        host = normalize_host(url)
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    @staticmethod
+    def key(url, params=None):
+        if params:
+            query = urlencode(sorted(params.items()) if isinstance(params, dict) else params)
+            url = f"{url}{'&' if '?' in url else '?'}{query}"
+        return f'upstream:{url}'
+
+    def lookup(self, key):
+        store = self.store
+        return store.get(key) if store is not None else None
+
+    @staticmethod
+    def validators(entry):
+        """根据保存的响应生成条件请求头"""
+        headers = {}
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def save(self, key, response):
+        """保存带校验信息的200响应, 没有 ETag / Last-Modified 的不保存"""
+        store = self.store
+        if store is None or response.status_code != 200:
+            return False
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        if 'ETag' not in headers and 'Last-Modified' not in headers:
+            return False
+        entry = {
+            'url': response.url,
+            'headers': headers,
+            'content': response.content,
+            'stored_at': time.time(),
+        }
+        if store.set(key, entry, timeout=self.ttl):
+            self.stored += 1
+            return True
+        return False
+
+    def replay(self, key, entry, not_modified=None, status='revalidated'):
+        """
+        用保存的内容构造200响应; 304带来的新校验信息写回缓存
+
+        not_modified 为None表示没有访问上游(熔断中), 直接返回旧内容
+        """
+        headers = CaseInsensitiveDict(entry['headers'])
+        changed = False
+        for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Expires'):
+            value = not_modified.headers.get(name) if not_modified is not None else None
+            if value and headers.get(name) != value:
+                headers[name] = value
+                changed = True
+        if changed:
+            entry = dict(entry, headers=dict(headers))
+            self.store.set(key, entry, timeout=self.ttl)
+
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = entry['content']
+        response.headers = headers
+        response.headers['X-Upstream-Cache'] = status
+        response.encoding = get_encoding_from_headers(headers)
+        response.url = entry['url']
+        if not_modified is not None:
+            response.request = not_modified.request
+            response.elapsed = not_modified.elapsed
+            self.revalidated += 1
+        else:
+            self.stale_served += 1
+        return response
+
+    def send(self, session, method, url, **kwargs):
+        """
+        带条件请求头发送GET, 304时返回保存的内容, 200时更新缓存;
+        上游熔断中或请求期限已用完, 且有保存的内容时直接返回旧内容
+        """
+        key = self.key(url, kwargs.get('params'))
+        entry = self.lookup(key)
+        if entry:
+            headers = dict(kwargs.get('headers') or {})
+            headers.update(self.validators(entry))
+            kwargs['headers'] = headers
+        try:
+            response = session.request(method, url, **kwargs)
+        except (CircuitOpenError, DeadlineExceeded):
+            if entry:
+                return self.replay(key, entry, status='stale')
+            raise
+        if entry and response.status_code == 304:
+            return self.replay(key, entry, response)
+        self.save(key, response)
+        return response
+
+
+upstream_cache = UpstreamCache()
@@ -9,19 +9,154 @@ import urllib3
 import hashlib
 import logging
 import asyncio
-import aiohttp
 from datetime import datetime
 from urllib.parse import quote
-from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .async_loop import async_loop
+from .parse_executor import parse_executor
+from . import js_packer
 
 logger = logging.getLogger(__name__)
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+
+def extract_uk_from_tokens(packed_code):
+    """直接从token数组中提取uk值"""
+    try:
+        split_match = re.search(r"'([^']+)'\.split\('\|'\)", packed_code)
+        if split_match:
+            tokens = split_match.group(1).split('|')
+            
+            for token in tokens:
+                if len(token) > 40 and re.match(r'^[A-F0-9]+$', token):
+                    return token
+        
+        return None
+    except Exception:
+        return None
+
+
+def unpack_js(packed_code):
+    """解包Dean Edwards Packer混淆的JS代码"""
+    return js_packer.unpack(packed_code)
+
+
+def decode_packed_js(packed_code):
+    """解码混淆的JavaScript代码，提取图片URL"""
+    try:
+        # 先解包JS代码
+        unpacked = unpack_js(packed_code)
+        
+        if not unpacked:
+            logger.debug("解包失败，返回None")
+            return None
+        
+        # 调试：打印解包后的代码
+        # print(f"  解包后的代码: {unpacked[:200]}...")
+        
+        # 从解包后的代码中提取变量
+        cid_match = re.search(r'(?:var\s+)?cid\s*=\s*(\d+)', unpacked)
+        key_match = re.search(r'(?:var\s+)?key\s*=\s*[\'"]?([a-f0-9]{32})[\'"]?', unpacked)
+        pix_match = re.search(r'(?:var\s+)?pix\s*=\s*[\'"]([^\'"]+)[\'"]', unpacked)
+        
+        # 提取图片数组
+        pvalue_match = re.search(r'(?:var\s+)?pvalue\s*=\s*\[(.*?)\]', unpacked)
+        
+        if not (cid_match and key_match and pix_match and pvalue_match):
+            logger.debug(f"提取变量失败: cid={bool(cid_match)}, key={bool(key_match)}, pix={bool(pix_match)}, pvalue={bool(pvalue_match)}")
+            if unpacked:
+                logger.debug(f"解包后的代码片段: {unpacked[:300]}")
+            return None
+        
+        cid = cid_match.group(1)
+        key = key_match.group(1)
+        pix = pix_match.group(1)
+        pvalue_str = pvalue_match.group(1)
+        
+        # 分割图片路径
+        images = [img.strip().strip('"\'') for img in pvalue_str.split(',')]
+        
+        # 提取uk值（长16进制字符串）
+        uk = extract_uk_from_tokens(packed_code) or ""
+        
+        # 构建完整URL列表
+        full_urls = []
+        for img in images:
+            if img:  # 跳过空字符串
+                url = f"{pix}{img}?cid={cid}&key={key}&uk={uk}"
+                full_urls.append(url)
+        
+        return full_urls if full_urls else None
+        
+    except Exception as e:
+        logger.debug(f"解码失败: {e}", exc_info=True)
+        return None
+
+
+def resolve_page_image(response_text, page_num, cid):
+    """
+    从章节图片接口的单页响应(Packer混淆的JS)中得到该页图片
+
+    模块级纯函数, 可交给解析执行器(线程池/进程池)执行; 返回 {'page', 'url'}, 解析不到时返回None
+    """
+    result = decode_packed_js(response_text)
+    uk_value = extract_uk_from_tokens(response_text)
+
+    if page_num == 1:
+        if uk_value:
+            logger.debug(f"成功提取uk参数: {uk_value[:50]}...")
+        if result:
+            logger.debug(f"解析得到 {len(result)} 个URL")
+
+    if result and isinstance(result, list) and len(result) > 0:
+        img_url = result[0]
+
+        if page_num <= 3:
+            logger.debug(f"第{page_num}页原始URL: {img_url}")
+
+        if img_url:
+            if not img_url.startswith('http'):
+                img_url = 'https:' + img_url if img_url.startswith('//') else 'https://image.xmanhua.com' + img_url
+
+            if '?' not in img_url:
+                img_url = f"{img_url}?cid={cid}&key="
+
+            if uk_value:
+                if img_url.endswith('&uk='):
+                    img_url = img_url + uk_value
+                elif 'uk=' not in img_url:
+                    img_url = img_url + '&uk=' + uk_value
+
+            if page_num <= 3:
+                logger.debug(f"第{page_num}页最终URL: {img_url[:100]}...")
+
+            return {'page': page_num, 'url': img_url}
+    else:
+        # 备用方案
+        url_match = re.search(r'(https?://[^"\s]+\.(?:jpg|png|webp)[^"\s]*)', response_text)
+        if url_match:
+            img_url = url_match.group(1)
+            if uk_value and '&uk=' in img_url and img_url.endswith('&uk='):
+                img_url = img_url + uk_value
+            return {'page': page_num, 'url': img_url}
+        else:
+            path_match = re.search(r'(/\d+/\d+/\d+/\d+_\d+\.(?:jpg|png|webp))', response_text)
+            if path_match:
+                path = path_match.group(1)
+                img_url = f"https://image.xmanhua.com{path}?cid={cid}&key="
+                if uk_value:
+                    img_url += f"&uk={uk_value}"
+                return {'page': page_num, 'url': img_url}
+    return None
+
+
 class XmanhuaScraper(BaseScraper):
     """X漫画爬虫实现"""
+
+    # 目录页只解析章节列表
+    CHAPTER_LIST_REGION = '#chapterlistload'
     
     def __init__(self, proxy_config=None):
         self.base_url = 'https://xmanhua.com'
@@ -35,112 +170,15 @@ class XmanhuaScraper(BaseScraper):
     
     def extract_uk_from_tokens(self, packed_code):
         """直接从token数组中提取uk值"""
-        try:
-            split_match = re.search(r"'([^']+)'\.split\('\|'\)", packed_code)
-            if split_match:
-                tokens = split_match.group(1).split('|')
-                
-                for token in tokens:
-                    if len(token) > 40 and re.match(r'^[A-F0-9]+$', token):
-                        return token
-            
-            return None
-        except Exception:
-            return None
+        return extract_uk_from_tokens(packed_code)
     
     def unpack_js(self, packed_code):
         """解包Dean Edwards Packer混淆的JS代码"""
-        try:
-            # 使用更健壮的正则提取核心参数：p, a, c, k
-            # 能处理包含转义字符 \' 的复杂情况
-            pattern = r"\}\s*\(\s*(['\"])((?:(?!\1|\\).|\\.)*)\1\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(['\"])((?:(?!\5|\\).|\\.)*)\5\.split\('\|'\)"
-            
-            match = re.search(pattern, packed_code)
-            if not match:
-                logger.debug("无法匹配Packer格式")
-                return None
-            
-            # 提取分组
-            quote_p = match.group(1)  # payload的引号类型
-            p_raw = match.group(2)     # payload原文
-            a = int(match.group(3))
-            c = int(match.group(4))
-            k_raw = match.group(6)     # keywords原文
-            
-            # 预处理：还原payload中的转义字符
-            p = p_raw.replace(f"\\{quote_p}", quote_p).replace(r"\\", "\\")
-            
-            # 准备关键词列表
-            k = k_raw.split('|')
-            
-            # Base36转换函数
-            def base36(n):
-                chars = "0123456789abcdefghijklmnopqrstuvwxyz"
-                if n < len(chars):
-                    return chars[n]
-                return base36(n // len(chars)) + chars[n % len(chars)]
-            
-            # 执行替换逻辑（倒序替换）
-            for i in range(c - 1, -1, -1):
-                if i < len(k) and k[i]:
-                    token = base36(i)
-                    p = re.sub(r'\b' + token + r'\b', k[i], p)
-            
-            return p
-        except Exception as e:
-            logger.debug(f"解包JS失败: {e}", exc_info=True)
-            return None
+        return unpack_js(packed_code)
     
     def decode_packed_js(self, packed_code):
         """解码混淆的JavaScript代码，提取图片URL"""
-        try:
-            # 先解包JS代码
-            unpacked = self.unpack_js(packed_code)
-            
-            if not unpacked:
-                logger.debug("解包失败，返回None")
-                return None
-            
-            # 调试：打印解包后的代码
-            # print(f"  解包后的代码: {unpacked[:200]}...")
-            
-            # 从解包后的代码中提取变量
-            cid_match = re.search(r'(?:var\s+)?cid\s*=\s*(\d+)', unpacked)
-            key_match = re.search(r'(?:var\s+)?key\s*=\s*[\'"]?([a-f0-9]{32})[\'"]?', unpacked)
-            pix_match = re.search(r'(?:var\s+)?pix\s*=\s*[\'"]([^\'"]+)[\'"]', unpacked)
-            
-            # 提取图片数组
-            pvalue_match = re.search(r'(?:var\s+)?pvalue\s*=\s*\[(.*?)\]', unpacked)
-            
-            if not (cid_match and key_match and pix_match and pvalue_match):
-                logger.debug(f"提取变量失败: cid={bool(cid_match)}, key={bool(key_match)}, pix={bool(pix_match)}, pvalue={bool(pvalue_match)}")
-                if unpacked:
-                    logger.debug(f"解包后的代码片段: {unpacked[:300]}")
-                return None
-            
-            cid = cid_match.group(1)
-            key = key_match.group(1)
-            pix = pix_match.group(1)
-            pvalue_str = pvalue_match.group(1)
-            
-            # 分割图片路径
-            images = [img.strip().strip('"\'') for img in pvalue_str.split(',')]
-            
-            # 提取uk值（长16进制字符串）
-            uk = self.extract_uk_from_tokens(packed_code) or ""
-            
-            # 构建完整URL列表
-            full_urls = []
-            for img in images:
-                if img:  # 跳过空字符串
-                    url = f"{pix}{img}?cid={cid}&key={key}&uk={uk}"
-                    full_urls.append(url)
-            
-            return full_urls if full_urls else None
-            
-        except Exception as e:
-            logger.debug(f"解码失败: {e}", exc_info=True)
-            return None
+        return decode_packed_js(packed_code)
     
     def get_categories(self):
         """
@@ -164,7 +202,7 @@ class XmanhuaScraper(BaseScraper):
             print(f"[分类] ✓ 请求成功，状态码: {response.status_code}")
             print(f"[分类] HTML长度: {len(response.text)} 字符")
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             categories = []
             
@@ -241,7 +279,6 @@ class XmanhuaScraper(BaseScraper):
             print(f"[调试] Content-Encoding: {response.headers.get('Content-Encoding', 'none')}")
             print(f"[调试] Content-Type: {response.headers.get('Content-Type', 'none')}")
             print(f"[调试] 响应编码(encoding): {response.encoding}")
-            print(f"[调试] 检测到的编码(apparent_encoding): {response.apparent_encoding}")
             print(f"[调试] 原始内容长度: {len(response.content)} 字节")
             print(f"[调试] 文本内容长度: {len(response.text)} 字符")
             
@@ -272,7 +309,7 @@ class XmanhuaScraper(BaseScraper):
             
             print(f"[调试] ===============================\n")
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             comics = []
             
@@ -425,7 +462,7 @@ class XmanhuaScraper(BaseScraper):
             print(f"搜索URL: {url}")
             
             response = self._make_request(url, verify_ssl=False)
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             comics = []
             
@@ -490,7 +527,7 @@ class XmanhuaScraper(BaseScraper):
             print(f"请求详情URL: {url}")
             
             response = self._make_request(url, verify_ssl=False)
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text)
             
             # 获取标题
             title_elem = soup.select_one('body > div.detail-info-1 > div > div > p.detail-info-title')
@@ -588,7 +625,7 @@ class XmanhuaScraper(BaseScraper):
             logger.debug(f"请求章节列表URL: {url}")
             
             response = self._make_request(url, verify_ssl=False)
-            soup = BeautifulSoup(response.text, 'lxml')
+            soup = self._parse_html(response.text, only=self.CHAPTER_LIST_REGION)
             
             chapters = []
             
@@ -619,7 +656,7 @@ class XmanhuaScraper(BaseScraper):
             logger.error(f"获取章节列表失败: {e}", exc_info=True)
             return {'chapters': [], 'total': 0}
     
-    async def _fetch_single_page_async(self, session, semaphore, api_url, page_num, params, headers, cid):
+    async def _fetch_single_page_async(self, session, semaphore, api_url, page_num, params, headers, cookies, cid):
         """异步获取单页图片"""
         async with semaphore:
             try:
@@ -629,61 +666,14 @@ class XmanhuaScraper(BaseScraper):
                 page_params = params.copy()
                 page_params['page'] = str(page_num)
                 
-                async with session.get(api_url, params=page_params, headers=headers, ssl=False, timeout=10) as response:
+                async with session.get(api_url, params=page_params, headers=headers, cookies=cookies, ssl=False, timeout=10) as response:
                     if response.status == 200:
                         response_text = await response.text()
                         response_text = response_text.strip()
                         
-                        # 解析JavaScript代码
+                        # 解包JS与提取URL交给解析执行器, 不占用事件循环
                         try:
-                            result = self.decode_packed_js(response_text)
-                            uk_value = self.extract_uk_from_tokens(response_text)
-                            
-                            if page_num == 1:
-                                if uk_value:
-                                    logger.debug(f"成功提取uk参数: {uk_value[:50]}...")
-                                if result:
-                                    logger.debug(f"解析得到 {len(result)} 个URL")
-                            
-                            if result and isinstance(result, list) and len(result) > 0:
-                                img_url = result[0]
-                                
-                                if page_num <= 3:
-                                    logger.debug(f"第{page_num}页原始URL: {img_url}")
-                                
-                                if img_url:
-                                    if not img_url.startswith('http'):
-                                        img_url = 'https:' + img_url if img_url.startswith('//') else 'https://image.xmanhua.com' + img_url
-                                    
-                                    if '?' not in img_url:
-                                        img_url = f"{img_url}?cid={cid}&key="
-                                    
-                                    if uk_value:
-                                        if img_url.endswith('&uk='):
-                                            img_url = img_url + uk_value
-                                        elif 'uk=' not in img_url:
-                                            img_url = img_url + '&uk=' + uk_value
-                                    
-                                    if page_num <= 3:
-                                        logger.debug(f"第{page_num}页最终URL: {img_url[:100]}...")
-                                    
-                                    return {'page': page_num, 'url': img_url}
-                            else:
-                                # 备用方案
-                                url_match = re.search(r'(https?://[^"\s]+\.(?:jpg|png|webp)[^"\s]*)', response_text)
-                                if url_match:
-                                    img_url = url_match.group(1)
-                                    if uk_value and '&uk=' in img_url and img_url.endswith('&uk='):
-                                        img_url = img_url + uk_value
-                                    return {'page': page_num, 'url': img_url}
-                                else:
-                                    path_match = re.search(r'(/\d+/\d+/\d+/\d+_\d+\.(?:jpg|png|webp))', response_text)
-                                    if path_match:
-                                        path = path_match.group(1)
-                                        img_url = f"https://image.xmanhua.com{path}?cid={cid}&key="
-                                        if uk_value:
-                                            img_url += f"&uk={uk_value}"
-                                        return {'page': page_num, 'url': img_url}
+                            return await parse_executor.run(resolve_page_image, response_text, page_num, cid)
                         except Exception as js_error:
                             logger.debug(f"第{page_num}页: 解析失败 - {js_error}")
             except Exception as e:
@@ -723,25 +713,24 @@ class XmanhuaScraper(BaseScraper):
         # 创建信号量控制并发数为5
         semaphore = asyncio.Semaphore(5)
         
-        # 创建aiohttp会话，确保传递所有 cookies
-        connector = aiohttp.TCPConnector(ssl=False)
+        # 使用后台循环上的持久会话(复用连接), 每个请求携带 requests 会话中的 cookies
+        session = await async_loop.session(api_url)
         # 将 requests.cookies.RequestsCookieJar 转换为字典
         cookie_dict = {cookie.name: cookie.value for cookie in self.session.cookies}
-        async with aiohttp.ClientSession(connector=connector, cookies=cookie_dict) as session:
-            # 创建所有任务
-            tasks = []
-            for page_num in range(1, total_pages + 1):
-                task = self._fetch_single_page_async(session, semaphore, api_url, page_num, params, headers, cid)
-                tasks.append(task)
-            
-            # 并发执行所有任务
-            results = await asyncio.gather(*tasks)
-            
-            # 过滤None结果并按页码排序
-            images = [r for r in results if r is not None]
-            images.sort(key=lambda x: x['page'])
-            
-            return images
+        # 创建所有任务
+        tasks = []
+        for page_num in range(1, total_pages + 1):
+            task = self._fetch_single_page_async(session, semaphore, api_url, page_num, params, headers, cookie_dict, cid)
+            tasks.append(task)
+        
+        # 并发执行所有任务, 请求期限用完时保留已拿到的页面
+        results = await async_loop.gather_partial(tasks)
+        
+        # 过滤失败/未完成的结果并按页码排序
+        images = [r for r in results if isinstance(r, dict)]
+        images.sort(key=lambda x: x['page'])
+        
+        return images
     
     def get_chapter_images(self, chapter_id):
         """
@@ -749,17 +738,11 @@ class XmanhuaScraper(BaseScraper):
         使用 chapterimage.ashx API 接口获取图片
         """
         try:
-            # 先访问主页获取Cookie
-            logger.debug("访问主页获取Cookie...")
-            home_response = self._make_request(self.base_url, verify_ssl=False)
-            if home_response:
-                logger.debug("成功获取主页Cookie")
-            
-            # 然后访问章节页面
+            # 首页Cookie按站点共享, 过期或被拒绝时才重新访问首页
             first_page_url = f'{self.base_url}/{chapter_id}/'
             logger.debug(f"请求章节第一页: {first_page_url}")
             
-            response = self._make_request(first_page_url, verify_ssl=False)
+            response = self._make_warm_request(first_page_url, verify_ssl=False)
             if not response:
                 return {'images': [], 'total': 0}
             
@@ -807,7 +790,7 @@ class XmanhuaScraper(BaseScraper):
             logger.debug("确保获取必要的Cookie...")
             
             # 异步并发获取图片（最大并发5）
-            images = asyncio.run(self._fetch_images_async(
+            images = async_loop.run(self._fetch_images_async(
                 api_url, chapter_id, total_pages, cid, mid, viewsign_dt, viewsign
             ))
             
@@ -1,7 +1,6 @@
 import re
 import json
 from urllib.parse import quote, urljoin, unquote
-from bs4 import BeautifulSoup
 
 from .base_video_scraper import BaseVideoScraper
 
@@ -48,7 +47,7 @@ class YinghuaScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         # 首页(热门)结构与分类页不同，使用不同的解析方法
         if category_id == "hot":
             videos = self._extract_video_cards(soup, limit)
@@ -63,7 +62,7 @@ class YinghuaScraper(BaseVideoScraper):
         if not resp:
             return None
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
 
         title = self._first_text(
             [
@@ -107,7 +106,7 @@ class YinghuaScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         episode_links = soup.find_all("a", href=re.compile(r"(play|/p/|/v/).*\.html"))
         episodes = []
         seen = set()
@@ -186,7 +185,7 @@ class YinghuaScraper(BaseVideoScraper):
         if not resp:
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = self._parse_html(resp.text)
         return self._extract_search_results(soup, limit)[:limit]
 
     # ---------- 工具方法 ----------
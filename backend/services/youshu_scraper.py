@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 from services.base_ebook_scraper import BaseEbookScraper
 from services.ttkan_scraper import TtkanScraper
 import logging
@@ -22,7 +21,7 @@ class YoushuScraper(BaseEbookScraper):
         if not response:
             return {'categories': []}
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         category_map = {}
 
         for a in soup.find_all('a', href=True):
@@ -72,7 +71,7 @@ class YoushuScraper(BaseEbookScraper):
         if not response:
             return {'books': [], 'total': 0, 'page': page, 'hasMore': False}
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         books = self._parse_books_from_sort_page(soup, category_id)
         total_pages = self._parse_total_pages_from_sort_page(soup, category_id)
 
@@ -399,7 +398,7 @@ class YoushuScraper(BaseEbookScraper):
         if not response:
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._parse_html(response.text)
         title = self._parse_title_from_detail(soup)
         author = self._parse_author_from_detail(soup)
         description = self._parse_description_from_detail(soup)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+进程内AES测试脚本
+测试标准向量、与Node crypto生成的密文一致、长度与填充校验, 以及视频源的解密
+"""
+
+import os
+import sys
+import base64
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import aes_crypto
+from services.keke6_scraper import Keke6Scraper
+from services.netflixgc_scraper import NetflixgcScraper
+
+# 由Node crypto生成: aes-128-cbc, key='2890123456tB959C', iv='2F131BE91247866E'
+NETFLIXGC_CIPHER = '9FAEiDdDTlnj/mC+pgcABHzgPnklHsPh5lIw4i9qn21Z1neU26XkG3aeBKZ7Wy/9'
+# 由Node crypto生成: aes-256-cbc, keke6 的 key/iv
+KEKE6_CIPHER = 'TUEZR8bgo2kvBo2wIZPajHEOQTOcKDWlONa+1fsMR/w='
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_fips_vectors():
+    """测试纯Python实现的单块加解密与 FIPS-197 附录C向量一致"""
+    print_separator("测试1: FIPS-197 向量")
+    plain = bytes.fromhex('00112233445566778899aabbccddeeff')
+    vectors = {
+        16: '69c4e0d86a7b0430d8cdb78070b4c55a',
+        24: 'dda97ca4864cdfe06eaf70a0ec0d7191',
+        32: '8ea2b7ca516745bfeafc49904b496089',
+    }
+    for size, expected in vectors.items():
+        # 零IV的单块CBC即为ECB
+        cipher = aes_crypto._python_cbc(bytes(range(size)), bytes(16), plain, True)
+        assert cipher.hex() == expected, size
+        assert aes_crypto._python_cbc(bytes(range(size)), bytes(16), cipher, False) == plain
+    print("✓ AES-128/192/256 向量一致")
+
+
+def test_roundtrip_and_validation():
+    """测试各后端的PKCS7往返, 以及密钥/IV长度、填充错误抛出 ValueError"""
+    print_separator("测试2: 往返与校验")
+    key, iv = os.urandom(32), os.urandom(16)
+    original = aes_crypto.backend
+    try:
+        for backend in aes_crypto.available_backends():
+            aes_crypto.backend = backend
+            for size in (0, 1, 15, 16, 17, 1000):
+                data = os.urandom(size)
+                cipher = aes_crypto.encrypt(data, key, iv)
+                assert len(cipher) == (size // 16 + 1) * 16
+                assert aes_crypto.decrypt(cipher, key, iv) == data
+    finally:
+        aes_crypto.backend = original
+
+    for args in (('x', 'k' * 12, 'i' * 16), ('x', 'k' * 16, 'i' * 15), ('x', 'k' * 32, 'i' * 16, 128)):
+        try:
+            aes_crypto.encrypt(*args)
+            assert False, f'应拒绝: {args}'
+        except ValueError:
+            pass
+    try:
+        aes_crypto.decrypt(aes_crypto.encrypt(b'abc', key, iv), os.urandom(32), iv)
+        assert False, '错误的密钥应导致填充错误'
+    except ValueError:
+        pass
+    print(f"✓ 可用后端: {', '.join(aes_crypto.available_backends())}")
+
+
+def test_video_sources():
+    """测试 netflixgc/keke6 解密Node生成的密文, 与原 execjs 实现结果相同"""
+    print_separator("测试3: 视频源解密")
+    netflixgc = NetflixgcScraper()
+    assert netflixgc._decrypt(NETFLIXGC_CIPHER, '123456') == 'https://cjbfq.netflixgc.tv/m3u8/播放.m3u8'
+    assert netflixgc._decrypt(NETFLIXGC_CIPHER, '654321') is None
+
+    keke6 = Keke6Scraper()
+    assert keke6._aes_decrypt_base64(KEKE6_CIPHER) == '{"code":0,"msg":"成功"}'
+    assert keke6._aes_decrypt_bytes(base64.b64decode(KEKE6_CIPHER)) == '{"code":0,"msg":"成功"}'
+    # 原实现中搜索签名的密钥/IV长度不合法, Node同样会报错, 保持返回None
+    assert keke6._aes_encrypt_hex('关键词') is None
+    print("✓ 视频源解密结果正确")
+
+
+def main():
+    test_fips_vectors()
+    test_roundtrip_and_validation()
+    test_video_sources()
+    print("\n所有AES测试通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+共享事件循环测试脚本
+测试多个线程通过同一个后台循环执行协程并复用持久会话
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.async_loop import AsyncLoop
+
+
+class PingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+
+    def do_GET(self):
+        PingHandler.connections.add(self.client_address)
+        body = f'cookie={self.headers.get("Cookie") or ""}'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_threads_share_loop_and_session():
+    """测试多线程提交协程, 会话与keep-alive连接被复用, Cookie按请求传入"""
+    print_separator("测试1: 共享循环与会话")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/ping'
+    loop = AsyncLoop(limit=2, limit_per_host=2)
+    PingHandler.connections.clear()
+
+    async def fetch(token):
+        session = await loop.session(url)
+        async with session.get(url, cookies={'t': token}) as response:
+            return id(session), await response.text()
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: loop.run(fetch(str(i)), timeout=10), range(8)))
+        assert len({session_id for session_id, _ in results}) == 1
+        assert [text for _, text in results] == [f'cookie=t={i}' for i in range(8)]
+        # 连接池上限为2, 8个请求最多使用2个连接
+        assert len(PingHandler.connections) <= 2
+    finally:
+        loop.close()
+        server.shutdown()
+    print(f"✓ 8个请求使用 {len(PingHandler.connections)} 个连接")
+
+
+def test_close_and_restart():
+    """测试关闭后再次使用会重新启动循环"""
+    print_separator("测试2: 关闭后重启")
+    loop = AsyncLoop()
+
+    async def answer():
+        return 42
+
+    assert loop.run(answer()) == 42
+    loop.close()
+    assert loop.run(answer()) == 42
+    loop.close()
+    print("✓ 循环可重启")
+
+
+def main():
+    test_threads_share_loop_and_session()
+    test_close_and_restart()
+    print("\n所有事件循环测试通过")
+
+
+if __name__ == '__main__':
+    main()
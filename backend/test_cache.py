@@ -0,0 +1,537 @@
+# -*- coding: utf-8 -*-
+"""
+缓存模块测试脚本
+测试过期时间、LRU淘汰与容量限制
+"""
+
+import os
+import sys
+import time
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from flask import Flask, jsonify
+from services import cache as cache_module
+from services.cache import MemoryCache, RedisCache, cache_response, set_cache_backend
+from services.deadline import install_deadline, current_deadline
+from services.scraper_factory import ScraperFactory
+from config import DEFAULT_SOURCE
+
+
+class FakeRedis:
+    """进程内的简易Redis替身, 只实现缓存用到的命令"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        value, expire_at = self.store.get(key, (None, 0))
+        if expire_at and expire_at <= time.time():
+            self.store.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.store[key] = (value, time.time() + ex if ex else 0)
+        return True
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+
+    def sadd(self, key, *members):
+        bucket, expire_at = self.store.setdefault(key, (set(), 0))
+        bucket.update(members)
+        return len(members)
+
+    def smembers(self, key):
+        return set(self.store.get(key, (set(), 0))[0])
+
+    def ttl(self, key):
+        if key not in self.store:
+            return -2
+        expire_at = self.store[key][1]
+        return int(expire_at - time.time()) if expire_at else -1
+
+    def expire(self, key, seconds):
+        if key in self.store:
+            self.store[key] = (self.store[key][0], time.time() + seconds)
+        return True
+
+    def scan_iter(self, match='*', count=None):
+        prefix = match.rstrip('*')
+        return [key for key in list(self.store) if key.startswith(prefix)]
+
+    def ping(self):
+        return True
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_ttl_expire():
+    """测试单条过期时间"""
+    print_separator("测试1: 过期时间")
+    cache = MemoryCache(max_entries=10, max_bytes=0)
+    cache.set('a', 'value', timeout=1)
+    cache.set('b', 'forever', timeout=0)
+    assert cache.get('a') == 'value'
+    time.sleep(1.1)
+    assert cache.get('a') is None
+    assert cache.get('b') == 'forever'
+    print("✓ 过期条目不再返回, timeout=0 永不过期")
+
+
+def test_lru_entries():
+    """测试按条目数LRU淘汰"""
+    print_separator("测试2: 条目数LRU淘汰")
+    cache = MemoryCache(max_entries=3, max_bytes=0)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+    # 访问a, 使b成为最久未使用
+    cache.get('a')
+    cache.set('d', 'd')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a'
+    assert len(cache) == 3
+
+    # 满容量后每次写入直接淘汰LRU末端, 不再逐条扫描过期条目
+    cache = MemoryCache(max_entries=20000, max_bytes=0)
+    for i in range(20000):
+        cache.set(f'k{i}', i, timeout=600)
+    start = time.perf_counter()
+    for i in range(2000):
+        cache.set(f'n{i}', i, timeout=600)
+    elapsed = time.perf_counter() - start
+    assert len(cache) == 20000 and cache.get('k1999') is None and cache.get('k2000') == 2000
+    assert elapsed < 1, elapsed
+    print(f"✓ 最久未使用的条目被淘汰, 满容量写入2000次 {elapsed * 1000:.0f}ms")
+
+
+def test_byte_budget():
+    """测试字节容量限制"""
+    print_separator("测试3: 字节容量限制")
+    cache = MemoryCache(max_entries=0, max_bytes=100)
+    cache.set('a', b'x' * 40)
+    cache.set('b', b'x' * 40)
+    cache.set('c', b'x' * 40)
+    assert cache.get('a') is None
+    assert cache.size_bytes <= 100
+    # 单条超过总容量不缓存
+    assert cache.set('big', b'x' * 200) is False
+    assert cache.get('big') is None
+    print(f"✓ 当前占用 {cache.size_bytes} 字节")
+
+
+def test_thread_safety():
+    """测试多线程并发读写"""
+    print_separator("测试4: 多线程并发读写")
+    cache = MemoryCache(max_entries=50, max_bytes=0)
+
+    def worker(n):
+        for i in range(500):
+            key = f'{n}-{i % 80}'
+            cache.set(key, i)
+            cache.get(key)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache) <= 50
+    print(f"✓ 并发结束, 条目数 {len(cache)}")
+
+
+def test_redis_backend():
+    """测试Redis后端(使用进程内替身, 也可换成本地redis-server)"""
+    print_separator("测试5: Redis后端")
+    client = FakeRedis()
+    cache = RedisCache(client=client, namespace='test:')
+    cache.set('a', {'comics': [1, 2, 3]}, timeout=60)
+    assert cache.get('a') == {'comics': [1, 2, 3]}
+    assert all(key.startswith('test:') for key in client.store)
+    # 两个后端实例共享同一个Redis, 模拟多个worker
+    other = RedisCache(client=client, namespace='test:')
+    assert other.get('a') == {'comics': [1, 2, 3]}
+    other.clear()
+    assert cache.get('a') is None
+
+    # 快照以JSON保存, 响应体bytes原样读回; 其他格式(如pickle)的值按未命中处理
+    snapshot = {'body': b'\x1f\x8b{"comics": []}', 'etag': '"abc"', 'status': 200, 'fresh_until': 1.5}
+    cache.set('snap', snapshot, timeout=60)
+    assert client.store['test:snap'][0].startswith(b'{')
+    assert cache.get('snap') == snapshot
+    client.set('test:pickled', b'\x80\x05\x95\x00')
+    assert cache.get('pickled') is None
+    assert not cache.set('obj', object(), timeout=60)
+
+    # 不足1秒的有效期按1秒写入, 不会因 ex=0 被Redis拒绝
+    assert cache.set('short', 'x', timeout=0.4)
+    assert client.store['test:short'][1] > time.time()
+    print("✓ 命名空间隔离, 多实例共享缓存, 值以JSON保存")
+
+
+def test_cache_response_shared():
+    """测试cache_response在共享后端上只执行一次视图"""
+    print_separator("测试6: cache_response 共享缓存")
+    original = cache_module._cache
+    set_cache_backend(RedisCache(client=FakeRedis(), namespace='test:'))
+    calls = []
+
+    app = Flask(__name__)
+
+    @app.route('/hot')
+    @cache_response(timeout=60, key_prefix='hot')
+    def hot():
+        calls.append(1)
+        return jsonify({'comics': ['a', 'b']}), 200
+
+    try:
+        client = app.test_client()
+        first = client.get('/hot?page=1')
+        second = client.get('/hot?page=1')
+        client.get('/hot?page=2')
+        assert first.get_json() == second.get_json() == {'comics': ['a', 'b']}
+        assert second.status_code == 200
+        assert len(calls) == 2
+    finally:
+        set_cache_backend(original)
+    print("✓ 相同请求命中缓存, 不同分页独立缓存")
+
+
+def test_single_flight():
+    """测试并发未命中时只回源一次"""
+    print_separator("测试7: 请求合并")
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    calls = []
+    app = Flask(__name__)
+
+    @app.route('/slow')
+    @cache_response(timeout=60, key_prefix='slow')
+    def slow():
+        calls.append(1)
+        time.sleep(0.3)
+        return jsonify({'ok': True}), 200
+
+    results = []
+
+    def worker():
+        results.append(app.test_client().get('/slow').get_json())
+
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        set_cache_backend(original)
+    assert len(calls) == 1
+    assert results == [{'ok': True}] * 8
+    print("✓ 8个并发请求只执行1次视图")
+
+
+def test_stale_while_revalidate():
+    """测试软过期后返回旧数据并后台刷新"""
+    print_separator("测试8: 过期数据后台刷新")
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    cache_module.CACHE_TTL_POLICY['swr_test'] = {'soft': 1, 'hard': 30}
+    counter = {'n': 0}
+    app = Flask(__name__)
+
+    @app.route('/swr')
+    @cache_response(timeout=1, key_prefix='swr_test')
+    def swr():
+        counter['n'] += 1
+        time.sleep(0.2)
+        return jsonify({'version': counter['n']}), 200
+
+    try:
+        client = app.test_client()
+        assert client.get('/swr').get_json() == {'version': 1}
+        time.sleep(1.1)
+        start = time.time()
+        stale = client.get('/swr').get_json()
+        elapsed = time.time() - start
+        assert stale == {'version': 1}
+        assert elapsed < 0.2
+        time.sleep(0.5)
+        assert client.get('/swr').get_json() == {'version': 2}
+    finally:
+        cache_module.CACHE_TTL_POLICY.pop('swr_test', None)
+        set_cache_backend(original)
+    print(f"✓ 旧数据立即返回(耗时{elapsed * 1000:.0f}ms), 后台刷新后返回新数据")
+
+
+def test_etag_not_modified():
+    """测试ETag与304响应"""
+    print_separator("测试9: ETag / 304")
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    app = Flask(__name__)
+
+    @app.route('/chapters')
+    @cache_response(timeout=60, key_prefix='etag_test')
+    def chapters():
+        return jsonify({'chapters': list(range(100))}), 200
+
+    try:
+        client = app.test_client()
+        first = client.get('/chapters')
+        etag = first.headers.get('ETag')
+        assert etag
+        hit = client.get('/chapters', headers={'If-None-Match': etag})
+        assert hit.status_code == 304
+        assert hit.data == b''
+        changed = client.get('/chapters', headers={'If-None-Match': '"other"'})
+        assert changed.status_code == 200
+        assert changed.get_json()['chapters'][-1] == 99
+    finally:
+        set_cache_backend(original)
+    print(f"✓ ETag={etag}, 命中返回304")
+
+
+def test_outcome_policy():
+    """测试错误/空结果/不完整结果只短暂缓存"""
+    print_separator("测试10: 按结果类型缓存")
+    original = cache_module._cache
+    backend = set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    app = Flask(__name__)
+    payloads = {
+        '/error': ({'error': 'upstream'}, 500),
+        '/empty': ({'images': [], 'total': 0}, 200),
+        '/partial': ({'images': [{'page': 1}], 'total': 1, 'expected_total': 5}, 200),
+        '/ok': ({'images': [{'page': 1}], 'total': 1, 'expected_total': 1}, 200),
+    }
+
+    @app.route('/<name>')
+    @cache_response(timeout=1800, key_prefix='outcome_test')
+    def view(name):
+        data, status = payloads[f'/{name}']
+        return jsonify(data), status
+
+    ttls = {}
+    try:
+        client = app.test_client()
+        for path in payloads:
+            before = set(backend._data)
+            client.get(path)
+            key = (set(backend._data) - before).pop()
+            ttls[path] = backend._data[key][1] - time.time()
+    finally:
+        set_cache_backend(original)
+    assert ttls['/error'] <= cache_module.CACHE_OUTCOME_TTL['error']
+    assert ttls['/empty'] <= cache_module.CACHE_OUTCOME_TTL['empty']
+    assert ttls['/partial'] <= cache_module.CACHE_OUTCOME_TTL['partial']
+    assert ttls['/ok'] > 1700
+    print("✓ " + ", ".join(f"{k}={v:.0f}s" for k, v in ttls.items()))
+
+
+def test_deadline_truncated_is_partial():
+    """测试请求期限截断的结果按不完整结果短暂缓存"""
+    print_separator("测试10b: 期限截断的结果")
+    original = cache_module._cache
+    backend = set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    app = Flask(__name__)
+    install_deadline(app)
+
+    @app.route('/api/list')
+    @cache_response(timeout=1800, key_prefix='deadline_test')
+    def listing():
+        deadline = current_deadline()
+        time.sleep(0.1)
+        # 爬虫期限用完时返回已获取的部分, 不带 expected_total
+        return jsonify({'comics': ['a'], 'partial': deadline.expired}), 200
+
+    try:
+        response = app.test_client().get('/api/list', headers={'X-Request-Timeout': '0.05'})
+        (value, expire_at, _), = backend._data.values()
+    finally:
+        set_cache_backend(original)
+    assert response.get_json()['partial'] is True
+    assert value['outcome'] == 'partial'
+    assert expire_at - time.time() <= cache_module.CACHE_OUTCOME_TTL['partial']
+    print(f"✓ 截断结果缓存 {expire_at - time.time():.0f}s")
+
+
+def test_keep_previous_on_error():
+    """测试后台刷新失败时保留旧的正常数据, 且不延长旧数据的硬过期时间"""
+    print_separator("测试11: 刷新失败保留旧数据")
+    original = cache_module._cache
+    backend = MemoryCache(max_entries=100, max_bytes=0)
+    set_cache_backend(backend)
+    cache_module.CACHE_TTL_POLICY['keep_test'] = {'soft': 1, 'hard': 60}
+    state = {'fail': False}
+    app = Flask(__name__)
+
+    @app.route('/list')
+    @cache_response(timeout=1, key_prefix='keep_test')
+    def listing():
+        if state['fail']:
+            return jsonify({'error': 'down'}), 500
+        return jsonify({'comics': ['a']}), 200
+
+    try:
+        client = app.test_client()
+        client.get('/list')
+        (key, (_, first_expire, _)), = backend._data.items()
+        state['fail'] = True
+        time.sleep(1.1)
+        client.get('/list')
+        time.sleep(0.3)
+        response = client.get('/list')
+        _, kept_expire, _ = backend._data[key]
+    finally:
+        cache_module.CACHE_TTL_POLICY.pop('keep_test', None)
+        set_cache_backend(original)
+    assert response.status_code == 200
+    assert response.get_json() == {'comics': ['a']}
+    assert kept_expire <= first_expire + 0.05
+    print("✓ 上游故障期间继续返回旧数据")
+
+
+def test_tag_invalidation():
+    """测试按标签失效缓存与管理接口"""
+    print_separator("测试12: 标签失效")
+    from routes import admin as admin_routes
+
+    for backend in (MemoryCache(max_entries=100, max_bytes=0), RedisCache(client=FakeRedis(), namespace='test:')):
+        backend.set('images:1', 'a', 60, tags=['type:images', 'source:baozimh', 'id:1'])
+        backend.set('images:2', 'b', 60, tags=['type:images', 'source:xmanhua', 'id:2'])
+        backend.set('detail:1', 'c', 60, tags=['type:detail', 'source:baozimh', 'id:1'])
+        assert backend.invalidate_tag('source:baozimh') == 2
+        assert backend.get('images:1') is None and backend.get('detail:1') is None
+        assert backend.get('images:2') == 'b'
+
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    original_token = admin_routes.ADMIN_TOKEN
+    admin_routes.ADMIN_TOKEN = 'secret'
+    app = Flask(__name__)
+    app.register_blueprint(admin_routes.admin_bp, url_prefix='/api')
+    calls = []
+
+    @app.route('/api/chapters/<chapter_id>/images')
+    @cache_response(timeout=60, key_prefix='images', resolve_source=ScraperFactory.resolve_source)
+    def images(chapter_id):
+        calls.append(chapter_id)
+        return jsonify({'images': [{'page': 1}], 'total': 1}), 200
+
+    try:
+        client = app.test_client()
+        client.get('/api/chapters/m1/images?source=baozimh')
+        client.get('/api/chapters/m2/images?source=xmanhua')
+        client.get('/api/chapters/m3/images')
+        denied = client.post('/api/admin/cache/invalidate', json={'source': 'baozimh'})
+        assert denied.status_code == 401
+        resp = client.post('/api/admin/cache/invalidate', json={'source': 'baozimh'},
+                           headers={'X-Admin-Token': 'secret'})
+        assert resp.get_json()['deleted'] == 1
+        client.get('/api/chapters/m1/images?source=baozimh')
+        client.get('/api/chapters/m2/images?source=xmanhua')
+        # 未传source的请求按工厂的默认数据源打标签
+        resp = client.post('/api/admin/cache/invalidate', json={'source': DEFAULT_SOURCE},
+                           headers={'X-Admin-Token': 'secret'})
+        assert resp.get_json()['deleted'] >= 1
+        client.get('/api/chapters/m3/images')
+    finally:
+        admin_routes.ADMIN_TOKEN = original_token
+        set_cache_backend(original)
+    assert calls == ['m1', 'm2', 'm3', 'm1', 'm3']
+    print("✓ 只失效指定数据源(含默认数据源), 其余缓存保持命中")
+
+
+def test_stats_endpoint():
+    """测试缓存统计接口"""
+    print_separator("测试13: 缓存统计")
+    from routes import admin as admin_routes
+
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    cache_module._stats.reset()
+    original_token = admin_routes.ADMIN_TOKEN
+    admin_routes.ADMIN_TOKEN = 'secret'
+    app = Flask(__name__)
+    app.register_blueprint(admin_routes.admin_bp, url_prefix='/api')
+
+    @app.route('/api/comics/hot')
+    @cache_response(timeout=60, key_prefix='stats_test')
+    def hot():
+        return jsonify({'comics': ['a'] * 500}), 200
+
+    try:
+        client = app.test_client()
+        client.get('/api/comics/hot?page=1')
+        client.get('/api/comics/hot?page=1')
+        client.get('/api/comics/hot?page=1')
+        data = client.get('/api/_debug/cache', headers={'X-Admin-Token': 'secret'}).get_json()
+    finally:
+        admin_routes.ADMIN_TOKEN = original_token
+        set_cache_backend(original)
+    prefix = data['prefixes']['stats_test']
+    assert prefix['hits'] == 2 and prefix['misses'] == 1 and prefix['stores'] == 1
+    assert prefix['size_histogram']['<1KB'] == 1
+    assert data['backend']['largest'][0]['label'] == '/api/comics/hot?page=1'
+    print(f"✓ 命中率 {prefix['hit_ratio']}, 写入 {prefix['bytes_written']} 字节")
+
+
+def test_compressed_passthrough():
+    """测试压缩存储与按 Accept-Encoding 直接返回"""
+    print_separator("测试14: 压缩存储")
+    import brotli
+
+    original = cache_module._cache
+    backend = set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    app = Flask(__name__)
+    payload = {'content': '第一章 正文内容。' * 2000}
+
+    @app.route('/content')
+    @cache_response(timeout=60, key_prefix='compress_test')
+    def content():
+        return jsonify(payload), 200
+
+    try:
+        client = app.test_client()
+        plain = client.get('/content')
+        encoded = client.get('/content', headers={'Accept-Encoding': 'gzip, br'})
+        stored = next(iter(backend._data.values()))[0]
+    finally:
+        set_cache_backend(original)
+    assert plain.get_json() == payload
+    assert 'Content-Encoding' not in plain.headers
+    assert encoded.headers['Content-Encoding'] == 'br'
+    assert 'Accept-Encoding' in encoded.headers['Vary']
+    assert encoded.data == stored['body']
+    assert brotli.decompress(encoded.data) == plain.data
+    print(f"✓ 原始 {len(plain.data)} 字节, 缓存 {len(stored['body'])} 字节")
+
+
+def main():
+    test_ttl_expire()
+    test_lru_entries()
+    test_byte_budget()
+    test_thread_safety()
+    test_redis_backend()
+    test_cache_response_shared()
+    test_single_flight()
+    test_stale_while_revalidate()
+    test_etag_not_modified()
+    test_outcome_policy()
+    test_deadline_truncated_is_partial()
+    test_keep_previous_on_error()
+    test_tag_invalidation()
+    test_stats_endpoint()
+    test_compressed_passthrough()
+    print("\n所有缓存测试通过")
+
+
+if __name__ == '__main__':
+    main()
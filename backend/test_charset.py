@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+响应编码解析测试脚本
+测试 BOM / meta 嗅探与按host记住检测结果
+"""
+
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from services.charset import CharsetResolver, sniff_meta
+
+
+def make_response(url, content, content_type='text/html'):
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    response.headers = CaseInsensitiveDict({'Content-Type': content_type})
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_sniffing():
+    """测试声明的编码、JSON、BOM与meta标签"""
+    print_separator("测试1: 快速嗅探")
+    resolver = CharsetResolver()
+    gbk_page = '<html><head><meta http-equiv="Content-Type" content="text/html; charset=gb2312"></head>'.encode('ascii')
+    assert sniff_meta(gbk_page) == 'gb18030'
+    assert sniff_meta(b'<meta charset="UTF-8">') == 'utf-8'
+    assert sniff_meta(b'<meta charset="bogus-enc">') is None
+
+    assert resolver.resolve(make_response('https://a.com/', b'x', 'text/html; charset=big5')) == 'big5'
+    assert resolver.resolve(make_response('https://a.com/', b'{}', 'application/json')) == 'utf-8'
+    assert resolver.resolve(make_response('https://a.com/', '﻿你好'.encode('utf-8'))) == 'utf-8-sig'
+    assert resolver.resolve(make_response('https://a.com/', gbk_page)) == 'gb18030'
+    assert resolver.detections == 0
+    print("✓ 未做完整检测")
+
+
+def test_host_memory():
+    """测试同一host只做一次完整检测, 记住的编码解码失败时重新检测"""
+    print_separator("测试2: 按host记住编码")
+    resolver = CharsetResolver()
+    body = ('<p>' + '努努书坊的章节正文内容' * 50 + '</p>').encode('gbk')
+    first = resolver.resolve(make_response('https://www.kanunu8.com/book/1.html', body))
+    second = resolver.resolve(make_response('https://kanunu8.com/book/2.html', body))
+    assert first == second
+    assert body.decode(first) == body.decode('gbk')
+    assert resolver.detections == 1
+
+    utf8_body = ('<p>' + '换成UTF-8的页面内容' * 50 + '</p>').encode('utf-8')
+    assert resolver.resolve(make_response('https://kanunu8.com/book/3.html', utf8_body)) == 'utf-8'
+    assert resolver.detections == 2
+    print(f"✓ 记住的编码: {resolver.remembered('kanunu8.com')}")
+
+
+def main():
+    test_sniffing()
+    test_host_memory()
+    print("\n所有编码解析测试通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+熔断器测试脚本
+测试失败率触发熔断、半开探测恢复, 以及熔断时返回上游缓存的旧内容
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, circuit_breakers, CLOSED, OPEN, HALF_OPEN
+from services.disk_cache import DiskCache
+from services.upstream_cache import UpstreamCache
+from services.http_client import create_session, fix_encoding
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_state_transitions():
+    """测试 closed -> open -> half_open -> closed / open"""
+    print_separator("测试1: 状态切换")
+    breaker = CircuitBreaker('example.com', window=60, min_requests=4, error_rate=0.5, open_seconds=0.2)
+    for ok in (True, False, True):
+        breaker.before_request()
+        breaker.record(ok)
+    assert breaker.snapshot()['state'] == CLOSED
+    breaker.before_request()
+    breaker.record(False)
+    assert breaker.snapshot()['state'] == OPEN
+
+    try:
+        breaker.before_request()
+        assert False, '熔断中应快速失败'
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.25)
+    assert breaker.snapshot()['state'] == HALF_OPEN
+    breaker.before_request()
+    # 探测进行中, 其他请求仍然快速失败
+    try:
+        breaker.before_request()
+        assert False, '半开状态只放行一个探测请求'
+    except CircuitOpenError:
+        pass
+    breaker.record(False)
+    assert breaker.snapshot()['state'] == OPEN
+
+    time.sleep(0.25)
+    breaker.before_request()
+    breaker.record(True)
+    assert breaker.snapshot()['state'] == CLOSED
+    print("✓ 状态切换正确")
+
+
+class DownHandler(BaseHTTPRequestHandler):
+    """第一次返回带ETag的页面, 之后一直返回500"""
+    calls = 0
+
+    def do_GET(self):
+        DownHandler.calls += 1
+        if DownHandler.calls == 1:
+            body = '分类页'.encode('utf-8')
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+        else:
+            body = b'error'
+            self.send_response(500)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_open_circuit_serves_stale():
+    """测试站点故障后熔断, 有上游缓存的URL直接返回旧内容"""
+    print_separator("测试2: 熔断时返回旧内容")
+    server = ThreadingHTTPServer(('localhost', 0), DownHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://localhost:{server.server_address[1]}'
+    breaker = circuit_breakers.get(base)
+    breaker.min_requests, breaker.open_seconds = 3, 60
+    cache = UpstreamCache(store=DiskCache(os.path.join(tempfile.mkdtemp(), 'u.sqlite3')), hosts=())
+    session = create_session()
+    try:
+        assert fix_encoding(cache.send(session, 'GET', base + '/category')).text == '分类页'
+        # 1次成功 + 2次失败, 失败率超过50%
+        for _ in range(2):
+            assert session.get(base + '/other').status_code == 500
+        assert circuit_breakers.health(base)['state'] == OPEN
+        calls = DownHandler.calls
+
+        stale = fix_encoding(cache.send(session, 'GET', base + '/category'))
+        assert stale.text == '分类页'
+        assert stale.headers['X-Upstream-Cache'] == 'stale'
+        try:
+            session.get(base + '/other')
+            assert False, '没有缓存的请求应快速失败'
+        except CircuitOpenError:
+            pass
+        assert DownHandler.calls == calls
+        health = circuit_breakers.health(base)
+        # 熔断器按 host:port 区分, 同一主机上的其他服务不受影响
+        assert circuit_breakers.health('http://localhost:1/')['state'] == CLOSED
+    finally:
+        server.shutdown()
+        # 共享的熔断器不能带着打开状态进入后续测试
+        circuit_breakers.reset(base)
+    assert circuit_breakers.health(base)['requests'] == 0
+    print(f"✓ 熔断后未访问上游, 状态: {health}")
+
+
+def main():
+    test_state_transitions()
+    test_open_circuit_serves_stale()
+    print("\n所有熔断器测试通过")
+
+
+if __name__ == '__main__':
+    main()
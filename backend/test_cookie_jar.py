@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+共享Cookie罐测试脚本
+使用本地HTTP服务测试首页只预热一次、403后重新预热
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.cookie_jar import CookieJarManager, cookie_jars
+from services.base_scraper import BaseScraper
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """首页下发Cookie; 内容页没有有效Cookie时返回403"""
+    paths = []
+    valid_token = 't1'
+
+    def do_GET(self):
+        SiteHandler.paths.append(self.path)
+        if self.path == '/':
+            body = b'home'
+            self.send_response(200)
+            self.send_header('Set-Cookie', f'token={SiteHandler.valid_token}; Path=/')
+        elif f'token={SiteHandler.valid_token}' in (self.headers.get('Cookie') or ''):
+            body = b'content'
+            self.send_response(200)
+        else:
+            body = b'forbidden'
+            self.send_response(403)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DemoScraper(BaseScraper):
+    """只用于测试基类请求方法"""
+
+
+DemoScraper.__abstractmethods__ = frozenset()
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_warm_once_and_rewarm_on_403():
+    """测试多个实例共用一次预热, Cookie失效后403触发重新预热"""
+    print_separator("测试1: 预热与重新预热")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    SiteHandler.paths.clear()
+    try:
+        # 爬虫使用全局Cookie罐, 按host(不含端口)共享, 测试结束时清空
+        first, second = DemoScraper(base), DemoScraper(base)
+        assert first._make_warm_request(base + '/a').text == 'content'
+        assert second._make_warm_request(base + '/b').text == 'content'
+        assert SiteHandler.paths == ['/', '/a', '/b']
+
+        # 服务端轮换Cookie, 旧Cookie被拒后重新访问首页
+        SiteHandler.valid_token = 't2'
+        assert first._make_warm_request(base + '/c').text == 'content'
+        assert SiteHandler.paths[3:] == ['/c', '/', '/c']
+    finally:
+        server.shutdown()
+        cookie_jars.invalidate(base)
+    assert not first.session.cookies
+    print(f"✓ 请求顺序: {SiteHandler.paths}")
+
+
+def test_expiry_from_cookie():
+    """测试预热有效期取最早过期的持久Cookie"""
+    print_separator("测试2: Cookie有效期")
+    import time
+    from requests.cookies import create_cookie
+    manager = CookieJarManager(ttl=600)
+    state = manager._state('https://example.com')
+    now = time.time()
+    state.jar.set_cookie(create_cookie('a', '1', domain='example.com', expires=int(now + 120)))
+    assert abs(manager._expiry(state.jar, now) - (now + 120)) < 2
+    state.jar.clear()
+    assert manager._expiry(state.jar, now) == now + 600
+    print("✓ 有效期正确")
+
+
+def main():
+    test_warm_once_and_rewarm_on_403()
+    test_expiry_from_cookie()
+    print("\n所有Cookie罐测试通过")
+
+
+if __name__ == '__main__':
+    main()
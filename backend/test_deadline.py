@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+请求期限测试脚本
+测试超时压缩、期限用完后不再请求/限速等待、异步任务返回部分结果, 以及Flask请求上的期限
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from flask import Flask, jsonify
+from services.deadline import (
+    Deadline, DeadlineExceeded, deadline_scope, current_deadline, install_deadline
+)
+from services.http_client import create_session
+from services.circuit_breaker import circuit_breakers
+from services.rate_limiter import HostRateLimiter
+from services.async_loop import async_loop
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_clamp_and_scope():
+    """测试超时压缩与嵌套期限"""
+    print_separator("测试1: 超时压缩与嵌套期限")
+    deadline = Deadline(2)
+    assert deadline.clamp(None) <= 2
+    assert deadline.clamp(0.5) == 0.5
+    connect, read = deadline.clamp((1, 10))
+    assert connect == 1 and read <= 2
+
+    assert current_deadline() is None
+    with deadline_scope(5) as outer:
+        with deadline_scope(60) as inner:
+            # 内层期限不会比外层长
+            assert inner.expires_at == outer.expires_at
+        assert current_deadline() is outer
+    assert current_deadline() is None
+    print("✓ 超时压缩与嵌套期限正确")
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """每个请求都要2秒才返回"""
+    calls = 0
+
+    def do_GET(self):
+        SlowHandler.calls += 1
+        time.sleep(2)
+        body = b'ok'
+        try:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def test_request_respects_deadline():
+    """测试请求超时被压缩到剩余时间内, 期限用完后不再访问上游, 也不计入熔断失败"""
+    print_separator("测试2: HTTP请求遵守期限")
+    server = ThreadingHTTPServer(('localhost', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://localhost:{server.server_address[1]}'
+    session = create_session()
+    try:
+        with deadline_scope(0.5) as deadline:
+            start = time.monotonic()
+            try:
+                session.get(base + '/slow', timeout=30)
+                assert False, '应在期限内超时'
+            except Exception:
+                pass
+            elapsed = time.monotonic() - start
+            # 读取超时按剩余时间计算, 且期限用完后不再重试
+            assert elapsed < 1.5, elapsed
+            assert deadline.exceeded
+
+            calls = SlowHandler.calls
+            try:
+                session.get(base + '/slow')
+                assert False, '期限用完后应直接失败'
+            except DeadlineExceeded:
+                pass
+            assert SlowHandler.calls == calls
+        assert circuit_breakers.health(base)['requests'] == 0
+    finally:
+        server.shutdown()
+    print(f"✓ 请求在 {elapsed:.2f} 秒后放弃")
+
+
+def test_rate_limit_wait_respects_deadline():
+    """测试限速等待超过剩余时间时直接放弃, 并归还令牌"""
+    print_separator("测试3: 限速等待遵守期限")
+    limiter = HostRateLimiter(default={'rate': 0.5, 'burst': 1}, overrides={})
+    limiter._host_limits = {}
+    url = 'http://deadline.example.com/page'
+    assert limiter.acquire(url) == 0
+    with deadline_scope(0.3):
+        start = time.monotonic()
+        try:
+            limiter.acquire(url)
+            assert False, '需要等待2秒, 应直接放弃'
+        except DeadlineExceeded:
+            pass
+        assert time.monotonic() - start < 0.1
+    # 放弃时归还了令牌, 排队时间没有被拉长
+    assert limiter.bucket(url).reserve() <= 2.05
+    print("✓ 限速等待超出期限时立即放弃")
+
+
+async def _pages():
+    async def page(num, delay):
+        await asyncio.sleep(delay)
+        return {'page': num}
+
+    async def broken():
+        raise ValueError('解析失败')
+
+    return await async_loop.gather_partial([page(1, 0.01), page(2, 5), broken()])
+
+
+def test_gather_partial():
+    """测试期限用完时异步任务返回已完成的部分"""
+    print_separator("测试4: 异步任务返回部分结果")
+    with deadline_scope(0.3):
+        start = time.monotonic()
+        results = async_loop.run(_pages())
+        elapsed = time.monotonic() - start
+    assert results[0] == {'page': 1}
+    assert results[1] is None
+    assert isinstance(results[2], ValueError)
+    assert elapsed < 1.0, elapsed
+    assert async_loop.run(async_loop.gather_partial([])) == []
+    print(f"✓ {elapsed:.2f} 秒后返回部分结果: {results}")
+
+
+def test_flask_deadline():
+    """测试每个API请求创建自己的期限, 用完时响应带上 X-Deadline-Exceeded"""
+    print_separator("测试5: Flask请求期限")
+    app = Flask(__name__)
+    install_deadline(app)
+
+    @app.route('/api/slow')
+    def slow():
+        deadline = current_deadline()
+        time.sleep(0.1)
+        try:
+            deadline.check('slow')
+        except DeadlineExceeded:
+            return jsonify({'partial': True})
+        return jsonify({'seconds': deadline.seconds})
+
+    @app.route('/health')
+    def health():
+        return jsonify({'deadline': current_deadline() is not None})
+
+    client = app.test_client()
+    response = client.get('/api/slow', headers={'X-Request-Timeout': '0.05'})
+    assert response.get_json() == {'partial': True}
+    assert response.headers.get('X-Deadline-Exceeded') == 'true'
+
+    response = client.get('/api/slow', headers={'X-Request-Timeout': '9999'})
+    assert response.get_json()['seconds'] <= 60
+    assert 'X-Deadline-Exceeded' not in response.headers
+
+    assert client.get('/health').get_json() == {'deadline': False}
+    assert current_deadline() is None
+    print("✓ 期限按请求创建, 请求结束后清除")
+
+
+def main():
+    test_clamp_and_scope()
+    test_request_respects_deadline()
+    test_rate_limit_wait_respects_deadline()
+    test_gather_partial()
+    test_flask_deadline()
+    print("\n所有请求期限测试通过")
+
+
+if __name__ == '__main__':
+    main()
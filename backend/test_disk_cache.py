@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘缓存测试脚本
+测试过期、容量淘汰、重启后读取、两级缓存回填与值的格式
+"""
+
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.disk_cache import DiskCache
+from services.cache import MemoryCache, TieredCache
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def _db_path():
+    return os.path.join(tempfile.mkdtemp(prefix='disk_cache_'), 'cache.sqlite3')
+
+
+def test_persist_across_restart():
+    """测试重新打开后数据仍在"""
+    print_separator("测试1: 重启后读取")
+    path = _db_path()
+    cache = DiskCache(path)
+    cache.set('images:abc', {'images': [{'page': 1}], 'total': 1}, timeout=60)
+    reopened = DiskCache(path)
+    assert reopened.get('images:abc') == {'images': [{'page': 1}], 'total': 1}
+    print("✓ 新连接可读取之前写入的数据")
+
+
+def test_ttl_expire():
+    """测试过期"""
+    print_separator("测试2: 过期时间")
+    cache = DiskCache(_db_path())
+    cache.set('a', 'value', timeout=1)
+    assert cache.get('a') == 'value'
+    time.sleep(1.1)
+    assert cache.get('a') is None
+    print("✓ 过期条目不再返回")
+
+
+def test_quota_eviction():
+    """测试容量配额与LRU淘汰"""
+    print_separator("测试3: 容量淘汰")
+    cache = DiskCache(_db_path(), max_bytes=3000)
+    cache.set('a', b'x' * 1000)
+    time.sleep(0.01)
+    cache.set('b', b'x' * 1000)
+    time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.set('c', b'x' * 1000)
+    assert cache.size_bytes <= 3000
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    print(f"✓ 最久未访问的条目被淘汰, 当前 {cache.size_bytes} 字节")
+
+
+def test_tiered_promotion():
+    """测试两级缓存: 只有指定前缀落盘, 一级未命中时从磁盘回填"""
+    print_separator("测试4: 两级缓存")
+    disk = DiskCache(_db_path())
+    tiered = TieredCache(MemoryCache(max_entries=10, max_bytes=0), disk, ('ebook_content',))
+    tiered.set('ebook_content:1', 'chapter text', timeout=60)
+    tiered.set('hot:1', 'hot list', timeout=60)
+    assert disk.get('hot:1') is None
+
+    # 模拟重启: 新的内存缓存, 同一个磁盘缓存
+    restarted = TieredCache(MemoryCache(max_entries=10, max_bytes=0), disk, ('ebook_content',))
+    assert restarted.get('ebook_content:1') == 'chapter text'
+    assert restarted.primary.get('ebook_content:1') == 'chapter text'
+    assert restarted.get('hot:1') is None
+    print("✓ 落盘数据重启后命中并回填内存")
+
+
+def test_tag_invalidation():
+    """测试按标签删除"""
+    print_separator("测试5: 标签失效")
+    cache = DiskCache(_db_path())
+    cache.set('images:1', 'a', timeout=60, tags=['source:baozimh'])
+    cache.set('images:2', 'b', timeout=60, tags=['source:xmanhua'])
+    assert cache.invalidate_tag('source:baozimh') == 1
+    assert cache.get('images:1') is None
+    assert cache.get('images:2') == 'b'
+    print("✓ 只删除匹配标签的条目")
+
+
+def test_json_values_and_byte_total():
+    """测试值以JSON保存、pickle等其他格式按未命中处理, 以及累计字节数与实际一致"""
+    print_separator("测试6: 值格式与字节统计")
+    path = _db_path()
+    cache = DiskCache(path, max_bytes=10000)
+    snapshot = {'body': b'\x1f\x8b...', 'status': 200, 'etag': '"abc"'}
+    cache.set('snap', snapshot, timeout=60)
+    assert cache.get('snap') == snapshot
+    assert not cache.set('obj', object())
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'INSERT INTO entries (key, value, size, expire_at, accessed_at) VALUES (?, ?, ?, 0, ?)',
+        ('pickled', pickle.dumps({'a': 1}), 10, time.time())
+    )
+    conn.execute("UPDATE meta SET value = value + 10 WHERE name = 'bytes'")
+    conn.commit()
+    assert cache.get('pickled') is None
+
+    for i in range(20):
+        cache.set(f'k{i % 7}', b'x' * (300 + i * 40), timeout=60)
+    cache.delete('k1')
+    actual = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+    assert cache.size_bytes == actual <= 10000
+    # 重新打开时沿用保存的总数
+    assert DiskCache(path, max_bytes=10000).size_bytes == actual
+    conn.close()
+    print(f"✓ pickle条目被丢弃, 累计 {actual} 字节与实际一致")
+
+
+def main():
+    test_persist_across_restart()
+    test_ttl_expire()
+    test_quota_eviction()
+    test_tiered_promotion()
+    test_tag_invalidation()
+    test_json_values_and_byte_total()
+    print("\n所有磁盘缓存测试通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端测试脚本
+测试默认后端、按站点覆盖与未安装后端的退回, 以及只解析指定区域
+"""
+
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import html_parser
+from services.html_parser import parse_html, parser_for, resolve_parser, region, FALLBACK_PARSER
+from services.base_ebook_scraper import BaseEbookScraper
+from services.kanunu8_scraper import KanuNu8Scraper
+
+
+class DemoScraper(BaseEbookScraper):
+    """只用于测试基类解析方法"""
+
+
+DemoScraper.__abstractmethods__ = frozenset()
+
+PAGE = '<html><body><ul class="list"><li><a href="/book/1">书一</a></li><li><a href="/book/2">书二</a></li></ul></body></html>'
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_default_and_fallback():
+    """测试默认使用lxml, 未安装的后端退回 html.parser"""
+    print_separator("测试1: 默认后端与退回")
+    assert resolve_parser() == 'lxml'
+    assert resolve_parser('no-such-parser') == FALLBACK_PARSER
+    soup = parse_html(PAGE, 'no-such-parser')
+    assert [a['href'] for a in soup.select('ul.list a')] == ['/book/1', '/book/2']
+    print("✓ 默认后端与退回正确")
+
+
+def test_per_host_override():
+    """测试按host(含子域名)覆盖后端, 爬虫实例使用对应后端"""
+    print_separator("测试2: 按站点覆盖")
+    html_parser.HTML_PARSERS['example.com'] = 'html.parser'
+    try:
+        assert parser_for('https://m.example.com/list') == 'html.parser'
+        assert parser_for('https://other.com/') == 'lxml'
+        scraper = DemoScraper('https://www.example.com')
+        assert scraper.html_parser == 'html.parser'
+        soup = scraper._parse_html(PAGE)
+        assert [a.get_text() for a in soup.find_all('a')] == ['书一', '书二']
+    finally:
+        del html_parser.HTML_PARSERS['example.com']
+    assert DemoScraper('https://www.example.com').html_parser == 'lxml'
+    print("✓ 按站点覆盖正确")
+
+
+DETAIL_PAGE = """
+<html><head><title>长相思</title><script>var ads = 1;</script></head>
+<body><div class="page"><div class="nav"><a href="/">首页</a></div>
+<div class="content">
+  <div class="catalog"><h1>长相思(全集)</h1><div class="info">作者：桐华</div>
+    <div class="summary"><div>简介</div></div></div>
+  <div class="catalogs-ad"><a href="/ad">广告</a></div>
+  <div class="mulu-list"><ul><li><a href="1.html">第一章</a></li><li><a href="2.html">第二章</a></li></ul></div>
+</div></div></body></html>
+"""
+
+
+def test_region_parsing():
+    """测试只解析区域: 区域外的元素不进入DOM, 多个区域, class按单词匹配, 区域不存在时完整解析"""
+    print_separator("测试3: 只解析区域")
+    for parser in ('lxml', 'html.parser'):
+        soup = parse_html(DETAIL_PAGE, parser, only='title, .catalog, .mulu-list')
+        assert soup.find('script') is None
+        assert soup.select_one('.nav') is None
+        assert soup.select_one('.catalogs-ad') is None
+        assert soup.title.get_text() == '长相思'
+        assert [a['href'] for a in soup.select('.mulu-list ul li a')] == ['1.html', '2.html']
+
+        soup = parse_html(DETAIL_PAGE, parser, only='a[href$=".html"]')
+        assert [a.get_text() for a in soup.find_all('a')] == ['第一章', '第二章']
+
+        # 没有匹配的区域时退回完整解析, 备用选择器仍然可用
+        soup = parse_html(DETAIL_PAGE, parser, only='#chapterlistload')
+        assert soup.select_one('.nav a')['href'] == '/'
+
+    try:
+        region('div > a')
+        assert False, '不支持组合选择器'
+    except ValueError:
+        pass
+    print("✓ 区域解析正确")
+
+
+def test_scraper_region():
+    """测试爬虫声明的区域: 只解析详情区域后仍能得到书名、作者与目录"""
+    print_separator("测试4: 爬虫区域声明")
+    scraper = KanuNu8Scraper()
+    soup = scraper._parse_html(DETAIL_PAGE, only=scraper.DETAIL_REGION)
+    assert soup.find('div', class_='nav') is None
+    assert soup.select_one('.catalog h1').get_text() == '长相思(全集)'
+    chapters = scraper._parse_chapters_from_detail(soup, 'book5_changxiangsi', 'https://www.kanunu8.com/book5/changxiangsi/')
+    assert [c['url'] for c in chapters['chapters']] == [
+        'https://www.kanunu8.com/book5/changxiangsi/1.html',
+        'https://www.kanunu8.com/book5/changxiangsi/2.html',
+    ]
+    print(f"✓ 解析到 {chapters['total']} 个章节")
+
+
+def main():
+    test_default_and_fallback()
+    test_per_host_override()
+    test_region_parsing()
+    test_scraper_region()
+    print("\n所有HTML解析后端测试通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+统一HTTP客户端测试脚本
+使用本地HTTP服务测试连接池共享、GET重试与失败返回
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import http_client
+from services.http_client import create_session, build_proxies, fetch
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """/flaky 前两次返回503, /missing 始终返回404, 其余返回200并下发Cookie"""
+    hits = {}
+
+    def do_GET(self):
+        count = FlakyHandler.hits.get(self.path, 0) + 1
+        FlakyHandler.hits[self.path] = count
+        if self.path == '/flaky' and count <= 2:
+            status, body = 503, b'busy'
+        elif self.path == '/missing':
+            status, body = 404, b'missing'
+        else:
+            status, body = 200, '你好'.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Set-Cookie', 'sid=x; Path=/')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_sessions_share_pool():
+    """测试不同会话共用同一个连接池适配器, 代理配置按会话生效"""
+    print_separator("测试1: 共享连接池")
+    a = create_session()
+    b = create_session(proxy_config={'enabled': True, 'type': 'http', 'host': '10.0.0.1', 'port': 8080})
+    assert a.get_adapter('https://example.com') is b.get_adapter('https://example.org')
+    assert not a.proxies
+    assert b.proxies == {'http': 'http://10.0.0.1:8080', 'https': 'http://10.0.0.1:8080'}
+    assert build_proxies({'enabled': False, 'host': 'x'}) is None
+    print("✓ 适配器共享, 代理独立")
+
+
+def test_get_retry_and_failure():
+    """测试GET遇到503自动重试, 非2xx最终返回None"""
+    print_separator("测试2: 重试与失败")
+    server = start_server()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    FlakyHandler.hits.clear()
+    try:
+        session = create_session()
+        response = fetch(session, base + '/flaky')
+        assert response is not None
+        assert response.text == '你好'
+        assert FlakyHandler.hits['/flaky'] == 3
+
+        assert fetch(session, base + '/missing') is None
+        assert FlakyHandler.hits['/missing'] == 1
+    finally:
+        server.shutdown()
+    print(f"✓ 请求次数: {FlakyHandler.hits}")
+
+
+def test_shared_session_ignores_cookies():
+    """测试共享会话不保存上游Cookie"""
+    print_separator("测试3: 共享会话不保存Cookie")
+    server = start_server()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        private = create_session()
+        private.get(base + '/cookie')
+        assert private.cookies.get('sid') == 'x'
+
+        http_client.request('GET', base + '/cookie')
+        assert len(http_client._shared_session.cookies) == 0
+    finally:
+        server.shutdown()
+    print("✓ 共享会话无状态")
+
+
+def main():
+    test_sessions_share_pool()
+    test_get_retry_and_failure()
+    test_shared_session_ignores_cookies()
+    print("\n所有HTTP客户端测试通过")
+
+
+if __name__ == '__main__':
+    main()
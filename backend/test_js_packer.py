@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Packer解包测试脚本
+测试下标编码、base36/base62负载的单遍解包、转义字符、缓存, 以及X漫画单页响应的解析
+"""
+
+import os
+import re
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import js_packer
+from services.xmanhua_scraper import resolve_page_image
+from bench_js_packer import pack
+
+SOURCE = (
+    "function dm5imagefun(){var cid=119988;var key='72fa4e46f7f8af9dccff760f707ffe34';"
+    "var pix=\"https://image.xmanhua.com/1/73/119988\";var pvalue=[\"/1_2811.jpg\",\"/2_1720.jpg\"];"
+    "for(var i=0;i<pvalue.length;i++){pvalue[i]=pix+pvalue[i]+'?cid=119988&key=72fa4e46f7f8af9dccff760f707ffe34'}"
+    "return pvalue}var d;d=dm5imagefun();"
+)
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_encode_index():
+    """测试下标编码与packer的 e() 一致"""
+    print_separator("测试1: 下标编码")
+    assert js_packer.encode_index(0, 36) == '0'
+    assert js_packer.encode_index(35, 36) == 'z'
+    assert js_packer.encode_index(36, 36) == '10'
+    assert js_packer.encode_index(36, 62) == 'A'
+    assert js_packer.encode_index(61, 62) == 'Z'
+    assert js_packer.encode_index(62, 62) == '10'
+    assert js_packer.encode_index(38, 39) == 'C'
+    print("✓ 下标编码正确")
+
+
+def test_unpack_roundtrip():
+    """测试base36/base62负载还原为原代码, 数字单词不会被再次替换"""
+    print_separator("测试2: 单遍解包")
+    for radix in (36, 62):
+        packed = pack(SOURCE, radix)
+        assert js_packer.unpack(packed) == SOURCE, radix
+    assert js_packer.unpack('var a = 1;') is None
+    print("✓ base36/base62 负载均还原")
+
+
+def test_escaped_quotes_and_cache():
+    """测试payload中的转义引号, 以及相同负载命中缓存"""
+    print_separator("测试3: 转义字符与缓存")
+    packed = r"eval(function(p,a,c,k,e,d){return p}('0 1=\'2\';',3,3,'var|key|abc'.split('|'),0,{}))"
+    js_packer._unpack.cache_clear()
+    assert js_packer.unpack(packed) == "var key='abc';"
+    assert js_packer.unpack(packed) == "var key='abc';"
+    info = js_packer.cache_info()
+    assert info.hits == 1 and info.misses == 1
+    print(f"✓ 转义字符还原, 缓存 {info}")
+
+
+def test_xmanhua_page():
+    """测试 js_unpacker.py 中的样例: 下标大于35的关键词(base39)被正确还原"""
+    print_separator("测试4: X漫画单页响应")
+    with open(os.path.join(current_dir, 'js_unpacker.py'), encoding='utf-8') as f:
+        packed = re.search(r"packed = '''(.*?)'''", f.read(), re.S).group(1)
+    unpacked = js_packer.unpack(packed)
+    assert '"/11_2808.jpg","/12_5151.jpg","/13_6986.jpg","/14_9957.jpg"' in unpacked
+    result = resolve_page_image(packed, 1, '119988')
+    assert result['url'].startswith('https://image.xmanhua.com/1/73/119988/2_1720.jpg?cid=119988&key=72fa4e46')
+    assert result['url'].endswith('&uk=707970C804232C298A93E11EACBE370150C065E4E9D4B9A92E2CDF7209044E7F')
+    print(f"✓ {result['url'][:80]}...")
+
+
+def main():
+    test_encode_index()
+    test_unpack_roundtrip()
+    test_escaped_quotes_and_cache()
+    test_xmanhua_page()
+    print("\n所有Packer解包测试通过")
+
+
+if __name__ == '__main__':
+    main()
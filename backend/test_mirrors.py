@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+多镜像对冲请求测试脚本
+测试慢镜像触发备份请求、失败镜像立即切换、按历史表现排序、领先请求不占用共享线程池
+"""
+
+import os
+import sys
+import time
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services import mirrors
+from services.mirrors import MirrorStats, hedged_fetch
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def make_fetch(behaviour, calls):
+    """behaviour: name -> (耗时, 返回值)"""
+    def fetch(mirror):
+        calls.append(mirror['name'])
+        delay, result = behaviour[mirror['name']]
+        time.sleep(delay)
+        return result
+    return fetch
+
+
+def test_slow_leader_is_hedged():
+    """测试领先镜像超过p95未返回时请求备份镜像, 备份先拿到有效响应即胜出"""
+    print_separator("测试1: 慢镜像触发备份请求")
+    stats = MirrorStats()
+    for _ in range(10):
+        stats.record('a', 0.05, True)
+        stats.record('b', 0.08, True)
+    calls = []
+    fetch = make_fetch({'a': (0.5, 'from-a'), 'b': (0.05, 'from-b')}, calls)
+    started = time.monotonic()
+    mirror, response = hedged_fetch([{'name': 'a'}, {'name': 'b'}], fetch, stats=stats)
+    elapsed = time.monotonic() - started
+    assert (mirror['name'], response) == ('b', 'from-b')
+    assert calls == ['a', 'b']
+    # 领先请求在调用线程中, 总耗时以它为上限(0.5秒), 不会再加上备份请求的时间
+    assert elapsed < 0.65
+    print(f"✓ 耗时 {elapsed:.3f}s, 胜出镜像 {mirror['name']}")
+
+
+def test_failure_switches_immediately():
+    """测试领先镜像失败时立即请求下一个, 全部失败返回None"""
+    print_separator("测试2: 失败立即切换")
+    stats = MirrorStats()
+    calls = []
+    fetch = make_fetch({'a': (0.0, None), 'b': (0.0, 'from-b')}, calls)
+    started = time.monotonic()
+    mirror, response = hedged_fetch([{'name': 'a'}, {'name': 'b'}], fetch, stats=stats)
+    assert response == 'from-b' and time.monotonic() - started < 0.2
+
+    fetch = make_fetch({'a': (0.0, None), 'b': (0.0, None)}, [])
+    assert hedged_fetch([{'name': 'a'}, {'name': 'b'}], fetch, stats=stats) == (None, None)
+    print("✓ 失败后立即切换")
+
+
+def test_order_by_stats():
+    """测试按中位延迟与失败率排序"""
+    print_separator("测试3: 按历史表现排序")
+    stats = MirrorStats()
+    for _ in range(10):
+        stats.record('slow', 0.9, True)
+        stats.record('fast', 0.1, True)
+    calls = []
+    fetch = make_fetch({'slow': (0.0, 'slow'), 'fast': (0.0, 'fast')}, calls)
+    mirror, _ = hedged_fetch([{'name': 'slow'}, {'name': 'fast'}], fetch, stats=stats)
+    assert mirror['name'] == 'fast' and calls == ['fast']
+    snapshot = stats.snapshot()
+    assert snapshot['fast']['p95'] is not None
+    print(f"✓ 统计: {snapshot['fast']}")
+
+
+def test_leader_not_queued_behind_backups():
+    """测试共享线程池被其他请求的备份占满时, 领先请求仍立即发出"""
+    print_separator("测试4: 领先请求不排队")
+    release = threading.Event()
+    blockers = [mirrors._executor.submit(release.wait, 5) for _ in range(mirrors.HEDGE_WORKERS)]
+    try:
+        fetch = make_fetch({'a': (0.0, 'from-a'), 'b': (0.0, 'from-b')}, [])
+        started = time.monotonic()
+        mirror, response = hedged_fetch([{'name': 'a'}, {'name': 'b'}], fetch, stats=MirrorStats())
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+    assert response == 'from-a' and elapsed < 0.1
+    print(f"✓ 线程池占满时耗时 {elapsed * 1000:.1f}ms")
+
+
+def main():
+    test_slow_leader_is_hedged()
+    test_failure_switches_immediately()
+    test_order_by_stats()
+    test_leader_not_queued_behind_backups()
+    print("\n所有镜像对冲测试通过")
+
+
+if __name__ == '__main__':
+    main()
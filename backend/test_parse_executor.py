@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+解析执行器测试脚本
+测试各执行器类型得到相同的解析结果, 线程池解析期间事件循环不被阻塞, 以及章节图片的并发获取
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.parse_executor import parse_executor, ParseExecutor
+from services.async_loop import async_loop
+from services.animezilla_scraper import AnimezillaScraper, extract_page_image
+from services.xmanhua_scraper import resolve_page_image
+
+
+def page_html(chapter_id, page_num, filler=200):
+    """模拟的单页HTML: 大量侧栏链接与一张主图片"""
+    links = ''.join(f'<li><a href="/manga/{i}">推荐 {i}</a><span class="tag">标签</span></li>' for i in range(filler))
+    return (
+        f'<html><head><title>第{page_num}页</title><script>var ads = 1;</script></head><body>'
+        f'<div class="sidebar"><ul>{links}</ul></div>'
+        f'<article><a href="/manga/{chapter_id}/{page_num + 1}">'
+        f'<img id="comic" src="https://img.example.com/{chapter_id}/{page_num}.jpg"></a></article>'
+        f'<div class="footer"><ul>{links}</ul></div></body></html>'
+    )
+
+
+def packed_sample():
+    """js_unpacker.py 中的Packer样例"""
+    with open(os.path.join(current_dir, 'js_unpacker.py'), encoding='utf-8') as f:
+        return re.search(r"packed = '''(.*?)'''", f.read(), re.S).group(1)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """/manga/<章节>/<页码> 返回模拟页面"""
+
+    def do_GET(self):
+        _, _, chapter_id, page_num = self.path.split('/')
+        body = page_html(chapter_id, int(page_num)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+async def _run_all(executor, calls):
+    return await asyncio.gather(*(executor.run(func, *args) for func, *args in calls))
+
+
+def test_kinds_give_same_results():
+    """测试 inline / thread / process 三种执行器的解析结果一致"""
+    print_separator("测试1: 各执行器结果一致")
+    calls = [(extract_page_image, page_html('c1', n), 'c1', n, 'lxml') for n in range(1, 4)]
+    calls.append((resolve_page_image, packed_sample(), 1, '119988'))
+    results = {}
+    for kind in ('inline', 'thread', 'process'):
+        executor = ParseExecutor(kind, workers=2)
+        try:
+            results[kind] = async_loop.run(_run_all(executor, calls), timeout=60)
+        finally:
+            executor.shutdown()
+    assert results['inline'] == results['thread'] == results['process']
+    assert results['inline'][0] == {'page': 1, 'url': 'https://img.example.com/c1/1.jpg'}
+    assert 'uk=707970C8' in results['inline'][3]['url']
+
+    try:
+        ParseExecutor('thread').configure('gpu')
+        assert False, '未知类型应报错'
+    except ValueError:
+        pass
+    print("✓ 三种执行器结果一致")
+
+
+async def _max_tick_gap(executor, html, pages=4):
+    """解析 pages 个大页面期间, 另一个协程两次调度之间的最大间隔(秒)"""
+    gaps = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.01)
+    for n in range(pages):
+        await executor.run(extract_page_image, html, 'c1', n, 'lxml')
+    done.set()
+    await task
+    return max(gaps)
+
+
+def test_loop_stays_responsive():
+    """测试线程池解析时事件循环仍能调度其它协程, 循环内解析时会被阻塞"""
+    print_separator("测试2: 解析期间事件循环不被阻塞")
+    html = page_html('c1', 1, filler=4000)
+    inline = ParseExecutor('inline')
+    thread = ParseExecutor('thread', workers=1)
+    try:
+        inline_gap = async_loop.run(_max_tick_gap(inline, html), timeout=60)
+        thread_gap = async_loop.run(_max_tick_gap(thread, html), timeout=60)
+    finally:
+        thread.shutdown()
+    assert thread_gap < inline_gap / 2, (thread_gap, inline_gap)
+    print(f"✓ 最大调度间隔: 循环内解析 {inline_gap * 1000:.1f}ms, 线程池 {thread_gap * 1000:.1f}ms")
+
+
+def test_chapter_images_through_executor():
+    """测试爬虫并发获取章节图片时经由共享执行器解析, 结果完整有序"""
+    print_separator("测试3: 章节图片经由执行器解析")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scraper = AnimezillaScraper()
+    scraper.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    original = parse_executor.kind
+    try:
+        for kind in ('inline', 'thread'):
+            parse_executor.configure(kind)
+            images = async_loop.run(scraper._fetch_images_async('c9', 25), timeout=60)
+            assert [img['page'] for img in images] == list(range(1, 26))
+            assert images[-1]['url'] == 'https://img.example.com/c9/25.jpg'
+    finally:
+        parse_executor.configure(original)
+        server.shutdown()
+    print(f"✓ 获取到 {len(images)} 页")
+
+
+def main():
+    test_kinds_give_same_results()
+    test_loop_stays_responsive()
+    test_chapter_images_through_executor()
+    print("\n所有解析执行器测试通过")
+
+
+if __name__ == '__main__':
+    main()
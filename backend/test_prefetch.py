@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+章节预读测试脚本
+测试章节列表记录后继关系, 读取第N章后后台缓存第N+1章, 已缓存时不重复预读, 预读失败不写缓存
+"""
+
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from flask import Flask, jsonify, g
+from services import cache as cache_module
+from services.cache import MemoryCache, cache_response, set_cache_backend
+from services.prefetch import ChapterIndex, track_chapter_list, prefetch_next_chapter, prefetcher
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_comic_successor_by_number():
+    """测试漫画按章节号查找下一章(列表倒序也能找到)"""
+    print_separator("测试1: 章节后继关系")
+    index = ChapterIndex()
+    chapters = [
+        {'id': 'm3', 'title': '第3话'},
+        {'id': 'm2', 'title': '第2话'},
+        {'id': 'm1', 'title': '第1话'},
+    ]
+    index.remember('comic', 'xmanhua', '73xm', chapters)
+    assert index.next_chapter('comic', 'xmanhua', 'm1') == 'm2'
+    assert index.next_chapter('comic', 'xmanhua', 'm3') is None
+
+    index.remember('ebook', 'kanunu8', 'b1', [{'id': 'c1'}, {'id': 'c2'}])
+    assert index.next_chapter('ebook', 'kanunu8', 'c1') == 'c2'
+    print("✓ 漫画按章节号, 电子书按列表顺序")
+
+
+def test_prefetch_next_chapter():
+    """测试读取第1章后第2章已在缓存中"""
+    print_separator("测试2: 后台预读下一章")
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    calls = []
+    app = Flask(__name__)
+
+    @app.route('/api/comics/<comic_id>/chapters')
+    @track_chapter_list('comic', 'comic_id')
+    @cache_response(timeout=60, key_prefix='prefetch_chapters')
+    def chapters(comic_id):
+        return jsonify({'chapters': [
+            {'id': 'm1', 'title': '第1话'},
+            {'id': 'm2', 'title': '第2话'},
+            {'id': 'm3', 'title': '第3话'},
+        ], 'total': 3}), 200
+
+    @app.route('/api/chapters/<chapter_id>/images')
+    @prefetch_next_chapter('comic')
+    @cache_response(timeout=60, key_prefix='prefetch_images')
+    def images(chapter_id):
+        calls.append(chapter_id)
+        return jsonify({'images': [{'page': 1, 'url': chapter_id}], 'total': 1}), 200
+
+    try:
+        client = app.test_client()
+        client.get('/api/comics/c1/chapters?source=test')
+        client.get('/api/chapters/m1/images?source=test')
+        prefetcher.join()
+        assert calls == ['m1', 'm2']
+
+        # 第2章命中预读结果, 同时预读第3章
+        response = client.get('/api/chapters/m2/images?source=test')
+        prefetcher.join()
+        assert response.get_json()['images'][0]['url'] == 'm2'
+        assert calls == ['m1', 'm2', 'm3']
+
+        # 下一章已在缓存中时不再提交预读
+        submitted = []
+        original_submit = prefetcher.submit
+        prefetcher.submit = lambda *args: submitted.append(args[2])
+        try:
+            client.get('/api/chapters/m1/images?source=test')
+        finally:
+            prefetcher.submit = original_submit
+        assert submitted == []
+        assert calls == ['m1', 'm2', 'm3']
+    finally:
+        set_cache_backend(original)
+    print(f"✓ 回源顺序: {calls}")
+
+
+def test_prefetch_failure_not_cached():
+    """测试预读得到的错误结果不写缓存, 读者请求时重新回源"""
+    print_separator("测试3: 预读失败不写缓存")
+    original = cache_module._cache
+    set_cache_backend(MemoryCache(max_entries=100, max_bytes=0))
+    calls = []
+    app = Flask(__name__)
+
+    @app.route('/api/comics/<comic_id>/chapters')
+    @track_chapter_list('comic', 'comic_id')
+    @cache_response(timeout=60, key_prefix='prefetch_fail_chapters')
+    def chapters(comic_id):
+        return jsonify({'chapters': [{'id': 'm1', 'title': '第1话'}, {'id': 'm2', 'title': '第2话'}]}), 200
+
+    @app.route('/api/chapters/<chapter_id>/images')
+    @prefetch_next_chapter('comic')
+    @cache_response(timeout=60, key_prefix='prefetch_fail_images')
+    def images(chapter_id):
+        calls.append((chapter_id, bool(g.get('prefetching'))))
+        if g.get('prefetching'):
+            return jsonify({'error': '限速让出'}), 500
+        return jsonify({'images': [{'page': 1, 'url': chapter_id}], 'total': 1}), 200
+
+    try:
+        client = app.test_client()
+        client.get('/api/comics/c1/chapters?source=fail')
+        client.get('/api/chapters/m1/images?source=fail')
+        prefetcher.join()
+        response = client.get('/api/chapters/m2/images?source=fail')
+    finally:
+        set_cache_backend(original)
+    assert response.status_code == 200
+    assert calls == [('m1', False), ('m2', True), ('m2', False)]
+    print(f"✓ 回源顺序: {calls}")
+
+
+def main():
+    test_comic_successor_by_number()
+    test_prefetch_next_chapter()
+    test_prefetch_failure_not_cached()
+    print("\n所有预读测试通过")
+
+
+if __name__ == '__main__':
+    main()
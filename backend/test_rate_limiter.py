@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+上游限速测试脚本
+测试令牌桶的突发与排队、按host解析限速参数、后台请求让出配额
+"""
+
+import os
+import sys
+import time
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.rate_limiter import TokenBucket, HostRateLimiter, normalize_host, low_priority
+from services.deadline import deadline_scope, DeadlineExceeded
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_burst_then_wait():
+    """测试突发额度内不等待, 超出后按速率排队"""
+    print_separator("测试1: 令牌桶")
+    bucket = TokenBucket(rate=20, burst=3)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.04 <= waits[3] <= 0.06
+    assert 0.09 <= waits[4] <= 0.11
+    assert TokenBucket(rate=0, burst=1).reserve() == 0.0
+    print(f"✓ 等待时间: {[round(w, 3) for w in waits]}")
+
+
+def test_threads_share_bucket():
+    """测试多线程共享同一个host的配额"""
+    print_separator("测试2: 多线程共享")
+    limiter = HostRateLimiter(default={'rate': 50, 'burst': 2}, overrides={})
+    limiter._host_limits = {}
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire, args=('https://a.example.com/x',)) for _ in range(7)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+    # 2个突发 + 5个排队, 约 5/50 = 0.1 秒
+    assert 0.08 <= elapsed < 0.5
+    # 其他host不受影响
+    assert limiter.acquire('https://b.example.com/') == 0.0
+    print(f"✓ 7个请求耗时 {elapsed:.3f}s")
+
+
+def test_limits_resolution():
+    """测试host规范化与按子域名逐级匹配"""
+    print_separator("测试3: 限速参数解析")
+    assert normalize_host('https://www.Baozimh.com:443/comic/x') == 'baozimh.com'
+    assert normalize_host('cn.ttkan.co') == 'cn.ttkan.co'
+    limiter = HostRateLimiter(default={'rate': 1, 'burst': 3}, overrides={'img.example.com': {'burst': 10}})
+    limiter._host_limits = {'baozimh.com': {'rate': 5}}
+    limiter._host_limits.update(limiter._load_host_limits())
+    assert limiter.limits_for('m.baozimh.com') == {'rate': 5, 'burst': 3}
+    assert limiter.limits_for('img.example.com') == {'rate': 1, 'burst': 10}
+    assert limiter.limits_for('example.com') == {'rate': 1, 'burst': 3}
+    print("✓ 子域名继承上级配置, 未配置使用默认值")
+
+
+def test_low_priority_reserve():
+    """测试后台请求只用超出保留部分的令牌, 前台请求仍有突发额度"""
+    print_separator("测试4: 后台请求")
+    limiter = HostRateLimiter(default={'rate': 0.5, 'burst': 4}, overrides={})
+    limiter._host_limits = {}
+    url = 'https://a.example.com/x'
+    with low_priority():
+        assert limiter.acquire(url) == 0.0
+        assert limiter.acquire(url) == 0.0
+        # 剩下的一半留给前台, 后台等待超出期限时放弃
+        with deadline_scope(0.5) as deadline:
+            try:
+                limiter.acquire(url)
+                assert False, '后台请求不应取用保留的令牌'
+            except DeadlineExceeded:
+                assert deadline.exceeded
+    assert limiter.acquire(url) == 0.0
+    assert limiter.acquire(url) == 0.0
+    # burst 为1时后台请求在桶满时仍可取用
+    single = HostRateLimiter(default={'rate': 0.5, 'burst': 1}, overrides={})
+    single._host_limits = {}
+    with low_priority():
+        assert single.acquire(url) == 0.0
+    print("✓ 后台请求用完非保留部分后等待, 前台请求不受影响")
+
+
+def main():
+    test_burst_then_wait()
+    test_threads_share_bucket()
+    test_limits_resolution()
+    test_low_priority_reserve()
+    print("\n所有限速测试通过")
+
+
+if __name__ == '__main__':
+    main()
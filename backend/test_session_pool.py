@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+会话池测试脚本
+测试单例爬虫被多个线程同时使用时, 按请求传入的请求头/Cookie互不干扰
+"""
+
+import os
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.http_client import create_session, SessionPool
+from services.rate_limiter import rate_limiter
+from services.base_scraper import BaseScraper
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """返回收到的 Referer 与 Cookie; /login 下发Cookie"""
+
+    def do_GET(self):
+        if self.path == '/login':
+            body = b'{}'
+            self.send_response(200)
+            self.send_header('Set-Cookie', 'sid=s1; Path=/')
+        else:
+            body = json.dumps({
+                'path': self.path,
+                'referer': self.headers.get('Referer'),
+                'cookie': self.headers.get('Cookie') or '',
+            }).encode('utf-8')
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DemoScraper(BaseScraper):
+    """只用于测试基类请求方法"""
+
+
+DemoScraper.__abstractmethods__ = frozenset()
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def _start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    # 测试服务不限速
+    rate_limiter.bucket(base).rate = 0
+    return server, base
+
+
+def test_concurrent_header_overrides():
+    """测试并发请求各自的 Referer/Cookie 不串用, 也不修改共享会话"""
+    print_separator("测试1: 并发请求的请求头覆盖")
+    server, base = _start_server()
+    scraper = DemoScraper(base)
+    default_headers = dict(scraper.session.headers)
+
+    def call(i):
+        response = scraper._make_request(
+            f'{base}/page/{i}', headers={'Referer': f'{base}/ref/{i}'}, cookies={'req': str(i)}
+        )
+        return i, response.json()
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(call, range(64)))
+    finally:
+        server.shutdown()
+
+    for i, data in results:
+        assert data['path'] == f'/page/{i}'
+        assert data['referer'] == f'{base}/ref/{i}'
+        assert data['cookie'] == f'req={i}'
+    assert dict(scraper.session.headers) == default_headers
+    # 按请求传入的Cookie不会写进共享Cookie罐
+    assert 'req' not in scraper.session.cookies
+    assert scraper.session_pool._created <= scraper.session_pool.size
+    print(f"✓ {len(results)} 个并发请求互不干扰, 创建会话 {scraper.session_pool._created} 个")
+
+
+def test_pool_shares_template_state():
+    """测试池中会话复制模板的请求头, 共用模板的Cookie罐, 数量不超过上限"""
+    print_separator("测试2: 会话池")
+    server, base = _start_server()
+    template = create_session({'User-Agent': 'demo-agent'})
+    pool = SessionPool(template, size=2)
+    try:
+        with pool.session() as first:
+            first.get(base + '/login')
+            with pool.session() as second:
+                assert first is not second
+                assert second.headers['User-Agent'] == 'demo-agent'
+                assert second.get(base + '/check').json()['cookie'] == 'sid=s1'
+        assert template.cookies.get('sid') == 's1'
+
+        seen = set()
+
+        def use(_):
+            with pool.session() as session:
+                seen.add(id(session))
+                return session.get(base + '/x').status_code
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert set(executor.map(use, range(32))) == {200}
+    finally:
+        server.shutdown()
+    assert len(seen) <= 2
+    print(f"✓ 并发取用只创建了 {len(seen)} 个会话")
+
+
+def main():
+    test_concurrent_header_overrides()
+    test_pool_shares_template_state()
+    print("\n所有会话池测试通过")
+
+
+if __name__ == '__main__':
+    main()
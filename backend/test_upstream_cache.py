@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+上游响应缓存测试脚本
+使用本地HTTP服务测试 ETag / Last-Modified 条件请求与304复用
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from services.disk_cache import DiskCache
+from services.upstream_cache import UpstreamCache
+from services.http_client import create_session, fix_encoding
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """/etag 使用ETag, /modified 使用Last-Modified, /plain 没有校验信息"""
+    version = 'v1'
+    log = []
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        etag = f'"{PageHandler.version}"'
+        modified = 'Wed, 01 Jan 2025 00:00:00 GMT'
+        if path == '/etag' and self.headers.get('If-None-Match') == etag:
+            return self._reply(304, b'', {'ETag': etag})
+        if path == '/modified' and self.headers.get('If-Modified-Since') == modified:
+            return self._reply(304, b'', {})
+        headers = {'Content-Type': 'text/html; charset=utf-8'}
+        if path == '/etag':
+            headers['ETag'] = etag
+        elif path == '/modified':
+            headers['Last-Modified'] = modified
+        self._reply(200, f'分类页 {PageHandler.version}'.encode('utf-8'), headers)
+
+    def _reply(self, status, body, headers):
+        PageHandler.log.append((self.path, status))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def print_separator(title):
+    """打印分隔线"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def test_conditional_revalidation():
+    """测试304复用保存的内容, 内容变化后重新保存"""
+    print_separator("测试1: 条件请求")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    tmp = tempfile.mkdtemp()
+    cache = UpstreamCache(store=DiskCache(os.path.join(tmp, 'upstream.sqlite3')), hosts=())
+    session = create_session()
+    PageHandler.log.clear()
+    PageHandler.version = 'v1'
+    try:
+        for path in ('/etag', '/modified'):
+            first = fix_encoding(cache.send(session, 'GET', base + path, params={'page': 1}))
+            second = fix_encoding(cache.send(session, 'GET', base + path, params={'page': 1}))
+            assert second.status_code == 200
+            assert second.text == first.text == '分类页 v1'
+            assert second.headers['X-Upstream-Cache'] == 'revalidated'
+        assert [status for _, status in PageHandler.log] == [200, 304, 200, 304]
+
+        PageHandler.version = 'v2'
+        changed = fix_encoding(cache.send(session, 'GET', base + '/etag', params={'page': 1}))
+        assert changed.text == '分类页 v2'
+        again = fix_encoding(cache.send(session, 'GET', base + '/etag', params={'page': 1}))
+        assert again.text == '分类页 v2' and PageHandler.log[-1][1] == 304
+
+        # 没有校验信息的响应不保存
+        cache.send(session, 'GET', base + '/plain')
+        cache.send(session, 'GET', base + '/plain')
+        assert PageHandler.log[-2:] == [('/plain', 200), ('/plain', 200)]
+        assert cache.revalidated == 3
+    finally:
+        server.shutdown()
+    print(f"✓ 请求记录: {PageHandler.log}")
+
+
+def test_enabled_hosts():
+    """测试按站点(含子域名)默认开启"""
+    print_separator("测试2: 站点开关")
+    cache = UpstreamCache(store=False, hosts=('kanunu8.com',))
+    assert cache.enabled_for('https://www.kanunu8.com/book/1.html')
+    assert cache.enabled_for('https://m.kanunu8.com/')
+    assert not cache.enabled_for('https://notkanunu8.com/')
+    print("✓ 站点匹配正确")
+
+
+def main():
+    test_conditional_revalidation()
+    test_enabled_hosts()
+    print("\n所有上游响应缓存测试通过")
+
+
+if __name__ == '__main__':
+    main()